@@ -1,20 +1,23 @@
 # Provedores
-import lmstudio as lms
-from openai import OpenAI, AzureOpenAI
+from api.clients import CLIENTS
+from api.handles import HANDLES
+from openai.types import CompletionUsage
 
 # Utilitárias
 import re
-import os
 import time
+import asyncio
 from enum import Enum
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
 # Mock
 import random
 import pandas as pd
-from src.model.format import TSFormat, TSType, format_timeseries
+from src.model.format import TSFormat, TSType, HorizonParser, format_timeseries
+from src.model.tokens import ESTIMATOR
 
-load_dotenv()
+from api.cache import ResponseCache, RESPONSES
+from api.limits import LIMITS, RETRYABLE
 
 class Provider(str, Enum):
   LM_STUDIO = 'lmstudio'
@@ -28,8 +31,36 @@ class Provider(str, Enum):
       Provider.AZURE: "OpenAI Azure",
     }[self]
 
+# Requisições simultâneas por provedor no AsyncAPI.batch (o LM Studio processa uma previsão por vez)
+CONCURRENCY = {
+  Provider.LM_STUDIO: 1,
+  Provider.OPENAI: 16,
+  Provider.AZURE: 16,
+}
+
+def cached_tokens(usage) -> int:
+  """Retorna os tokens do prompt servidos pelo cache de prefixo do provedor (0 se o usage não os informa)."""
+  details = getattr(usage, "prompt_tokens_details", None)
+  return getattr(details, "cached_tokens", None) or 0
+
+def run_sync(coroutine):
+  """
+  Executa uma corrotina a partir de código síncrono e retorna o seu resultado. Se a thread já tem
+  um event loop rodando (notebooks, servidores assíncronos), onde asyncio.run não pode ser
+  aninhado, a corrotina roda em um event loop próprio em uma thread auxiliar.
+  """
+  try:
+    asyncio.get_running_loop()
+  except RuntimeError:
+    return asyncio.run(coroutine)
+  with ThreadPoolExecutor(max_workers=1) as executor:
+    return executor.submit(asyncio.run, coroutine).result()
+
 class API:
-  def __init__(self, model: str, provider: Provider, prompt: str, temperature: float):
+  def __init__(
+    self, model: str, provider: Provider, prompt: str, temperature: float, use_cache: bool = True,
+    horizon: HorizonParser = None
+  ):
     """
     Classe responsável por manipular a API do modelo.
 
@@ -38,42 +69,177 @@ class API:
       provider (Provider): Provedor da API (lmstudio, openai, azure).
       prompt (str): Prompt a ser utilizado.
       temperature (float): Temperatura do modelo.
+      use_cache (bool): Se True, repete a resposta gravada para a mesma requisição (desligue em estudos
+        de amostragem com temperatura > 0, onde cada chamada deve gerar uma nova resposta).
+      horizon (HorizonParser): Se informado, a resposta é recebida em streaming e interrompida assim
+        que o leitor encontra os 'periods' valores previstos em uma estrutura completa.
     """
     self.model = model
     self.provider = provider
     self.prompt = prompt
     self.temperature = temperature
+    self.use_cache = use_cache
+    self.horizon = horizon
+    self.cache_hit = False
+    self.load_time = None
 
   def response(self):
     """
-    Gera a resposta do modelo com base no prompt e temperatura definidos.
+    Gera a resposta do modelo com base no prompt e temperatura definidos, consultando antes o cache de respostas.
+
+    Uma resposta em cache devolve os tokens e os tempos da chamada original; cache_hit indica a origem.
+    Os tempos até o primeiro token e até o horizonte só são medidos em streaming (None sem horizon).
+    No LM Studio, load_time guarda o tempo de carga do modelo, que não entra em elapsed_time.
 
     Returns:
-        tuple: (response, total_tokens_prompt, total_tokens_response, elapsed_time)
+        tuple: (response, total_tokens_prompt, total_tokens_response, elapsed_time, cached_tokens_prompt,
+          time_to_first_token, time_to_horizon)
+    """
+    self.cache_hit = False
+    self.load_time = None
+    if not self.use_cache:
+      return self.request()
+
+    key = ResponseCache.key(self.model, self.provider, self.temperature, self.prompt)
+    cached = RESPONSES.get(key)
+    if cached is not None:
+      self.cache_hit = True
+      print(f"[INFO] Resposta recuperada do cache de respostas ({key[:12]}).")
+      return cached
+
+    result = self.request()
+    if result[0] is not None:
+      RESPONSES.put(key, self.model, self.provider, self.temperature, self.prompt, result)
+    return result
+
+  def request(self, call=None):
     """
+    Chama o provedor definido, sem passar pelo cache de respostas.
+
+    A chamada aguarda os orçamentos de requisições e tokens do modelo (LIMITS) e, em erros
+    transitórios (429, timeout, conexão, 5xx), volta à fila após uma espera exponencial com jitter.
+
+    Args:
+      call (Callable): Chamada repetida em erros transitórios (padrão: self.call).
+    """
+    if self.provider not in list(Provider):
+      print(f"[ERROR] Provedor desconhecido: {self.provider}")
+      return None, None, None, None, None, None, None
+
+    call = call or self.call
+    limiter = LIMITS.get(self.provider, self.model)
+    tokens = ESTIMATOR.count(self.prompt)
+    for attempt in range(limiter.max_retries + 1):
+      limiter.acquire(tokens)
+      try:
+        return call()
+      except RETRYABLE as e:
+        if attempt == limiter.max_retries:
+          print(f"[ERROR] Erro ao gerar resposta após {attempt + 1} tentativas: {e}")
+          return None, None, None, None, None, None, None
+        delay = limiter.backoff(attempt, e)
+        print(f"[WARNING] {type(e).__name__}: nova tentativa ({attempt + 1}/{limiter.max_retries}) em {delay:.2f} segundos.")
+        time.sleep(delay)
+
+  def call(self):
+    """Chama o provedor uma vez; erros transitórios (RETRYABLE) são propagados para request."""
     if self.provider == Provider.LM_STUDIO:
       return self.response_lmstudio()
     elif self.provider == Provider.OPENAI:
       return self.response_openai()
-    elif self.provider == Provider.AZURE:
-      return self.response_azure_openai()
-    else:
-      print(f"[ERROR] Provedor desconhecido: {self.provider}")
-      return None, None, None, None
+    return self.response_azure_openai()
 
-  def response_lmstudio(self):
+  def sample(self, k: int) -> tuple[list[str], int, int, float, int]:
+    """
+    Gera 'k' respostas independentes para o prompt (modo ensemble), sem cache de respostas nem streaming.
+
+    OpenAI e Azure recebem uma única requisição com o parâmetro n, em que o prompt é cobrado uma
+    só vez. As amostras que faltarem (servidores compatíveis que ignoram n) e as do LM Studio
+    são pedidas em chamadas paralelas pelo AsyncAPI, até o limite CONCURRENCY do provedor.
+
+    Returns:
+      tuple: (respostas obtidas, total_tokens_prompt, total_tokens_response, elapsed_time, cached_tokens_prompt),
+        com os tokens somados de todas as chamadas e o tempo total do ensemble.
+    """
+    self.cache_hit = False
+    self.load_time = None
+    start_time = time.time()
+    responses, total_tokens_prompt, total_tokens_response, total_tokens_cached = [], 0, 0, 0
+    if self.provider in (Provider.OPENAI, Provider.AZURE):
+      result = self.request(lambda: self.choices(k))
+      if result[0] is not None:
+        responses, total_tokens_prompt, total_tokens_response, _, total_tokens_cached = result
+
+    missing = k - len(responses)
+    if missing > 0:
+      async def run() -> list[dict]:
+        async with AsyncAPI(self.model, self.provider, self.temperature, use_cache=False) as api:
+          return await api.batch([self.prompt] * missing)
+      for result in run_sync(run()):
+        if result["response"] is not None:
+          responses.append(result["response"])
+          total_tokens_prompt += result["total_tokens_prompt"]
+          total_tokens_response += result["total_tokens_response"]
+          total_tokens_cached += result["cached_tokens"] or 0
+
+    elapsed = time.time() - start_time
+    print(f"[INFO] Ensemble: {len(responses)}/{k} amostras - Tokens Prompt: {total_tokens_prompt} - Tokens Resposta: {total_tokens_response} - Tempo: {elapsed:.2f} segundos")
+    return responses, total_tokens_prompt, total_tokens_response, elapsed, total_tokens_cached
+
+  def choices(self, k: int) -> tuple[list[str], int, int, float, int]:
+    """Pede 'k' respostas à OpenAI ou à Azure em uma única requisição (parâmetro n); erros transitórios são propagados para request."""
+    print(f"[INFO] Modelo: {self.model} - {k} amostras")
     try:
-      model_instance = lms.llm(self.model)
+      client = CLIENTS.get(self.provider, self.model)
+      start_time = time.time()
+      completion = client.chat.completions.create(
+        model=self.model,
+        messages=[{"role": "user", "content": self.prompt}],
+        temperature=self.temperature,
+        n=k,
+      )
+      end_time = time.time()
+      read = API.read_openai if self.provider == Provider.OPENAI else lambda model, *args: API.read_azure(*args)
+      # O usage soma o prompt (uma vez) e as respostas de todas as escolhas
+      results = [read(self.model, choice.message.content, completion.usage, end_time - start_time) for choice in completion.choices]
+      return [result[0] for result in results], *results[0][1:]
+    except RETRYABLE:
+      raise
+    except Exception as e:
+      print(f"[ERROR] Erro ao gerar respostas: {e}")
+      return None, None, None, None, None
+
+  def response_lmstudio(self) -> tuple[str, int, int, float, int, float, float]:
+    try:
+      # A carga do modelo (servidor frio ou modelo descarregado pelo TTL) fica fora do tempo de resposta
+      model_instance, self.load_time = HANDLES.get(self.model)
       print(f"[INFO] Modelo: {model_instance}")
 
       start_time = time.time()
-      response_obj = model_instance.respond(self.prompt, config={
-        "temperature": self.temperature,
-      })
+      first_token_time = horizon_time = None
+      if self.horizon is None:
+        response_obj = model_instance.respond(self.prompt, config={
+          "temperature": self.temperature,
+        })
+      else:
+        self.horizon.reset()
+        stream = model_instance.respond_stream(self.prompt, config={
+          "temperature": self.temperature,
+        })
+        for fragment in stream:
+          if first_token_time is None:
+            first_token_time = time.time() - start_time
+          if self.horizon.feed(fragment.content):
+            horizon_time = time.time() - start_time
+            stream.cancel()
+            break
+        response_obj = stream.wait_for_result()
       end_time = time.time()
 
       # Verifica se o objeto tem o atributo `.text`
       response = response_obj.text if hasattr(response_obj, 'text') else str(response_obj)
+      if self.horizon is not None:
+        response = self.horizon.text
 
       if 'deepseek-r1' in self.model:
         result_match = re.search(r'</think>\s*(.*)', response, re.DOTALL)
@@ -84,101 +250,153 @@ class API:
       total_tokens_prompt = response_obj.stats.prompt_tokens_count if hasattr(response_obj, "stats") else 0
       total_tokens_response = response_obj.stats.predicted_tokens_count if hasattr(response_obj, "stats") else 0
       print(f"[INFO] Tokens Prompt: {total_tokens_prompt} - Tokens Resposta: {total_tokens_response} - Tempo: {end_time - start_time:.2f} segundos")
-      return response, total_tokens_prompt, total_tokens_response, end_time - start_time
+      API.log_stream(first_token_time, horizon_time)
+      # O LM Studio reaproveita o prefixo em cache do modelo carregado, mas não informa quantos tokens vieram dele
+      return response, total_tokens_prompt, total_tokens_response, end_time - start_time, None, first_token_time, horizon_time
 
     except Exception as e:
+      # O modelo pode ter sido descarregado: o próximo get confere o servidor
+      HANDLES.invalidate(self.model)
       print(f"[ERROR] Erro ao gerar resposta: {e}")
-      return None, None, None, None
+      return None, None, None, None, None, None, None
 
-  def response_openai(self) -> tuple[str, int, int, float]:
-    print(f"[INFO] Modelo: {self.model}")
-    key_name = f'openai_{self.model}_key'.replace("-", "_").replace(".", "_")
-    base_url_name = f'openai_{self.model}_base_url'.replace("-", "_").replace(".", "_")
+  def stream_chat(self, client, start_time: float) -> tuple[str, CompletionUsage, float, float]:
+    """
+    Recebe a resposta de um chat.completions (OpenAI ou Azure) em streaming, alimentando o leitor do horizonte.
 
-    api_key = os.getenv(key_name)
-    base_url = os.getenv(base_url_name)
-    print(f"[INFO] Base URL: {base_url}")
+    Ao ler o horizonte o stream é fechado, o que interrompe a geração. Nesse caso o provedor não
+    chega a enviar o usage, e os tokens são estimados: o prompt pelo ESTIMATOR e a resposta pela
+    quantidade de fragmentos recebidos (cerca de um token cada).
 
-    client = OpenAI(
-      api_key=api_key,
-      base_url=base_url
+    Returns:
+      tuple: (texto, usage, tempo até o primeiro token, tempo até o horizonte ou None)
+    """
+    self.horizon.reset()
+    stream = client.chat.completions.create(
+      model=self.model,
+      messages=[{"role": "user", "content": self.prompt}],
+      temperature=self.temperature,
+      stream=True,
+      stream_options={"include_usage": True},
     )
+    usage, fragments = None, 0
+    first_token_time = horizon_time = None
+    try:
+      for chunk in stream:
+        if chunk.usage is not None:
+          usage = chunk.usage
+        if not chunk.choices or not chunk.choices[0].delta.content:
+          continue
+        fragments += 1
+        if first_token_time is None:
+          first_token_time = time.time() - start_time
+        if self.horizon.feed(chunk.choices[0].delta.content):
+          horizon_time = time.time() - start_time
+          break
+    finally:
+      stream.close()
 
+    if usage is None:
+      prompt_tokens = ESTIMATOR.count(self.prompt)
+      usage = CompletionUsage(prompt_tokens=prompt_tokens, completion_tokens=fragments, total_tokens=prompt_tokens + fragments)
+      print("[INFO] Stream interrompido antes do usage: tokens estimados.")
+    return self.horizon.text, usage, first_token_time, horizon_time
+
+  @staticmethod
+  def log_stream(first_token_time: float, horizon_time: float) -> None:
+    """Registra os tempos até o primeiro token e até o horizonte de uma resposta em streaming."""
+    if first_token_time is not None:
+      horizon = f"{horizon_time:.2f} segundos" if horizon_time is not None else "não atingido"
+      print(f"[INFO] Primeiro token: {first_token_time:.2f} segundos - Horizonte: {horizon}")
+
+  def response_openai(self) -> tuple[str, int, int, float, int, float, float]:
+    print(f"[INFO] Modelo: {self.model}")
     try:
+      client = CLIENTS.get(Provider.OPENAI, self.model)
       start_time = time.time()
-      response = client.chat.completions.create(
-        model=self.model,
-        messages=[{"role": "user", "content": self.prompt}],
-        temperature=self.temperature,
-      )
+      first_token_time = horizon_time = None
+      if self.horizon is None:
+        completion = client.chat.completions.create(
+          model=self.model,
+          messages=[{"role": "user", "content": self.prompt}],
+          temperature=self.temperature,
+        )
+        content, usage = completion.choices[0].message.content, completion.usage
+      else:
+        content, usage, first_token_time, horizon_time = self.stream_chat(client, start_time)
       end_time = time.time()
+      API.log_stream(first_token_time, horizon_time)
+      return API.read_openai(self.model, content, usage, end_time - start_time) + (first_token_time, horizon_time)
+    except RETRYABLE:
+      raise
+    except Exception as e:
+      print(f"[ERROR] Erro ao gerar resposta: {e}")
+      return None, None, None, None, None, None, None
 
-      response = response.choices[0].message.content
-
-      if self.model == "deepseek-r1-distill-llama-70b":
-        match = re.search(r'</think>\s*(.*)', response, re.DOTALL)
-        if match:
-          response = match.group(1).strip()
-        else:
-          response = response.strip()
+  @staticmethod
+  def read_openai(model: str, response: str, usage: CompletionUsage, elapsed: float) -> tuple[str, int, int, float, int]:
+    """Extrai a resposta e os tokens de um chat.completions da OpenAI (ou compatível, como o Ollama)."""
+    if model == "deepseek-r1-distill-llama-70b":
+      match = re.search(r'</think>\s*(.*)', response, re.DOTALL)
+      if match:
+        response = match.group(1).strip()
       else:
         response = response.strip()
+    else:
+      response = response.strip()
 
-      if self.model == "deepseek-r1-distill-llama-70b":
-        total_tokens_prompt = response.usage.total_tokens
-        total_tokens_response = response.usage.prompt_tokens
-      else:
-        total_tokens_prompt = response.usage.prompt_tokens
-        total_tokens_response = response.usage.completion_tokens
+    if model == "deepseek-r1-distill-llama-70b":
+      total_tokens_prompt = usage.total_tokens
+      total_tokens_response = usage.prompt_tokens
+    else:
+      total_tokens_prompt = usage.prompt_tokens
+      total_tokens_response = usage.completion_tokens
+    total_tokens_cached = cached_tokens(usage)
 
-      print(f"[INFO] Resposta: {response}")
-      print(f"[INFO] Tokens Prompt: {total_tokens_prompt} - Tokens Resposta: {total_tokens_response} - Tempo: {end_time - start_time:.2f} segundos")
-      return response, total_tokens_prompt, total_tokens_response, end_time - start_time
-    except Exception as e:
-      print(f"[ERROR] Erro ao gerar resposta: {e}")
-      return None, None, None, None
+    print(f"[INFO] Resposta: {response}")
+    print(f"[INFO] Tokens Prompt: {total_tokens_prompt} ({total_tokens_cached} em cache) - Tokens Resposta: {total_tokens_response} - Tempo: {elapsed:.2f} segundos")
+    return response, total_tokens_prompt, total_tokens_response, elapsed, total_tokens_cached
 
-  def response_azure_openai(self) -> tuple[str, int, int, float]:
+  def response_azure_openai(self) -> tuple[str, int, int, float, int, float, float]:
     print(f"[INFO] Modelo: {self.model}")
-    key_name = f'azure_{self.model}_key'.replace("-", "_").replace(".", "_")
-    version_name = f'azure_{self.model}_api_version'.replace("-", "_").replace(".", "_")
-    endpoint_name = f'azure_{self.model}_endpoint'.replace("-", "_").replace(".", "_")
-
-    api_key = os.getenv(key_name)
-    api_version = os.getenv(version_name)
-    endpoint = os.getenv(endpoint_name)
-    print(f"[INFO] API Version: {api_version}")
-    print(f"[INFO] Endpoint: {endpoint}")
-
-    client = AzureOpenAI(
-      api_key=api_key,
-      azure_endpoint=endpoint,
-      api_version=api_version
-    )
-
     try:
+      client = CLIENTS.get(Provider.AZURE, self.model)
       start_time = time.time()
-      response = client.chat.completions.create(
-        model=self.model,
-        messages=[{"role": "user", "content": self.prompt}],
-        temperature=self.temperature,
-      )
+      first_token_time = horizon_time = None
+      if self.horizon is None:
+        response = client.chat.completions.create(
+          model=self.model,
+          messages=[{"role": "user", "content": self.prompt}],
+          temperature=self.temperature,
+        )
+        content, usage = response.choices[0].message.content, response.usage
+      else:
+        content, usage, first_token_time, horizon_time = self.stream_chat(client, start_time)
       end_time = time.time()
-      response_text = response.choices[0].message.content
-      print(f"[INFO] Resposta: {response_text}")
-      total_tokens_prompt = response.usage.prompt_tokens
-      total_tokens_response = response.usage.completion_tokens
-      print(f"[INFO] Tokens Prompt: {total_tokens_prompt} - Tokens Resposta: {total_tokens_response} - Tempo: {end_time - start_time:.2f} segundos")
-      return response_text, total_tokens_prompt, total_tokens_response, end_time - start_time
+      API.log_stream(first_token_time, horizon_time)
+      return API.read_azure(content, usage, end_time - start_time) + (first_token_time, horizon_time)
+    except RETRYABLE:
+      raise
     except Exception as e:
       print(f"[ERROR] Erro ao gerar resposta: {e}")
-      return None, None, None, None
+      return None, None, None, None, None, None, None
+
+  @staticmethod
+  def read_azure(response_text: str, usage: CompletionUsage, elapsed: float) -> tuple[str, int, int, float, int]:
+    """Extrai a resposta e os tokens de um chat.completions da OpenAI Azure."""
+    print(f"[INFO] Resposta: {response_text}")
+    total_tokens_prompt = usage.prompt_tokens
+    total_tokens_response = usage.completion_tokens
+    total_tokens_cached = cached_tokens(usage)
+    print(f"[INFO] Tokens Prompt: {total_tokens_prompt} ({total_tokens_cached} em cache) - Tokens Resposta: {total_tokens_response} - Tempo: {elapsed:.2f} segundos")
+    return response_text, total_tokens_prompt, total_tokens_response, elapsed, total_tokens_cached
 
   @staticmethod
-  def mock(periods: int, ts_format: TSFormat, ts_type: TSType) -> tuple[str, int, int, float]:
+  def mock(periods: int, ts_format: TSFormat, ts_type: TSType) -> tuple[str, int, int, float, int, float, float]:
     response_time = round(random.uniform(0.5, 2.5), 2)
     total_tokens_prompt = random.randint(10, 500)
     total_tokens_response = random.randint(10, 500)
+    total_tokens_cached = 0
 
     # Gera uma resposta aleatória
     dates = pd.date_range(start='2018-01-01', periods=periods, freq='D')
@@ -191,4 +409,132 @@ class API:
     time.sleep(response_time * 0.1) # Tempo de espera
     print(f"[MOCK] Resposta:\n{response}")
     print(f"[MOCK] Tokens Prompt: {total_tokens_prompt} - Tokens Resposta: {total_tokens_response} - Tempo: {response_time} segundos")
-    return response, total_tokens_prompt, total_tokens_response, response_time
+    return response, total_tokens_prompt, total_tokens_response, response_time, total_tokens_cached, None, None
+
+class AsyncAPI:
+  def __init__(self, model: str, provider: Provider, temperature: float, use_cache: bool = True):
+    """
+    Versão assíncrona do API, para enviar muitos prompts ao mesmo modelo em paralelo.
+
+    OpenAI e Azure usam os clientes AsyncOpenAI/AsyncAzureOpenAI; o LM Studio executa o
+    cliente síncrono do registro em threads. O cache de respostas é consultado como no API.
+    Use como 'async with AsyncAPI(...) as api:' (ou chame close) para fechar as conexões.
+
+    Args:
+      model (str): Modelo a ser utilizado.
+      provider (Provider): Provedor da API (lmstudio, openai, azure).
+      temperature (float): Temperatura do modelo.
+      use_cache (bool): Se True, repete a resposta gravada para a mesma requisição.
+    """
+    self.model = model
+    self.provider = Provider(provider)
+    self.temperature = temperature
+    self.use_cache = use_cache
+    self.client = None
+
+  async def __aenter__(self) -> 'AsyncAPI':
+    return self
+
+  async def __aexit__(self, *args) -> None:
+    await self.close()
+
+  async def close(self) -> None:
+    """Fecha as conexões do cliente assíncrono, se ele foi criado."""
+    if self.client is not None:
+      await self.client.close()
+      self.client = None
+
+  async def response(self, prompt: str) -> tuple[tuple, bool]:
+    """
+    Gera a resposta do modelo para o prompt, consultando antes o cache de respostas.
+
+    Returns:
+      tuple: (resultado no formato de API.response, cache_hit)
+    """
+    key = ResponseCache.key(self.model, self.provider, self.temperature, prompt) if self.use_cache else None
+    if key is not None:
+      cached = await asyncio.to_thread(RESPONSES.get, key)
+      if cached is not None:
+        print(f"[INFO] Resposta recuperada do cache de respostas ({key[:12]}).")
+        return cached, True
+
+    result = await self.request(prompt)
+    if key is not None and result[0] is not None:
+      await asyncio.to_thread(RESPONSES.put, key, self.model, self.provider, self.temperature, prompt, result)
+    return result, False
+
+  async def request(self, prompt: str) -> tuple[str, int, int, float, int, float, float]:
+    """
+    Chama o provedor, sem passar pelo cache nem por streaming (os tempos até o primeiro token e o horizonte ficam None).
+
+    Respeita o limitador do modelo e repete erros transitórios como API.request.
+    """
+    if self.provider == Provider.LM_STUDIO:
+      return await asyncio.to_thread(API(self.model, self.provider, prompt, self.temperature, use_cache=False).request)
+
+    limiter = LIMITS.get(self.provider, self.model)
+    tokens = ESTIMATOR.count(prompt)
+    for attempt in range(limiter.max_retries + 1):
+      await limiter.acquire_async(tokens)
+      try:
+        if self.client is None:
+          self.client = CLIENTS.create_async(self.provider, self.model)
+        start_time = time.time()
+        completion = await self.client.chat.completions.create(
+          model=self.model,
+          messages=[{"role": "user", "content": prompt}],
+          temperature=self.temperature,
+        )
+        end_time = time.time()
+        content, usage = completion.choices[0].message.content, completion.usage
+        if self.provider == Provider.OPENAI:
+          return API.read_openai(self.model, content, usage, end_time - start_time) + (None, None)
+        return API.read_azure(content, usage, end_time - start_time) + (None, None)
+      except RETRYABLE as e:
+        if attempt == limiter.max_retries:
+          print(f"[ERROR] Erro ao gerar resposta após {attempt + 1} tentativas: {e}")
+          return None, None, None, None, None, None, None
+        delay = limiter.backoff(attempt, e)
+        print(f"[WARNING] {type(e).__name__}: nova tentativa ({attempt + 1}/{limiter.max_retries}) em {delay:.2f} segundos.")
+        await asyncio.sleep(delay)
+      except Exception as e:
+        print(f"[ERROR] Erro ao gerar resposta: {e}")
+        return None, None, None, None, None, None, None
+
+  async def batch(self, prompts: list[str], concurrency: int = None) -> list[dict]:
+    """
+    Envia vários prompts com no máximo 'concurrency' requisições simultâneas.
+
+    Args:
+      prompts (list[str]): Prompts a serem enviados.
+      concurrency (int): Limite de requisições simultâneas (padrão: CONCURRENCY do provedor).
+
+    Returns:
+      list[dict]: Um resultado por prompt, na ordem de entrada, com response, total_tokens_prompt,
+        total_tokens_response, response_time (da chamada ao provedor), cached_tokens, cache_hit,
+        queue_time (espera por uma vaga) e total_time (espera + chamada).
+    """
+    semaphore = asyncio.Semaphore(concurrency or CONCURRENCY[self.provider])
+
+    async def run(prompt: str) -> dict:
+      queued = time.perf_counter()
+      async with semaphore:
+        started = time.perf_counter()
+        result, cache_hit = await self.response(prompt)
+      finished = time.perf_counter()
+      return {
+        "response": result[0],
+        "total_tokens_prompt": result[1],
+        "total_tokens_response": result[2],
+        "response_time": result[3],
+        "cached_tokens": result[4],
+        "cache_hit": cache_hit,
+        "queue_time": started - queued,
+        "total_time": finished - queued,
+      }
+
+    start_time = time.time()
+    results = await asyncio.gather(*(run(prompt) for prompt in prompts))
+    failed = sum(r["response"] is None for r in results)
+    print(f"[INFO] Lote de {len(prompts)} prompts concluído em {time.time() - start_time:.2f} segundos ({failed} falhas).")
+    return results
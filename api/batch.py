@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import numpy as np
+from pathlib import Path
+from contextlib import closing
+from openai.types.chat import ChatCompletion
+
+from api.api import API, Provider
+from api.cache import ResponseCache, RESPONSES
+from api.clients import CLIENTS
+from database.crud_history import CrudHistory
+from database.schema_tables import DATABASE_PATH, BATCHES_SCHEMA
+from src.model.prompt import PromptModel
+from src.model.format import TSFormat, TSType, Scale, parse_timeseries
+from src.model.metrics import Metrics
+
+BATCH_DIR = Path(os.getenv("BATCH_DIR", "./database/batches"))
+
+# Rota do chat.completions nas linhas do arquivo e na criação do lote (o LM Studio não tem Batch API)
+BATCH_ENDPOINTS = {
+  Provider.OPENAI: "/v1/chat/completions",
+  Provider.AZURE: "/chat/completions",
+}
+
+# Estados em que o lote não muda mais; lotes que terminam sem sucesso podem ser reenviados
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+class BatchJob:
+  def __init__(self, model: str, provider: Provider, temperature: float, directory: Path = BATCH_DIR):
+    """
+    Previsões enviadas em lote às Batch APIs da OpenAI e da Azure, para backtests longos.
+
+    Os prompts dos PromptModel são gravados em um arquivo JSONL (um chat.completions por linha)
+    ao lado de um manifesto com os campos do histórico de cada previsão. O arquivo é enviado,
+    o lote é consultado até terminar e as respostas são convertidas em registros do history.
+    Cada previsão tem um request_key determinístico (custom_id no lote): previsões já importadas
+    não são reenviadas, o mesmo conjunto pendente reaproveita o lote já enviado e importar de
+    novo não duplica registros.
+
+    Args:
+      model (str): Modelo (ou deployment, na Azure) a ser utilizado.
+      provider (Provider): Provedor da API (openai ou azure).
+      temperature (float): Temperatura do modelo.
+      directory (Path): Pasta dos arquivos de entrada e dos manifestos.
+
+    Raises:
+      ValueError: Se o provedor não tiver Batch API.
+    """
+    self.model = model
+    self.provider = Provider(provider)
+    if self.provider not in BATCH_ENDPOINTS:
+      raise ValueError(f"O provedor {self.provider} não tem Batch API.")
+    self.temperature = temperature
+    self.directory = Path(directory)
+    self.items = {}
+    self.batch_id = None
+    self.name = None
+    self.pending = 0
+
+  @staticmethod
+  def key(model: str, provider: str, temperature: float, prompt: str, dataset: str, series_id: str = None) -> str:
+    """Retorna o request_key de uma previsão: o SHA-256 da requisição, do dataset e da série."""
+    payload = json.dumps([str(provider), model, float(temperature), prompt, dataset, series_id], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+  @staticmethod
+  def connect() -> sqlite3.Connection:
+    """Abre uma conexão com o banco, criando a tabela batches se ela ainda não existe."""
+    connection = sqlite3.connect(DATABASE_PATH)
+    connection.execute(BATCHES_SCHEMA.format(table_name="batches"))
+    return connection
+
+  def add(
+    self, model: PromptModel, y_true: list, dataset: str, start_date: str = None, end_date: str = None,
+    context: dict = None
+  ) -> str:
+    """
+    Acrescenta ao lote o prompt gerado pelo PromptModel.
+
+    Args:
+      model (PromptModel): Prompt da previsão.
+      y_true (list): Valores exatos do horizonte.
+      dataset (str): Dataset de origem da janela.
+      start_date (str): Início do recorte (padrão: primeira data da janela).
+      end_date (str): Fim do recorte (padrão: última data da janela).
+      context (dict): Registro do ajuste ao contexto (fit_context), se houve.
+
+    Returns:
+      str: request_key da previsão.
+    """
+    prompt = model.generate(verbose=False)
+    key = BatchJob.key(self.model, self.provider, self.temperature, prompt, dataset, model.series_id)
+    dates = np.datetime_as_string(model.window.dates[[0, -1]], unit="D") if start_date is None or end_date is None else None
+    scale = model.scale
+    self.items[key] = {
+      "prompt": prompt,
+      "dataset": dataset,
+      "series_id": model.series_id,
+      "start_date": str(start_date if start_date is not None else dates[0]),
+      "end_date": str(end_date if end_date is not None else dates[1]),
+      "periods": model.periods,
+      "prompt_type": model.prompt_type.value,
+      "ts_format": model.ts_format.value,
+      "ts_type": model.ts_type.value,
+      "prompt_layout": model.layout.value,
+      "y_true": [round(float(v), 3) for v in y_true],
+      "scale": [scale.low, scale.high, scale.last, scale.digits, scale.levels] if scale is not None else None,
+      "reduction": context["reduction"].value if context else None,
+      "window_points": context["points"] if context else None,
+      "original_points": context["original_points"] if context else None,
+      "tokens_saved": context["tokens_saved"] if context else 0,
+    }
+    return key
+
+  def write(self) -> Path:
+    """
+    Grava o arquivo JSONL com as previsões ainda não importadas e o seu manifesto.
+
+    O nome do arquivo é derivado dos request_key pendentes, então o mesmo conjunto gera
+    sempre o mesmo arquivo. Retorna None se todas as previsões já estão no histórico.
+    """
+    done = CrudHistory().keys(list(self.items))
+    pending = {key: item for key, item in self.items.items() if key not in done}
+    if done:
+      print(f"[INFO] {len(done)} previsões já importadas ficam fora do lote.")
+    self.pending = len(pending)
+    if not pending:
+      return None
+
+    self.name = hashlib.sha256("\n".join(sorted(pending)).encode("utf-8")).hexdigest()[:16]
+    self.directory.mkdir(parents=True, exist_ok=True)
+    path = self.directory / f"{self.name}.jsonl"
+    with open(path, "w", encoding="utf-8") as file:
+      for key, item in pending.items():
+        file.write(json.dumps({
+          "custom_id": key,
+          "method": "POST",
+          "url": BATCH_ENDPOINTS[self.provider],
+          "body": {
+            "model": self.model,
+            "messages": [{"role": "user", "content": item["prompt"]}],
+            "temperature": self.temperature,
+          },
+        }, ensure_ascii=False) + "\n")
+    with open(self.directory / f"{self.name}.manifest.json", "w", encoding="utf-8") as file:
+      json.dump({"model": self.model, "provider": self.provider.value, "temperature": self.temperature, "items": pending}, file, ensure_ascii=False)
+    print(f"[INFO] Lote gravado em {path} ({len(pending)} previsões).")
+    return path
+
+  def submit(self) -> str:
+    """
+    Envia o lote e retorna o seu id (None se não há previsões pendentes).
+
+    Se o mesmo arquivo já foi enviado e o lote não falhou, expirou nem foi cancelado, o lote
+    existente é reaproveitado em vez de pagar as mesmas previsões de novo.
+    """
+    path = self.write()
+    if path is None:
+      print("[INFO] Nenhuma previsão pendente para enviar.")
+      return None
+
+    with closing(BatchJob.connect()) as connection:
+      row = connection.execute(
+        f"SELECT id, status FROM batches WHERE name = ? AND status NOT IN ({','.join(['?'] * len(FAILED_STATUSES))}) ORDER BY created_at DESC",
+        (self.name, *FAILED_STATUSES)
+      ).fetchone()
+    if row is not None:
+      self.batch_id = row[0]
+      print(f"[INFO] Lote {self.batch_id} já enviado com este arquivo ({row[1]}).")
+      return self.batch_id
+
+    client = CLIENTS.get(self.provider, self.model)
+    with open(path, "rb") as file:
+      input_file = client.files.create(file=file, purpose="batch")
+    batch = client.batches.create(
+      input_file_id=input_file.id,
+      endpoint=BATCH_ENDPOINTS[self.provider],
+      completion_window="24h",
+    )
+    self.batch_id = batch.id
+    with closing(BatchJob.connect()) as connection:
+      connection.execute(
+        "INSERT INTO batches (id, name, provider, model, temperature, input_file_id, status, requests, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (batch.id, self.name, self.provider.value, self.model, self.temperature, input_file.id, batch.status, self.pending, batch.created_at)
+      )
+      connection.commit()
+    print(f"[INFO] Lote {batch.id} enviado ({batch.status}).")
+    return self.batch_id
+
+  @staticmethod
+  def resume(batch_id: str, directory: Path = BATCH_DIR) -> 'BatchJob':
+    """Recupera um lote enviado anteriormente (por exemplo, em outra execução) para consultar e importar."""
+    with closing(BatchJob.connect()) as connection:
+      row = connection.execute("SELECT model, provider, temperature, name FROM batches WHERE id = ?", (batch_id,)).fetchone()
+    if row is None:
+      raise ValueError(f"Lote {batch_id} não encontrado na tabela batches.")
+    job = BatchJob(row[0], row[1], row[2], directory)
+    job.batch_id, job.name = batch_id, row[3]
+    return job
+
+  def poll(self) -> dict:
+    """Consulta o lote no provedor, atualiza a tabela batches e retorna o estado e as contagens."""
+    batch = CLIENTS.get(self.provider, self.model).batches.retrieve(self.batch_id)
+    counts = batch.request_counts
+    with closing(BatchJob.connect()) as connection:
+      connection.execute(
+        "UPDATE batches SET status = ?, output_file_id = ?, error_file_id = ?, completed_at = ? WHERE id = ?",
+        (batch.status, batch.output_file_id, batch.error_file_id, batch.completed_at, self.batch_id)
+      )
+      connection.commit()
+    state = {
+      "status": batch.status,
+      "completed": counts.completed if counts else 0,
+      "failed": counts.failed if counts else 0,
+      "total": counts.total if counts else 0,
+    }
+    print(f"[INFO] Lote {self.batch_id}: {state['status']} ({state['completed']}/{state['total']} concluídas, {state['failed']} falhas).")
+    return state
+
+  def wait(self, interval: float = 60.0, timeout: float = None) -> str:
+    """Consulta o lote a cada 'interval' segundos até ele terminar (ou até 'timeout') e retorna o estado."""
+    start_time = time.time()
+    while True:
+      status = self.poll()["status"]
+      if status in FINAL_STATUSES:
+        return status
+      if timeout is not None and time.time() - start_time + interval > timeout:
+        print(f"[WARNING] Lote {self.batch_id} ainda em andamento após {timeout:.0f} segundos.")
+        return status
+      time.sleep(interval)
+
+  def collect(self) -> int:
+    """
+    Importa as respostas do lote para a tabela history e retorna a quantidade de registros inseridos.
+
+    Cada resposta é lida como em API.response, convertida pelos campos do manifesto (formato,
+    tipo, escala) e avaliada contra os valores exatos. O response_time de cada registro é o
+    tempo entre o envio e a conclusão do lote. As respostas também entram no cache de respostas,
+    para que uma previsão síncrona com o mesmo prompt não chame o provedor. Linhas com erro
+    ficam fora do histórico e voltam ao próximo lote com as mesmas previsões.
+    """
+    with closing(BatchJob.connect()) as connection:
+      row = connection.execute(
+        "SELECT status, output_file_id, error_file_id, created_at, completed_at FROM batches WHERE id = ?",
+        (self.batch_id,)
+      ).fetchone()
+    if row is None or row[1] is None:
+      print(f"[WARNING] Lote {self.batch_id} sem arquivo de saída ({row[0] if row else 'não encontrado'}).")
+      return 0
+    status, output_file_id, error_file_id, created_at, completed_at = row
+    with open(self.directory / f"{self.name}.manifest.json", encoding="utf-8") as file:
+      items = json.load(file)["items"]
+
+    client = CLIENTS.get(self.provider, self.model)
+    read = API.read_openai if self.provider == Provider.OPENAI else lambda model, *args: API.read_azure(*args)
+    elapsed = (completed_at or time.time()) - created_at
+    rows, failed = [], 0
+    for line in client.files.content(output_file_id).text.splitlines():
+      if not line.strip():
+        continue
+      record = json.loads(line)
+      item = items.get(record.get("custom_id"))
+      response = record.get("response") or {}
+      if item is None or record.get("error") or response.get("status_code") != 200:
+        failed += 1
+        continue
+
+      completion = ChatCompletion.model_validate(response["body"])
+      content = completion.choices[0].message.content if completion.choices else None
+      if content is None:
+        # Recusa ou chamada de ferramenta: não há texto com a previsão
+        print(f"[WARNING] Resposta sem texto no lote {self.batch_id} ({record['custom_id']}).")
+        failed += 1
+        continue
+      result = read(self.model, content, completion.usage, elapsed)
+      RESPONSES.put(ResponseCache.key(self.model, self.provider, self.temperature, item["prompt"]), self.model, self.provider, self.temperature, item["prompt"], result + (None, None))
+
+      ts_format, ts_type = TSFormat(item["ts_format"]), TSType(item["ts_type"])
+      scale = Scale(*item["scale"]) if item["scale"] is not None else None
+      y_pred = parse_timeseries(result[0], ts_format, ts_type, item["periods"], scale).tolist()
+      metrics = Metrics(y_true=item["y_true"], y_pred=y_pred)
+      rows.append({
+        **{k: v for k, v in item.items() if k not in ("scale", "y_true")},
+        "model": self.model,
+        "temperature": self.temperature,
+        "y_true": str(item["y_true"]),
+        "y_pred": str(y_pred),
+        "smape": metrics.smape(),
+        "mae": metrics.mae(),
+        "rmse": metrics.rmse(),
+        "total_tokens_prompt": result[1],
+        "total_tokens_response": result[2],
+        "total_tokens": result[1] + result[2],
+        "response_time": result[3],
+        "cached_tokens": result[4],
+        "request_key": record["custom_id"],
+      })
+
+    if error_file_id is not None:
+      failed += sum(1 for line in client.files.content(error_file_id).text.splitlines() if line.strip())
+    inserted = CrudHistory().insert_many(rows) if rows else 0
+    with closing(BatchJob.connect()) as connection:
+      connection.execute("UPDATE batches SET imported = imported + ? WHERE id = ?", (inserted, self.batch_id))
+      connection.commit()
+    print(f"[INFO] Lote {self.batch_id} ({status}): {inserted} registros importados, {len(rows) - inserted} já existentes, {failed} falhas.")
+    return inserted
+
+  def run(self, interval: float = 60.0, timeout: float = None) -> int:
+    """
+    Envia o lote, aguarda o fim e importa as respostas; retorna os registros inseridos.
+
+    Lotes expirados ou cancelados também são importados, com as previsões que chegaram a ser concluídas.
+    """
+    if self.submit() is None:
+      return 0
+    if self.wait(interval, timeout) not in FINAL_STATUSES:
+      return 0
+    return self.collect()
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+
+from database.schema_tables import RESPONSES_SCHEMA
+
+class ResponseCache:
+  def __init__(self, db_path: str, max_bytes: int):
+    """
+    Cache persistente das respostas dos modelos, endereçado pelo conteúdo da requisição.
+
+    A chave é o SHA-256 do provedor, do modelo, da temperatura e do prompt, de modo que repetir
+    a mesma requisição (reabrir o histórico, retomar um benchmark interrompido) devolve a
+    resposta gravada sem chamar o provedor. As respostas ficam numa tabela SQLite ao lado de
+    database.db; acima de 'max_bytes' (tamanho das respostas e dos prompts) as menos usadas
+    recentemente são descartadas.
+
+    Args:
+      db_path (str): Caminho do arquivo SQLite do cache.
+      max_bytes (int): Orçamento máximo, em bytes, das respostas em cache.
+    """
+    self.db_path = db_path
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.lock = threading.Lock()
+    self.ready = False
+
+  @staticmethod
+  def key(model: str, provider: str, temperature: float, prompt: str) -> str:
+    """Retorna o hash SHA-256 dos parâmetros da requisição e do prompt (o provedor pelo valor, como 'openai' ou Provider.OPENAI)."""
+    payload = json.dumps([getattr(provider, "value", provider), model, float(temperature), prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+  def connect(self) -> sqlite3.Connection:
+    """Abre uma conexão com o banco do cache, criando a tabela na primeira vez (chamar com o lock adquirido)."""
+    connection = sqlite3.connect(self.db_path)
+    if not self.ready:
+      connection.execute(RESPONSES_SCHEMA.format(table_name="responses"))
+      connection.commit()
+      self.ready = True
+    return connection
+
+  def get(self, key: str) -> tuple:
+    """Retorna a resposta gravada para a chave no formato de API.response ou None."""
+    with self.lock:
+      try:
+        with closing(self.connect()) as connection:
+          row = connection.execute(
+            "SELECT response, total_tokens_prompt, total_tokens_response, response_time, cached_tokens, time_to_first_token, time_to_horizon FROM responses WHERE key = ?",
+            (key,)
+          ).fetchone()
+          if row is None:
+            self.misses += 1
+            return None
+          connection.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+          connection.commit()
+          self.hits += 1
+          return row
+      except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao consultar o cache de respostas: {e}")
+        return None
+
+  def put(self, key: str, model: str, provider: str, temperature: float, prompt: str, result: tuple) -> None:
+    """
+    Grava o resultado de API.response e descarta as respostas menos usadas acima do orçamento.
+
+    Respostas em streaming cortadas no horizonte (time_to_horizon informado) não são gravadas:
+    a chave não distingue o streaming, e o texto truncado seria servido depois como a resposta completa.
+    """
+    response = result[0]
+    if result[6] is not None:
+      return
+    size = len(response.encode("utf-8")) + len(prompt.encode("utf-8"))
+    if size > self.max_bytes:
+      return
+    now = time.time()
+    with self.lock:
+      try:
+        with closing(self.connect()) as connection:
+          connection.execute(
+            """
+            INSERT OR REPLACE INTO responses (
+              key, model, provider, temperature, response, total_tokens_prompt, total_tokens_response,
+              response_time, cached_tokens, time_to_first_token, time_to_horizon, size, created_at, used_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (key, model, getattr(provider, "value", provider), temperature, *result, size, now, now)
+          )
+          total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+          if total > self.max_bytes:
+            # Percorre do menos usado para o mais usado até liberar o excedente
+            evicted, freed = [], 0
+            for old, old_size in connection.execute("SELECT key, size FROM responses ORDER BY used_at"):
+              if total - freed <= self.max_bytes:
+                break
+              evicted.append((old,))
+              freed += old_size
+            connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self.evictions += len(evicted)
+          connection.commit()
+      except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao gravar no cache de respostas: {e}")
+
+  def clear(self) -> None:
+    """Remove todas as respostas do cache."""
+    with self.lock:
+      try:
+        with closing(self.connect()) as connection:
+          connection.execute("DELETE FROM responses")
+          connection.commit()
+      except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao limpar o cache de respostas: {e}")
+
+  def stats(self) -> dict:
+    """Retorna os contadores de uso do cache (desta execução) e o tamanho gravado."""
+    with self.lock:
+      entries, size = 0, 0
+      try:
+        with closing(self.connect()) as connection:
+          entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+      except sqlite3.Error as e:
+        print(f"[ERROR] Erro ao consultar o cache de respostas: {e}")
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": self.max_bytes,
+      }
+
+RESPONSES = ResponseCache(
+  db_path=os.getenv("RESPONSE_CACHE_PATH", "./database/responses.db"),
+  max_bytes=int(os.getenv("RESPONSE_CACHE_BYTES", str(256 * 1024 * 1024)))
+)
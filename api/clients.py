@@ -0,0 +1,143 @@
+import os
+import threading
+from dotenv import load_dotenv, find_dotenv
+
+import lmstudio as lms
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI
+
+def env_name(provider: str, model: str, field: str) -> str:
+  """Nome da variável de ambiente de um campo da configuração do modelo (ex.: openai_gpt_4o_key)."""
+  return f'{provider}_{model}_{field}'.replace("-", "_").replace(".", "_")
+
+# Campos lidos do ambiente por provedor; base_url (OpenAI) ou endpoint (Azure) entram na chave do registro
+CONFIG_FIELDS = {
+  'lmstudio': [],
+  'openai': ['key', 'base_url'],
+  'azure': ['key', 'endpoint', 'api_version'],
+}
+
+# As novas tentativas ficam a cargo do limitador (api/limits.py), por isso os clientes usam max_retries=0.
+# Modelos carregados pelo LM Studio são descarregados após LMSTUDIO_TTL segundos sem uso (ver api/handles.py).
+CLIENT_FACTORIES = {
+  'lmstudio': lambda model, config: lms.llm(model, ttl=int(os.getenv('LMSTUDIO_TTL', '3600'))),
+  'openai': lambda model, config: OpenAI(api_key=config['key'], base_url=config['base_url'], max_retries=0),
+  'azure': lambda model, config: AzureOpenAI(api_key=config['key'], azure_endpoint=config['endpoint'], api_version=config['api_version'], max_retries=0),
+}
+
+# O LM Studio não tem cliente assíncrono: o AsyncAPI executa o cliente síncrono em threads
+ASYNC_CLIENT_FACTORIES = {
+  'openai': lambda model, config: AsyncOpenAI(api_key=config['key'], base_url=config['base_url'], max_retries=0),
+  'azure': lambda model, config: AsyncAzureOpenAI(api_key=config['key'], azure_endpoint=config['endpoint'], api_version=config['api_version'], max_retries=0),
+}
+
+class ClientPool:
+  def __init__(self):
+    """
+    Registro dos clientes dos provedores, reaproveitados entre chamadas.
+
+    Cada cliente é indexado por (provedor, modelo, endpoint) e mantém o seu pool de conexões
+    HTTP keep-alive (OpenAI/Azure) ou o handle do modelo carregado (LM Studio), evitando um
+    novo handshake TCP/TLS e a consulta às variáveis de ambiente a cada previsão. Quando o
+    arquivo .env é alterado ele é recarregado, e os clientes cuja configuração mudou são
+    fechados e recriados na próxima chamada.
+    """
+    self.clients = {}
+    self.env_mtime = None
+    self.created = 0
+    self.reused = 0
+    self.lock = threading.Lock()
+    self.refresh()
+
+  def refresh(self) -> None:
+    """
+    Recarrega o .env se ele foi alterado desde a última leitura (chamar com o lock adquirido).
+
+    A primeira leitura não sobrescreve as variáveis já definidas no processo; as seguintes
+    sobrescrevem, para que as alterações feitas na página de configurações valham sem reiniciar.
+    """
+    path = find_dotenv()
+    mtime = os.path.getmtime(path) if path else None
+    if mtime != self.env_mtime:
+      load_dotenv(path, override=self.env_mtime is not None)
+      self.env_mtime = mtime
+
+  @staticmethod
+  def config(provider: str, model: str) -> dict:
+    """Lê do ambiente a configuração do modelo no provedor."""
+    return {field: os.getenv(env_name(provider, model, field)) for field in CONFIG_FIELDS[provider]}
+
+  def get(self, provider: str, model: str):
+    """
+    Retorna o cliente do modelo no provedor, criando-o (ou recriando-o se a configuração mudou).
+
+    O cliente é criado fora do lock, já que no LM Studio isso carrega o modelo no servidor e não
+    deve bloquear os clientes dos demais modelos. Se outra thread registrar o mesmo cliente
+    nesse meio tempo, o registrado prevalece e o criado aqui é fechado.
+    """
+    provider = str(getattr(provider, 'value', provider))
+    with self.lock:
+      self.refresh()
+      config = ClientPool.config(provider, model)
+      key = (provider, model, config.get('base_url') or config.get('endpoint'))
+      entry = self.clients.get(key)
+      if entry is not None and entry[0] == config:
+        self.reused += 1
+        return entry[1]
+
+    client = CLIENT_FACTORIES[provider](model, config)
+    with self.lock:
+      entry = self.clients.get(key)
+      if entry is not None and entry[0] == config:
+        self.reused += 1
+        ClientPool.close(client)
+        return entry[1]
+      # Descarta os clientes do mesmo modelo criados com uma configuração anterior
+      for old in [k for k in self.clients if k[:2] == key[:2]]:
+        ClientPool.close(self.clients.pop(old)[1])
+      self.clients[key] = (config, client)
+      self.created += 1
+    print(f"[INFO] Cliente criado para {model} ({provider}){f' em {key[2]}' if key[2] else ''}.")
+    return client
+
+  def create_async(self, provider: str, model: str):
+    """
+    Cria um cliente assíncrono do modelo no provedor com a configuração atual do ambiente.
+
+    O cliente não entra no registro: as suas conexões ficam presas ao event loop que o usa,
+    então quem o cria (AsyncAPI) é responsável por fechá-lo.
+    """
+    provider = str(getattr(provider, 'value', provider))
+    with self.lock:
+      self.refresh()
+      config = ClientPool.config(provider, model)
+    return ASYNC_CLIENT_FACTORIES[provider](model, config)
+
+  def discard(self, provider: str, model: str) -> None:
+    """Fecha e remove os clientes do modelo no provedor; a próxima chamada cria um novo."""
+    provider = str(getattr(provider, 'value', provider))
+    with self.lock:
+      for key in [k for k in self.clients if k[:2] == (provider, model)]:
+        ClientPool.close(self.clients.pop(key)[1])
+
+  @staticmethod
+  def close(client) -> None:
+    """Fecha as conexões do cliente, quando ele as expõe."""
+    if hasattr(client, 'close'):
+      try:
+        client.close()
+      except Exception as e:
+        print(f"[WARNING] Erro ao fechar o cliente: {e}")
+
+  def clear(self) -> None:
+    """Fecha e remove todos os clientes."""
+    with self.lock:
+      for _, client in self.clients.values():
+        ClientPool.close(client)
+      self.clients.clear()
+
+  def stats(self) -> dict:
+    """Retorna os contadores de uso do registro."""
+    with self.lock:
+      return {"created": self.created, "reused": self.reused, "clients": len(self.clients)}
+
+CLIENTS = ClientPool()
@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+import lmstudio as lms
+
+from api.clients import CLIENTS
+
+class ModelHandles:
+  def __init__(self, keep_warm: float, ttl: float):
+    """
+    Handles dos modelos do LM Studio, carregados uma única vez e mantidos aquecidos.
+
+    Antes de cada previsão o manager confere se o modelo continua carregado no servidor (ele
+    descarrega modelos ociosos após o TTL ou por ação do usuário). Se não estiver, o modelo é
+    carregado explicitamente e o tempo de carga é devolvido à parte, fora do tempo de inferência.
+    A lista de modelos carregados fica em cache e só é consultada de novo quando o modelo não
+    está nela, quando ficou ocioso por mais de 'ttl' segundos ou após um erro. Cada modelo carrega
+    sob o seu próprio lock, de modo que a carga de um não bloqueia as previsões dos demais.
+    Uma thread opcional envia a cada 'keep_warm' segundos uma previsão de um token aos modelos
+    ociosos ainda carregados, para que o TTL do servidor não os descarregue entre previsões.
+
+    Args:
+      keep_warm (float): Intervalo, em segundos, entre os pings de keep-warm (0 desliga).
+      ttl (float): Tempo, em segundos, sem uso após o qual o servidor descarrega o modelo.
+    """
+    self.keep_warm = keep_warm
+    self.ttl = ttl
+    self.models = {}
+    self.locks = {}
+    self.loaded_models = None
+    self.lock = threading.Lock()
+    self.stop_event = threading.Event()
+    self.thread = None
+
+  def loaded(self, refresh: bool = False) -> set:
+    """Retorna os identificadores dos modelos carregados, consultando o servidor na primeira vez ou com 'refresh'."""
+    with self.lock:
+      models = self.loaded_models
+    if models is None or refresh:
+      models = {handle.identifier for handle in lms.list_loaded_models("llm")}
+      with self.lock:
+        self.loaded_models = models
+    return models
+
+  def is_loaded(self, model: str) -> bool:
+    """Verifica se o modelo está carregado; o servidor só é consultado se ele não está no cache ou ficou ocioso além do TTL."""
+    with self.lock:
+      used_at = self.models[model]["used_at"] if model in self.models else None
+    if used_at is not None and time.time() - used_at < self.ttl and model in self.loaded():
+      return True
+    return model in self.loaded(refresh=True)
+
+  def invalidate(self, model: str) -> None:
+    """Retira o modelo do cache após um erro, para que o próximo get confira o servidor e o recarregue se preciso."""
+    with self.lock:
+      if self.loaded_models is not None:
+        self.loaded_models = self.loaded_models - {model}
+
+  def entry(self, model: str) -> dict:
+    """Retorna os contadores do modelo, criando-os na primeira vez (chamar com o lock adquirido)."""
+    if model not in self.models:
+      self.models[model] = {"loads": 0, "load_time": 0.0, "last_load_time": None, "pings": 0, "used_at": None}
+    return self.models[model]
+
+  def get(self, model: str) -> tuple[lms.LLM, float]:
+    """
+    Retorna o handle do modelo carregado e o tempo gasto carregando-o nesta chamada (0.0 se já estava carregado).
+    """
+    with self.lock:
+      self.entry(model)
+      model_lock = self.locks.setdefault(model, threading.Lock())
+    with model_lock:
+      start_time = time.perf_counter()
+      cold = not self.is_loaded(model)
+      try:
+        if cold:
+          # O handle antigo aponta para uma instância que não existe mais no servidor
+          CLIENTS.discard("lmstudio", model)
+        handle = CLIENTS.get("lmstudio", model)
+      except Exception:
+        self.invalidate(model)
+        raise
+      load_time = time.perf_counter() - start_time if cold else 0.0
+      with self.lock:
+        entry = self.entry(model)
+        if cold:
+          entry["loads"] += 1
+          entry["load_time"] += load_time
+          entry["last_load_time"] = load_time
+          self.loaded_models = (self.loaded_models or set()) | {model}
+        entry["used_at"] = time.time()
+    if cold:
+      print(f"[INFO] Modelo {model} carregado no LM Studio em {load_time:.2f} segundos.")
+    return handle, load_time
+
+  def preload(self, models: list[str]) -> dict:
+    """Carrega os modelos informados (por exemplo, os da tabela models) e retorna o tempo de carga de cada um."""
+    times = {}
+    for model in models:
+      try:
+        times[model] = self.get(model)[1]
+      except Exception as e:
+        print(f"[WARNING] Não foi possível pré-carregar o modelo {model}: {e}")
+    return times
+
+  def ping(self, model: str) -> bool:
+    """
+    Envia uma previsão de um token ao modelo, se ele continua carregado; retorna True se o ping foi enviado.
+    O ping não segura o lock do manager, que fica livre para as cargas e previsões dos demais modelos.
+    """
+    if not self.is_loaded(model):
+      return False
+    try:
+      CLIENTS.get("lmstudio", model).respond("ping", config={"maxTokens": 1})
+    except Exception:
+      self.invalidate(model)
+      raise
+    with self.lock:
+      entry = self.entry(model)
+      entry["pings"] += 1
+      entry["used_at"] = time.time()
+    return True
+
+  def warm(self) -> None:
+    """Pinga os modelos ociosos há pelo menos 'keep_warm' segundos (executado pela thread de keep-warm)."""
+    while not self.stop_event.wait(self.keep_warm):
+      with self.lock:
+        idle = [m for m, e in self.models.items() if e["used_at"] is not None and time.time() - e["used_at"] >= self.keep_warm]
+      for model in idle:
+        try:
+          self.ping(model)
+        except Exception as e:
+          print(f"[WARNING] Erro no keep-warm do modelo {model}: {e}")
+
+  def start(self) -> None:
+    """Inicia a thread de keep-warm, se ela está habilitada e ainda não foi iniciada."""
+    if self.keep_warm <= 0 or (self.thread is not None and self.thread.is_alive()):
+      return
+    self.stop_event.clear()
+    self.thread = threading.Thread(target=self.warm, name="lmstudio-keep-warm", daemon=True)
+    self.thread.start()
+    print(f"[INFO] Keep-warm do LM Studio a cada {self.keep_warm:g} segundos.")
+
+  def stop(self) -> None:
+    """Interrompe a thread de keep-warm."""
+    self.stop_event.set()
+    if self.thread is not None:
+      self.thread.join()
+      self.thread = None
+
+  def stats(self) -> dict:
+    """Retorna, por modelo, as cargas, o tempo total e o último tempo de carga e os pings enviados."""
+    with self.lock:
+      return {model: dict(entry) for model, entry in self.models.items()}
+
+HANDLES = ModelHandles(
+  keep_warm=float(os.getenv("LMSTUDIO_KEEP_WARM", "300")),
+  ttl=float(os.getenv("LMSTUDIO_TTL", "3600"))
+)
@@ -0,0 +1,162 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+from openai import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+
+from api.clients import env_name
+
+# Erros transitórios que voltam à fila com espera exponencial: 429, timeouts, falhas de conexão e 5xx
+RETRYABLE = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+# Orçamentos padrão por provedor (requisições/minuto, tokens/minuto); None não limita. Cada modelo
+# pode ter os seus em <provedor>_<modelo>_rpm e <provedor>_<modelo>_tpm no .env
+RATE_LIMITS = {
+  'lmstudio': (None, None),
+  'openai': (500, 200000),
+  'azure': (300, 50000),
+}
+
+class TokenBucket:
+  def __init__(self, per_minute: int):
+    """
+    Balde de fichas com reserva: cada chamada retira as fichas na hora e espera pelo déficit.
+
+    O balde começa cheio, com 'per_minute' fichas, e é reabastecido continuamente à razão de
+    per_minute / 60 fichas por segundo. Reservar mais fichas do que há deixa o saldo negativo,
+    de modo que as chamadas seguintes esperam na ordem em que chegaram.
+
+    Args:
+      per_minute (int): Fichas por minuto (capacidade do balde).
+    """
+    self.capacity = per_minute
+    self.rate = per_minute / 60
+    self.level = float(per_minute)
+    self.updated = time.monotonic()
+
+  def reserve(self, amount: float) -> float:
+    """Retira 'amount' fichas e retorna quantos segundos esperar até que existam (chamar com o lock adquirido)."""
+    now = time.monotonic()
+    self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+    self.updated = now
+    self.level -= amount
+    return max(0.0, -self.level / self.rate)
+
+class RateLimiter:
+  def __init__(self, rpm: int = None, tpm: int = None, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+    """
+    Limitador de um modelo em um provedor: orçamento de requisições e de tokens por minuto e
+    espera exponencial com jitter para erros transitórios.
+
+    Args:
+      rpm (int): Requisições por minuto (None não limita).
+      tpm (int): Tokens de prompt estimados por minuto (None não limita).
+      max_retries (int): Novas tentativas após um erro transitório.
+      base_delay (float): Espera base, em segundos, da primeira nova tentativa.
+      max_delay (float): Espera máxima, em segundos, entre tentativas.
+    """
+    self.rpm = rpm
+    self.tpm = tpm
+    self.max_retries = max_retries
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+    self.requests = TokenBucket(rpm) if rpm else None
+    self.tokens = TokenBucket(tpm) if tpm else None
+    self.waiting = 0
+    self.admitted = 0
+    self.retries = 0
+    self.throttle_time = 0.0
+    self.lock = threading.Lock()
+
+  def reserve(self, tokens: int) -> float:
+    """Reserva uma requisição e 'tokens' tokens e retorna a espera necessária, em segundos."""
+    with self.lock:
+      self.admitted += 1
+      wait = max(
+        self.requests.reserve(1) if self.requests else 0.0,
+        self.tokens.reserve(tokens) if self.tokens else 0.0
+      )
+      if wait > 0:
+        self.waiting += 1
+        self.throttle_time += wait
+      return wait
+
+  def release(self) -> None:
+    """Marca o fim da espera de uma chamada retida."""
+    with self.lock:
+      self.waiting -= 1
+
+  def acquire(self, tokens: int) -> None:
+    """Bloqueia a thread até que a requisição caiba nos orçamentos."""
+    wait = self.reserve(tokens)
+    if wait > 0:
+      try:
+        time.sleep(wait)
+      finally:
+        self.release()
+
+  async def acquire_async(self, tokens: int) -> None:
+    """Versão assíncrona de acquire, que libera o event loop durante a espera (inclusive se a tarefa for cancelada)."""
+    wait = self.reserve(tokens)
+    if wait > 0:
+      try:
+        await asyncio.sleep(wait)
+      finally:
+        self.release()
+
+  def backoff(self, attempt: int, error: Exception) -> float:
+    """
+    Retorna a espera antes da nova tentativa 'attempt' (0, 1, ...): jitter completo sobre
+    base_delay * 2^attempt, limitado a max_delay, e nunca menor que o Retry-After do provedor.
+    """
+    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+      delay = max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+      pass
+    with self.lock:
+      self.retries += 1
+      self.throttle_time += delay
+    return delay
+
+  def stats(self) -> dict:
+    """Retorna os orçamentos e os contadores do limitador (throttle_time soma as esperas de todas as chamadas)."""
+    with self.lock:
+      return {
+        "rpm": self.rpm,
+        "tpm": self.tpm,
+        "requests": self.admitted,
+        "retries": self.retries,
+        "queue_depth": self.waiting,
+        "throttle_time": round(self.throttle_time, 3),
+      }
+
+class RateLimits:
+  def __init__(self):
+    """Registro dos limitadores por (provedor, modelo), compartilhados por API, AsyncAPI e threads."""
+    self.limiters = {}
+    self.lock = threading.Lock()
+
+  def get(self, provider: str, model: str) -> RateLimiter:
+    """Retorna o limitador do modelo no provedor, criando-o com os orçamentos do ambiente ou os padrões."""
+    provider = str(getattr(provider, 'value', provider))
+    key = (provider, model)
+    with self.lock:
+      if key not in self.limiters:
+        rpm, tpm = RATE_LIMITS[provider]
+        rpm = int(os.getenv(env_name(provider, model, 'rpm'), rpm or 0)) or None
+        tpm = int(os.getenv(env_name(provider, model, 'tpm'), tpm or 0)) or None
+        self.limiters[key] = RateLimiter(rpm, tpm, max_retries=int(os.getenv("RATE_LIMIT_RETRIES", "5")))
+      return self.limiters[key]
+
+  def stats(self) -> dict:
+    """Retorna as estatísticas de cada limitador, indexadas por 'provedor/modelo'."""
+    with self.lock:
+      limiters = dict(self.limiters)
+    return {f"{provider}/{model}": limiter.stats() for (provider, model), limiter in limiters.items()}
+
+LIMITS = RateLimits()
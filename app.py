@@ -1,7 +1,22 @@
+import os
+import threading
 import streamlit as st
 from st_pages import add_page_title, get_nav_from_toml
 
+from api.handles import HANDLES
+from database.crud_models import CrudModels
+
 st.set_page_config(layout="wide")
+
+@st.cache_resource
+def warm_up() -> None:
+  """Inicia o keep-warm do LM Studio e, com LMSTUDIO_PRELOAD=1, pré-carrega em segundo plano os modelos cadastrados (uma vez por servidor)."""
+  if os.getenv("LMSTUDIO_PRELOAD", "0") == "1":
+    models = [model[1] for model in CrudModels().select(provider="lmstudio")]
+    threading.Thread(target=HANDLES.preload, args=(models,), name="lmstudio-preload", daemon=True).start()
+  HANDLES.start()
+
+warm_up()
 nav = get_nav_from_toml(".streamlit/pages.toml")
 
 pg = st.navigation(nav)
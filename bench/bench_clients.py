@@ -0,0 +1,48 @@
+"""
+Compara a latência de previsões sequenciais contra um provedor local (tests/stub_server.py) criando
+um cliente OpenAI a cada chamada (caminho anterior) e reaproveitando o cliente do registro CLIENTS.
+
+Uso: python bench/bench_clients.py [chamadas]
+"""
+import os
+import sys
+import time
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from openai import OpenAI
+from api.clients import CLIENTS, ClientPool
+from tests.stub_server import StubServer, chat_completion
+
+MODEL = "bench-clients"
+
+def latencies(get_client, calls: int) -> list[float]:
+  """Tempos, em milissegundos, de cada chamada (obtenção do cliente incluída)."""
+  times = []
+  for _ in range(calls):
+    start = time.perf_counter()
+    client = get_client()
+    client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "ping"}])
+    times.append((time.perf_counter() - start) * 1000)
+  return times
+
+def fresh_client() -> OpenAI:
+  config = ClientPool.config("openai", MODEL)
+  return OpenAI(api_key=config["key"], base_url=config["base_url"], max_retries=0)
+
+if __name__ == "__main__":
+  calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+  respond = lambda method, path, headers, body: (200, {}, chat_completion(MODEL, ["[1.0, 2.0]"]))
+  with StubServer(respond) as stub:
+    stub.configure(os.environ, MODEL)
+    CLIENTS.get("openai", MODEL) # Aquece o registro, como após a primeira previsão
+    print(f"{calls} chamadas sequenciais em {stub.url}")
+    print(f"{'cliente':<22} {'mediana':>10} {'p95':>10}")
+    for name, get_client in [("novo a cada chamada", fresh_client), ("CLIENTS (reaproveitado)", lambda: CLIENTS.get("openai", MODEL))]:
+      times = latencies(get_client, calls)
+      p95 = statistics.quantiles(times, n=20)[-1]
+      print(f"{name:<22} {statistics.median(times):7.2f} ms {p95:7.2f} ms")
+    print(CLIENTS.stats())
@@ -0,0 +1,31 @@
+"""
+Compara, formato a formato, os formatadores originais (f-string por linha sobre a lista de tuplas)
+com os atuais (colunas montadas por str.join, direto da TimeSeriesWindow).
+
+Uso: python bench/bench_format.py [pontos]
+"""
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.bench_window import timeit
+from src.model.format import TSFormat, format_timeseries
+from src.model.window import TimeSeriesWindow
+from tests.test_format import REFERENCES
+
+if __name__ == "__main__":
+  points = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+  rng = np.random.default_rng(0)
+  dates = pd.date_range('2000-01-01', periods=points, freq='min').values
+  data = TimeSeriesWindow(dates, np.round(np.sin(np.arange(points) / 60) * 100 + rng.normal(0, 1, points), 3))
+
+  print(f"{points} pontos (melhor de 5 execuções)")
+  print(f"{'formato':<10} {'original':>12} {'atual':>12} {'ganho':>8}")
+  for ts_format, reference in REFERENCES.items():
+    before = timeit(lambda: reference(list(data)), 5)
+    after = timeit(lambda: format_timeseries(data, ts_format), 5)
+    print(f"{ts_format.value:<10} {before * 1000:9.2f} ms {after * 1000:9.2f} ms {before / after:7.1f}x")
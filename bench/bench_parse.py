@@ -0,0 +1,32 @@
+"""
+Compara, formato a formato, os analisadores originais (pd.read_csv por resposta) com os atuais
+(uma única passada sobre as linhas), lendo respostas do tamanho de um horizonte típico.
+
+Uso: python bench/bench_parse.py [pontos] [respostas]
+"""
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.bench_window import timeit
+from src.model.format import TSFormat, format_timeseries, parse_timeseries
+from src.model.window import TimeSeriesWindow
+from tests.test_format import PARSE_REFERENCES
+
+if __name__ == "__main__":
+  points = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+  responses = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+  dates = pd.date_range('2000-01-01', periods=points, freq='h').values
+  data = TimeSeriesWindow(dates, np.round(np.sin(np.arange(points) / 6) * 100, 3))
+
+  print(f"{responses} respostas de {points} pontos (melhor de 5 execuções)")
+  print(f"{'formato':<10} {'original':>12} {'atual':>12} {'ganho':>8}")
+  for ts_format, reference in PARSE_REFERENCES.items():
+    text = format_timeseries(data, ts_format)
+    before = timeit(lambda: [np.array(reference(text), dtype=np.float64) for _ in range(responses)], 5)
+    after = timeit(lambda: [parse_timeseries(text, ts_format, periods=points) for _ in range(responses)], 5)
+    print(f"{ts_format.value:<10} {before * 1000:9.2f} ms {after * 1000:9.2f} ms {before / after:7.1f}x")
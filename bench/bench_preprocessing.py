@@ -0,0 +1,56 @@
+"""
+Compara o configure_dataset original (pandas sobre o DataFrame inteiro) com preprocess_file
+(kernels NumPy) e o pré-processamento de vários arquivos em série com preprocess_many.
+
+Uso: python bench/bench_preprocessing.py [linhas] [arquivos]
+"""
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.bench_window import timeit
+from bench.generate_data import generate
+from src.model.preprocessing import PreprocessConfig, Duplicates, Imputation, preprocess, read_columns, preprocess_file, preprocess_many
+from tests.test_ingest import configure_dataset
+
+CONFIGS = {
+  'ffill': PreprocessConfig(duplicates=Duplicates.FIRST, frequency='min', imputation=Imputation.FFILL),
+  'linear': PreprocessConfig(duplicates=Duplicates.SUM, frequency='min', imputation=Imputation.LINEAR),
+  'sma': PreprocessConfig(duplicates=Duplicates.LAST, frequency='min', imputation=Imputation.SMA),
+}
+
+if __name__ == "__main__":
+  rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+  files = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    path = generate(rows, tmp / 'source.csv')
+    # Lacunas e ausentes para a uniformização e a imputação terem trabalho
+    df = pd.read_csv(path)
+    rng = np.random.default_rng(0)
+    df = df.drop(index=rng.choice(rows, rows // 100, replace=False))
+    df.loc[df.sample(frac=0.05, random_state=0).index, 'value'] = np.nan
+    df.to_csv(path, index=False)
+
+    print(f"{len(df)} linhas (melhor de 3 execuções)")
+    print(f"{'imputação':<10} {'etapa':<18} {'original':>12} {'atual':>12} {'ganho':>8}")
+    columns = read_columns(str(path), CONFIGS['ffill'])
+    for name, config in CONFIGS.items():
+      before = timeit(lambda: configure_dataset(df, config), 3)
+      after = timeit(lambda: preprocess(*columns, config), 3)
+      print(f"{name:<10} {'em memória':<18} {before * 1000:9.0f} ms {after * 1000:9.0f} ms {before / after:7.1f}x")
+      before = timeit(lambda: configure_dataset(pd.read_csv(path), config).to_csv(tmp / 'before.csv', index=False), 3)
+      after = timeit(lambda: preprocess_file(str(path), str(tmp / 'after.csv'), config), 3)
+      print(f"{name:<10} {'CSV → CSV':<18} {before * 1000:9.0f} ms {after * 1000:9.0f} ms {before / after:7.1f}x")
+
+    config = CONFIGS['linear']
+    jobs = [(str(path), str(tmp / f'out{i}.csv'), config) for i in range(files)]
+    serial = timeit(lambda: [preprocess_file(*job) for job in jobs], 1)
+    parallel = timeit(lambda: preprocess_many(jobs), 1)
+    print(f"{files} arquivos: em série {serial * 1000:.0f} ms, preprocess_many {parallel * 1000:.0f} ms ({serial / parallel:.1f}x)")
@@ -0,0 +1,45 @@
+"""
+Compara a seleção da janela por DataFrame.query (caminho anterior) com a busca binária de Data.offsets.
+
+Uso: python bench/generate_data.py && python bench/bench_window.py [arquivo]
+"""
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.model.data import Data, DATA_DIR
+
+def timeit(function, repeat: int) -> float:
+  """Retorna o menor tempo, em segundos, de 'repeat' execuções."""
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    function()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+if __name__ == "__main__":
+  name = sys.argv[1] if len(sys.argv) > 1 else 'benchmark.csv'
+  if not (DATA_DIR / name).exists():
+    sys.exit(f"[ERROR] {DATA_DIR / name} não existe: rode python bench/generate_data.py antes.")
+
+  data = Data(name, '2000-01-10', '2000-01-11', periods=24)
+  data.load() # Constrói (ou valida) o cache colunar
+  dataset = pd.read_csv(DATA_DIR / name)
+  start_date, end_date = data.start_date, data.end_date
+
+  def query():
+    dataset.query("date >= @start_date and date <= @end_date")
+    dataset.query("date > @end_date")
+
+  def offsets():
+    dates, _ = data.load()
+    data.offsets(dates)
+
+  print(f"{len(dataset)} linhas, janela de 2 dias")
+  print(f"DataFrame.query (frame já carregado): {timeit(query, 3) * 1000:10.2f} ms")
+  print(f"searchsorted (colunas em cache):      {timeit(offsets, 20) * 1000:10.2f} ms")
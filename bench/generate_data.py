@@ -0,0 +1,28 @@
+"""
+Gera o dataset sintético usado nos benchmarks (bench/bench_window.py).
+
+Uso: python bench/generate_data.py [linhas] [arquivo]
+Padrão: 10.000.000 linhas com frequência de um minuto em data/benchmark.csv (~390 MB, fora do git).
+"""
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def generate(rows: int, path: Path, seed: int = 0) -> Path:
+  """Grava uma série (date, value) de 'rows' minutos com tendência diária e ruído."""
+  rng = np.random.default_rng(seed)
+  dates = pd.date_range('2000-01-01', periods=rows, freq='min')
+  minutes = np.arange(rows)
+  values = (100 + 10 * np.sin(2 * np.pi * minutes / 1440) + rng.normal(0, 1, rows)).round(3)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  pd.DataFrame({'date': dates.strftime('%Y-%m-%d %H:%M:%S'), 'value': values}).to_csv(path, index=False)
+  print(f"[INFO] {rows} linhas gravadas em {path}.")
+  return path
+
+if __name__ == "__main__":
+  rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+  path = Path(sys.argv[2]) if len(sys.argv) > 2 else ROOT / 'data' / 'benchmark.csv'
+  generate(rows, path)
@@ -1,7 +1,7 @@
 import sqlite3
 from sqlite3 import Cursor
 from contextlib import closing
-from schema_tables import HISTORY_SCHEMA, MODELS_SCHEMA
+from schema_tables import DATABASE_PATH, HISTORY_SCHEMA, MODELS_SCHEMA
 
 
 def create_table(cursor: Cursor, table_name: str, schema: str) -> None:
@@ -22,12 +22,12 @@ def create_table(cursor: Cursor, table_name: str, schema: str) -> None:
     raise
 
 
-def create_database(db_path: str = './database/database.db') -> None:
+def create_database(db_path: str = DATABASE_PATH) -> None:
   """
   Cria um banco de dados SQLite e as suas tabelas definidas no schema.
 
   Args:
-    db_path (str, optional): Caminho do arquivo do banco de dados. Defaults to './database/database.py''.
+    db_path (str, optional): Caminho do arquivo do banco de dados. Defaults to DATABASE_PATH ('./database/database.db').
   """
   print(f"[INFO] Inicializando criação do banco de dados em '{db_path}'...")
   try:
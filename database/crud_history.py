@@ -1,5 +1,16 @@
 import sqlite3
 
+from database.schema_tables import DATABASE_PATH, HISTORY_MIGRATIONS, HISTORY_INDEXES
+
+# Colunas gravadas por insert e insert_many, na ordem da tabela history
+HISTORY_COLUMNS = (
+  'model', 'temperature', 'dataset', 'start_date', 'end_date', 'periods', 'prompt', 'prompt_type',
+  'ts_format', 'ts_type', 'y_true', 'y_pred', 'smape', 'mae', 'rmse', 'total_tokens_prompt',
+  'total_tokens_response', 'total_tokens', 'response_time', 'series_id', 'reduction', 'window_points',
+  'original_points', 'tokens_saved', 'prompt_layout', 'cached_tokens', 'time_to_first_token',
+  'time_to_horizon', 'request_key', 'load_time', 'samples', 'aggregation', 'y_samples'
+)
+
 # ---------------- Exceções ----------------
 
 class HistoryNotFoundError(Exception):
@@ -9,56 +20,35 @@ class HistoryNotFoundError(Exception):
 
 class CrudHistory:
   def __init__(self):
-    self.connection = sqlite3.connect('./database/database.db')
+    self.connection = sqlite3.connect(DATABASE_PATH)
     self.cursor = self.connection.cursor()
+    self.migrate()
+
+  def migrate(self) -> None:
+    """Acrescenta à tabela history as colunas e os índices que ainda não existem no banco."""
+    try:
+      self.cursor.execute("PRAGMA table_info(history)")
+      columns = {row[1] for row in self.cursor.fetchall()}
+      if not columns:
+        return
+      for column, definition in HISTORY_MIGRATIONS.items():
+        if column not in columns:
+          self.cursor.execute(f"ALTER TABLE history ADD COLUMN {column} {definition}")
+          print(f"[INFO] Coluna '{column}' adicionada à tabela history.")
+      for index in HISTORY_INDEXES:
+        self.cursor.execute(index)
+      self.connection.commit()
+    except sqlite3.Error as e:
+      print(f"[ERROR] Erro ao atualizar a tabela history: {e}")
 
   def insert(self, **kwargs) -> bool:
     """Insere um registro na tabela history."""
     try:
-      values = (
-        kwargs.get('model'),
-        kwargs.get('temperature'),
-        kwargs.get('dataset'),
-        kwargs.get('start_date'),
-        kwargs.get('end_date'),
-        kwargs.get('periods'),
-        kwargs.get('prompt'),
-        kwargs.get('prompt_type'),
-        kwargs.get('ts_format'),
-        kwargs.get('ts_type'),
-        kwargs.get('y_true'),
-        kwargs.get('y_pred'),
-        kwargs.get('smape'),
-        kwargs.get('mae'),
-        kwargs.get('rmse'),
-        kwargs.get('total_tokens_prompt'),
-        kwargs.get('total_tokens_response'),
-        kwargs.get('total_tokens'),
-        kwargs.get('response_time')
-      )
+      values = tuple(kwargs.get(column) for column in HISTORY_COLUMNS)
       self.cursor.execute(
         f"""
-        INSERT INTO history (
-          model,
-          temperature,
-          dataset,
-          start_date,
-          end_date,
-          periods,
-          prompt,
-          prompt_type,
-          ts_format,
-          ts_type,
-          y_true,
-          y_pred,
-          smape,
-          mae,
-          rmse,
-          total_tokens_prompt,
-          total_tokens_response,
-          total_tokens,
-          response_time
-        ) VALUES ({', '.join(['?'] * len(values))})""",
+        INSERT INTO history ({', '.join(HISTORY_COLUMNS)})
+        VALUES ({', '.join(['?'] * len(values))})""",
         values
       )
       self.connection.commit()
@@ -71,12 +61,59 @@ class CrudHistory:
       print("[INFO] Fechando conexão com o banco de dados.")
       self.connection.close()
 
-  def select(self, dataset: str, prompt_types: list[str]) -> list:
-    """Seleciona dados da tabela com base em 'dataset' e 'prompt_type'."""
+  def insert_many(self, rows: list[dict]) -> int:
+    """
+    Insere vários registros na tabela history em uma única transação.
+
+    Registros com um request_key já gravado são ignorados, de modo que importar o mesmo lote
+    mais de uma vez não duplica o histórico. Retorna a quantidade de registros inseridos.
+    """
+    try:
+      before = self.connection.total_changes
+      self.cursor.executemany(
+        f"""
+        INSERT OR IGNORE INTO history ({', '.join(HISTORY_COLUMNS)})
+        VALUES ({', '.join(['?'] * len(HISTORY_COLUMNS))})""",
+        [tuple(row.get(column) for column in HISTORY_COLUMNS) for row in rows]
+      )
+      self.connection.commit()
+      inserted = self.connection.total_changes - before
+      print(f"[INFO] {inserted} registros inseridos na tabela history ({len(rows) - inserted} já existentes).")
+      return inserted
+    except sqlite3.Error as e:
+      print(f"[ERROR] Erro ao inserir dados na tabela history: {e}")
+      return 0
+    finally:
+      print("[INFO] Fechando conexão com o banco de dados.")
+      self.connection.close()
+
+  def keys(self, request_keys: list[str]) -> set:
+    """Retorna os request_key da lista que já têm registro na tabela history."""
+    try:
+      found = set()
+      # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+      for i in range(0, len(request_keys), 500):
+        chunk = request_keys[i:i + 500]
+        placeholders = ','.join(['?'] * len(chunk))
+        self.cursor.execute(f"SELECT request_key FROM history WHERE request_key IN ({placeholders})", chunk)
+        found.update(row[0] for row in self.cursor.fetchall())
+      return found
+    except sqlite3.Error as e:
+      print(f"[ERROR] Erro ao selecionar dados da tabela history: {e}")
+      return set()
+    finally:
+      print("[INFO] Fechando conexão com o banco de dados.")
+      self.connection.close()
+
+  def select(self, dataset: str, prompt_types: list[str], series_id: str = None) -> list:
+    """Seleciona dados da tabela com base em 'dataset', 'prompt_type' e, opcionalmente, 'series_id'."""
     try:
       placeholders = ','.join(['?'] * len(prompt_types))
       query = f"SELECT * FROM history WHERE dataset = ? AND prompt_type IN ({placeholders})"
       params = [dataset] + prompt_types
+      if series_id is not None:
+        query += " AND series_id = ?"
+        params.append(series_id)
       self.cursor.execute(query, params)
       return self.cursor.fetchall()
     except sqlite3.Error as e:
@@ -1,5 +1,7 @@
 import sqlite3
 
+from database.schema_tables import DATABASE_PATH
+
 # ---------------- Exceções ----------------
 
 class ModelNotFoundError(Exception):
@@ -12,7 +14,7 @@ class ModelAlreadyExistsError(Exception):
 
 class CrudModels:
   def __init__(self):
-    self.connection = sqlite3.connect('./database/database.db')
+    self.connection = sqlite3.connect(DATABASE_PATH)
     self.cursor = self.connection.cursor()
 
   def insert(self, **kwargs) -> bool:
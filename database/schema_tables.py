@@ -1,3 +1,8 @@
+import os
+
+# Banco de dados do histórico, dos modelos e dos lotes (caminho relativo à raiz do projeto)
+DATABASE_PATH = os.getenv("DATABASE_PATH", "./database/database.db")
+
 HISTORY_SCHEMA = """
 CREATE TABLE IF NOT EXISTS {table_name} (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -19,9 +24,46 @@ CREATE TABLE IF NOT EXISTS {table_name} (
   total_tokens_prompt INTEGER,
   total_tokens_response INTEGER,
   total_tokens INTEGER,
-  response_time REAL
+  response_time REAL,
+  series_id TEXT,
+  reduction TEXT,
+  window_points INTEGER,
+  original_points INTEGER,
+  tokens_saved INTEGER,
+  prompt_layout TEXT,
+  cached_tokens INTEGER,
+  time_to_first_token REAL,
+  time_to_horizon REAL,
+  request_key TEXT,
+  load_time REAL,
+  samples INTEGER,
+  aggregation TEXT,
+  y_samples TEXT
 )"""
 
+# Colunas acrescentadas ao final da tabela history após a sua criação, aplicadas em bancos antigos
+HISTORY_MIGRATIONS = {
+  "series_id": "TEXT",
+  "reduction": "TEXT",
+  "window_points": "INTEGER",
+  "original_points": "INTEGER",
+  "tokens_saved": "INTEGER",
+  "prompt_layout": "TEXT",
+  "cached_tokens": "INTEGER",
+  "time_to_first_token": "REAL",
+  "time_to_horizon": "REAL",
+  "request_key": "TEXT",
+  "load_time": "REAL",
+  "samples": "INTEGER",
+  "aggregation": "TEXT",
+  "y_samples": "TEXT",
+}
+
+# Índices da tabela history; request_key identifica as previsões importadas de lotes (NULL nas demais)
+HISTORY_INDEXES = [
+  "CREATE UNIQUE INDEX IF NOT EXISTS history_request_key ON history (request_key)",
+]
+
 MODELS_SCHEMA = """
 CREATE TABLE IF NOT EXISTS {table_name} (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -29,3 +71,38 @@ CREATE TABLE IF NOT EXISTS {table_name} (
   provider TEXT NOT NULL,
   UNIQUE(name, provider)
 )"""
+
+RESPONSES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table_name} (
+  key TEXT PRIMARY KEY,
+  model TEXT,
+  provider TEXT,
+  temperature REAL,
+  response TEXT,
+  total_tokens_prompt INTEGER,
+  total_tokens_response INTEGER,
+  response_time REAL,
+  cached_tokens INTEGER,
+  size INTEGER,
+  created_at REAL,
+  used_at REAL,
+  time_to_first_token REAL,
+  time_to_horizon REAL
+)"""
+
+BATCHES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table_name} (
+  id TEXT PRIMARY KEY,
+  name TEXT,
+  provider TEXT,
+  model TEXT,
+  temperature REAL,
+  input_file_id TEXT,
+  output_file_id TEXT,
+  error_file_id TEXT,
+  status TEXT,
+  requests INTEGER,
+  imported INTEGER DEFAULT 0,
+  created_at REAL,
+  completed_at REAL
+)"""
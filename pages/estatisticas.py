@@ -1,10 +1,10 @@
 import streamlit as st
-import os
 
+from src.model.data import Data
 from src.view.statistics import Statistics
 
 with st.sidebar:
-  datasets = os.listdir('data')
+  datasets = Data.list_datasets()
   dataset = st.selectbox('Database', datasets)
   confirm = st.button(label='Gerar Estatísticas', key='generate_statistics', type='primary', use_container_width=True)
 
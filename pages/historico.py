@@ -1,7 +1,7 @@
 import streamlit as st
 from database.crud_history import CrudHistory
+from src.model.data import Data, DATA_DIR
 from src.view.graph import Graph
-import os
 
 # ---------------- Dialog confirmação de exclusão ----------------
 
@@ -28,9 +28,12 @@ def confirmation_dialog(dataset: str, prompts: list):
 with st.sidebar:
   st.write(" ### 🔍 Parâmetros da Busca")
 
-  datasets = os.listdir('data')
+  datasets = Data.list_datasets()
   dataset = st.selectbox('Base de Dados', datasets)
 
+  series = Data.list_series(DATA_DIR / dataset) if dataset else []
+  series_id = st.selectbox('Série', [None] + series, format_func=lambda s: 'Todas' if s is None else s) if series else None
+
   prompts = st.multiselect(label='Tipo de Prompt',
     options=['ZERO_SHOT', 'FEW_SHOT', 'COT', 'COT_FEW'],
     default=['ZERO_SHOT'],
@@ -62,10 +65,10 @@ elif confirm_clear_history:
   confirmation_dialog(dataset, prompts)
 
 elif confirm_view_history:
-  results = CrudHistory().select(dataset=dataset, prompt_types=prompts)
+  results = CrudHistory().select(dataset=dataset, prompt_types=prompts, series_id=series_id)
   for i, result in enumerate(results[::-1]):
     y_true = list(map(float, result[11].strip('[]').split(',')))
-    y_pred = eval(result[12])
+    y_pred = list(map(float, result[12].strip('[]').split(',')))
 
     st.write('### Gráfico Série Temporal - Prompt')
     Graph.forecast(
@@ -135,6 +138,10 @@ elif confirm_view_history:
             <td>Base de dados</td>
             <td>{str(result[3])}</td>
           </tr>
+          <tr>
+            <td>Série</td>
+            <td>{str(result[20]) if len(result) > 20 and result[20] is not None else '-'}</td>
+          </tr>
           <tr>
             <td>Data de início</td>
             <td>{str(result[4])}</td>
@@ -159,6 +166,14 @@ elif confirm_view_history:
             <td>Tipo de série</td>
             <td>{str(result[10])}</td>
           </tr>
+          <tr>
+            <td>Ajuste ao contexto</td>
+            <td>{f"{result[21]}: {result[23]} → {result[22]} pontos, {result[24]} tokens economizados" if len(result) > 21 and result[21] not in (None, 'NONE') else '-'}</td>
+          </tr>
+          <tr>
+            <td>Layout do prompt</td>
+            <td>{str(result[25]) if len(result) > 25 and result[25] is not None else '-'}</td>
+          </tr>
           <tr>
             <th colspan="2" class="centered">Resposta do Modelo</th>
           </tr>
@@ -166,6 +181,10 @@ elif confirm_view_history:
             <td>Quantidade de tokens do prompt</td>
             <td>{str(result[16])}</td>
           </tr>
+          <tr>
+            <td>Tokens do prompt em cache</td>
+            <td>{str(result[26]) if len(result) > 26 and result[26] is not None else '-'}</td>
+          </tr>
           <tr>
             <td>Quantidade de tokens da resposta</td>
             <td>{str(result[17])}</td>
@@ -178,6 +197,18 @@ elif confirm_view_history:
             <td>Tempo de resposta (segundos)</td>
             <td>{str(result[19])}</td>
           </tr>
+          <tr>
+            <td>Tempo de carga do modelo (segundos)</td>
+            <td>{str(result[30]) if len(result) > 30 and result[30] is not None else '-'}</td>
+          </tr>
+          <tr>
+            <td>Tempo até o primeiro token / horizonte (segundos)</td>
+            <td>{f"{result[27]} / {result[28] if result[28] is not None else 'não atingido'}" if len(result) > 28 and result[27] is not None else '-'}</td>
+          </tr>
+          <tr>
+            <td>Ensemble</td>
+            <td>{f"{result[31]} amostras ({result[32]})" if len(result) > 32 and result[32] is not None else '-'}</td>
+          </tr>
           <tr>
             <td>Valores exatos</td>
             <td>{result[11]}</td>
@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import os
 
 # Componentes
 from src.view.header import Header
@@ -12,10 +11,14 @@ from src.view.results import Results
 from database.crud_models import CrudModels
 from database.crud_history import CrudHistory
 from api.api import API, Provider
+from api.cache import RESPONSES
 
 # Tipos e Formatos
-from src.model.prompt import PromptType
-from src.model.format import TSFormat, TSType, parse_timeseries
+from src.model.data import Data, DATA_DIR
+from src.model.prompt import PromptType, PromptLayout
+from src.model.context import Reduction
+from src.model.ensemble import Aggregation, aggregate, quantiles
+from src.model.format import TSFormat, TSType, HorizonParser, parse_timeseries
 
 
 with st.sidebar:
@@ -27,16 +30,30 @@ with st.sidebar:
 
   model = st.selectbox('Modelo', models, index=0, help='Escolha o modelo a ser utilizado. O modelo deepseek-r1-distill-qwen-32b é o mais avançado e pode fornecer melhores resultados, mas também é mais pesado e pode levar mais response_time para gerar respostas.')
   temperature = st.slider(label='Temperatura', min_value=0.0, max_value=1.0, value=0.7, step=0.1, help='A temperatura controla a aleatoriedade da resposta do modelo. Valores mais altos resultam em respostas mais criativas e variados.')
+  stream = st.toggle(label='Streaming', value=False, help='Recebe a resposta em streaming e interrompe a geração assim que os valores previstos foram lidos, medindo o tempo até o primeiro token e até o horizonte.')
+  use_cache = st.toggle(label='Cache de respostas', value=True, help='Repete a resposta gravada quando o mesmo prompt já foi enviado ao mesmo modelo, provedor e temperatura. Desligue em estudos de amostragem com temperatura > 0.')
+  samples = st.slider(label='Amostras', min_value=1, max_value=16, value=1, step=1, help='Com mais de uma amostra, o mesmo prompt gera várias previsões (parâmetro n na OpenAI/Azure, chamadas paralelas nos demais), combinadas período a período. O ensemble não usa o cache de respostas nem streaming.')
+  aggregation = Aggregation.MEDIAN
+  if samples > 1:
+    aggregation = st.selectbox(label='Agregação', options=list(Aggregation), index=0, format_func=lambda a: a.name, help='Combinação das amostras em cada período: mediana, média ou média aparada (descarta 20% dos menores e dos maiores valores).')
 
   st.write('---')
-  datasets = os.listdir('data')
+  datasets = Data.list_datasets()
   dataset = st.selectbox('Base de Dados', datasets)
 
+  series_id = None
   if dataset:
+    series = Data.list_series(DATA_DIR / dataset)
+    if series:
+      series_id = st.selectbox('Série', series, help='O dataset está no formato longo (series_id, date, value). Escolha a série a ser prevista.')
+
     st.write(f"#### ⚙️ Configurações do Prompt")
-    df = pd.read_csv(f'data/{dataset}')
-    min_date = pd.to_datetime(df['date']).min().date()
-    max_date = pd.to_datetime(df['date']).max().date()
+    metadata = Data.metadata(DATA_DIR / dataset, series_id)
+    if metadata is None or metadata['start'] is None:
+      st.error("Não foi possível ler o dataset selecionado ou ele não possui dados.")
+      st.stop()
+    min_date = pd.Timestamp(metadata['start']).date()
+    max_date = pd.Timestamp(metadata['end']).date()
 
     default_start_date = min_date
     default_end_date = min(min_date + pd.Timedelta(days=1), max_date)
@@ -47,8 +64,17 @@ with st.sidebar:
     periods = st.slider(label='Períodos', min_value=1, max_value=96, value=24, step=1, help='Número de períodos a serem previstos. Cada período representa 1 hora de previsão.')
     prompt_type = st.selectbox(label='Prompt', options=list(PromptType), index=0, format_func=lambda f: f.name, help='Escolha o tipo de prompt a ser utilizado.')
 
-    ts_format = st.selectbox(label='Formato dos Dados', options=list(TSFormat), index=0, format_func=lambda f: f.name, help='Formato de apresentação dos dados para o modelo. Diferentes formatos podem influenciar a performance do modelo.')
-    ts_type = st.radio(label='Série', options=list(TSType), index=0, format_func=lambda f: f.name, help='Na série numérica os valores são passados como [3.662, 3.124, 3.465, 3.609], enquanto na série textual os valores são passados como [3 . 6 6 2, 3 . 1 2 4, 3 . 4 6 5, 3 . 6 0 9].')
+    layout = st.selectbox(label='Layout do Prompt', options=list(PromptLayout), index=0, format_func=lambda l: l.name, help='INLINE intercala os valores da requisição nas instruções. PREFIX mantém as instruções idênticas entre requisições e coloca os dados no final, permitindo que o provedor reaproveite o prefixo em cache.')
+    auto_format = st.toggle(label='Formato automático', value=False, help='Escolhe o formato com menos tokens (prompt + resposta) que cabe no orçamento de contexto.')
+    reduction = st.selectbox(label='Ajuste ao contexto', options=list(Reduction), index=0, format_func=lambda r: r.name, help='Quando o prompt não cabe no orçamento, o histórico mais antigo é cortado (TRIM), resumido por médias (PAA) ou amostrado preservando a forma (LTTB); os pontos recentes ficam na resolução original.')
+    budget = None
+    if auto_format or reduction != Reduction.NONE:
+      budget = st.number_input(label='Orçamento de tokens', min_value=256, value=8192, step=256, help='Tamanho máximo do contexto do modelo, somando prompt e resposta.')
+    if auto_format:
+      ts_format = TSFormat.ARRAY
+    else:
+      ts_format = st.selectbox(label='Formato dos Dados', options=list(TSFormat), index=0, format_func=lambda f: f.name, help='Formato de apresentação dos dados para o modelo. Diferentes formatos podem influenciar a performance do modelo.')
+    ts_type = st.radio(label='Série', options=list(TSType), index=0, format_func=lambda f: f.name, help='Na série numérica os valores são passados como [3.662, 3.124, 3.465, 3.609] e na textual como [3 . 6 6 2, 3 . 1 2 4, 3 . 4 6 5, 3 . 6 0 9]. SCALED usa inteiros de 0 a 999 entre o mínimo e o máximo da janela, DELTA a diferença para o valor anterior e SYMBOLIC uma letra por faixa de valores; a resposta é convertida de volta às unidades originais.')
 
   confirm = st.button(label='Gerar Análise', help='Clique para gerar a análise de dados',type='primary', use_container_width=True)
 
@@ -68,19 +94,40 @@ elif not dataset:
 # ---------------- Resultado ----------------
 
 else:
-  Header(model=model, dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods, prompt_type=prompt_type.name, ts_format=ts_format.name, ts_type=ts_type.name).header()
-  Dataset(dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods).show()
-  prompt, y_true = Prompt(dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods, prompt_type=prompt_type, ts_format=ts_format, ts_type=ts_type).view()
-  y_pred, total_tokens_prompt, total_tokens_response, response_time = API.mock(periods=periods, ts_format=ts_format, ts_type=ts_type)
-  #y_pred, total_tokens_prompt, total_tokens_response, response_time = API(model=model, provider=provider, prompt=prompt, temperature=temperature).response()
-
-  y_pred = parse_timeseries(y_pred, ts_format, ts_type) # Converte a resposta para uma lista
-  smape, mae, rmse = Results(y_true=y_true, y_pred=y_pred, total_tokens_prompt=total_tokens_prompt, total_tokens_response=total_tokens_response, response_time=response_time).show()
+  Header(model=model, dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods, prompt_type=prompt_type.name, ts_format='AUTO' if auto_format else ts_format.name, ts_type=ts_type.name).header()
+  Dataset(dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods, series_id=series_id).show()
+  prompt_view = Prompt(dataset=dataset, start_date=str(start_date), end_date=str(end_date), periods=periods, prompt_type=prompt_type, ts_format=ts_format, ts_type=ts_type, series_id=series_id, auto=auto_format, budget=budget, reduction=reduction, layout=layout)
+  prompt, y_true = prompt_view.view()
+  ts_format = prompt_view.ts_format # Formato escolhido, no modo automático
+  cache_hit, load_time = False, None
+  if samples == 1:
+    y_pred, total_tokens_prompt, total_tokens_response, response_time, cached_tokens, time_to_first_token, time_to_horizon = API.mock(periods=periods, ts_format=ts_format, ts_type=ts_type)
+    #horizon = HorizonParser(ts_format, ts_type, periods, prompt_view.scale) if stream else None
+    #api = API(model=model, provider=provider, prompt=prompt, temperature=temperature, use_cache=use_cache, horizon=horizon)
+    #y_pred, total_tokens_prompt, total_tokens_response, response_time, cached_tokens, time_to_first_token, time_to_horizon = api.response()
+    #cache_hit, load_time = api.cache_hit, api.load_time
+    responses = [y_pred]
+  else:
+    mocks = [API.mock(periods=periods, ts_format=ts_format, ts_type=ts_type) for _ in range(samples)]
+    responses = [mock[0] for mock in mocks]
+    total_tokens_prompt, total_tokens_response, cached_tokens = (sum(mock[i] for mock in mocks) for i in (1, 2, 4))
+    response_time = max(mock[3] for mock in mocks) # As amostras são geradas em paralelo
+    time_to_first_token = time_to_horizon = None
+    #api = API(model=model, provider=provider, prompt=prompt, temperature=temperature, use_cache=False)
+    #responses, total_tokens_prompt, total_tokens_response, response_time, cached_tokens = api.sample(samples)
+    #load_time = api.load_time
+
+  # Converte cada resposta para os valores previstos e, no ensemble, combina as amostras período a período
+  y_samples = [parse_timeseries(response, ts_format, ts_type, periods, prompt_view.scale) for response in responses]
+  y_pred = aggregate(y_samples, periods, aggregation).tolist() if samples > 1 else y_samples[0].tolist()
+  y_band = quantiles(y_samples, periods).tolist() if samples > 1 else None
+  smape, mae, rmse = Results(y_true=y_true, y_pred=y_pred, total_tokens_prompt=total_tokens_prompt, total_tokens_response=total_tokens_response, response_time=response_time, cached_tokens=cached_tokens, time_to_first_token=time_to_first_token, time_to_horizon=time_to_horizon, cache_hit=cache_hit, load_time=load_time, cache_stats=RESPONSES.stats() if use_cache and samples == 1 else None, samples=len(responses) if samples > 1 else None, aggregation=aggregation, y_band=y_band).show()
 
   inserted = CrudHistory().insert(
     model=model,
     temperature=temperature,
     dataset=dataset,
+    series_id=series_id,
     start_date=start_date,
     end_date=end_date,
     periods=periods,
@@ -96,7 +143,19 @@ else:
     total_tokens_prompt=total_tokens_prompt,
     total_tokens_response=total_tokens_response,
     total_tokens=total_tokens_prompt+total_tokens_response,
-    response_time=response_time
+    response_time=response_time,
+    reduction=prompt_view.context["reduction"].value if prompt_view.context else Reduction.NONE.value,
+    window_points=prompt_view.context["points"] if prompt_view.context else None,
+    original_points=prompt_view.context["original_points"] if prompt_view.context else None,
+    tokens_saved=prompt_view.context["tokens_saved"] if prompt_view.context else 0,
+    prompt_layout=layout.value,
+    cached_tokens=cached_tokens,
+    time_to_first_token=time_to_first_token,
+    time_to_horizon=time_to_horizon,
+    load_time=load_time,
+    samples=len(responses),
+    aggregation=aggregation.value if samples > 1 else None,
+    y_samples=str([y.tolist() for y in y_samples]) if samples > 1 else None
   )
   if inserted:
     st.toast("Análise gerada com sucesso!", icon="✅")
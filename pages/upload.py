@@ -3,13 +3,21 @@ from datetime import datetime
 import pandas as pd
 import os
 
+from src.model.cache import DatasetCache
+from src.model.data import Data
+from src.model.ingest import StreamingIngestion
+from src.model.preprocessing import PreprocessConfig, Duplicates, Imputation, FREQUENCIES, frequency_alias
+from src.model.registry import REGISTRY
+
 # ---------------- Funções utilitárias ----------------
 
 def upload():
   """Lida com o processo de upload de um arquivo."""
   try:
     uploaded_file = st.session_state.uploaded_file
-    df = pd.read_csv(uploaded_file)
+    # Lê apenas o cabeçalho: o arquivo completo é processado em blocos na confirmação
+    df = pd.read_csv(uploaded_file, nrows=0)
+    uploaded_file.seek(0)
 
     # Reseta as variáveis
     for var in ["columns", "duplicate_treatment", "regularize_data", "frequency", "frequency_interval",
@@ -52,6 +60,8 @@ def rename_file(old_name, new_name):
       return
 
     os.rename(original_path, new_path)
+    DatasetCache(original_path).clear()
+    REGISTRY.invalidate(original_path)
     st.rerun()
   except Exception as e:
     st.error(f"❌ Erro ao renomear {old_name}: {str(e)}")
@@ -70,7 +80,7 @@ def configuration_dialog(dataset: str, uploaded_file: str):
     if date_col == value_col:
       st.warning("As colunas devem ser diferentes.")
     else:
-      duplicate_treatment = st.radio("O que fazer com valores duplicados?", ["Manter o primeiro", "Manter o último", "Somar valores duplicados"], index=0, key="duplicate_treatment_key", help="Dados duplicados acontecem quando há repetição de datas na série temporal")
+      duplicate_treatment = st.radio("O que fazer com valores duplicados?", options=list(Duplicates), index=0, format_func=lambda d: d.value, key="duplicate_treatment_key", help="Dados duplicados acontecem quando há repetição de datas na série temporal")
       st.session_state.duplicate_treatment = duplicate_treatment
 
   # --- ETAPA 2: Seleção de uniformidade e método de imputação de dados ---
@@ -81,7 +91,7 @@ def configuration_dialog(dataset: str, uploaded_file: str):
     if regularize_data == "Sim":
       col1, col2 = st.columns(2)
       with col1:
-        frequency = st.selectbox("Frequência:", options=["Diário", "Semanal", "Mensal", "Anual", "Hora", "Minuto"], index=0, key="frequency_key", help="Define a unidade de tempo da série temporal (Diário, Semanal, Mensal, etc.)")
+        frequency = st.selectbox("Frequência:", options=list(FREQUENCIES), index=0, key="frequency_key", help="Define a unidade de tempo da série temporal (Diário, Semanal, Mensal, etc.)")
         st.session_state.frequency = frequency
       with col2:
         frequency_interval = st.number_input("Intervalo:", min_value=1, max_value=60, value=1, step=1, key="frequency_interval_key", help="Define a cada quantas unidades da frequência os dados serão considerados")
@@ -91,25 +101,14 @@ def configuration_dialog(dataset: str, uploaded_file: str):
     st.session_state.impute_data = impute_data
 
     if impute_data == "Sim":
-      imputation_method_op = [
-        "Média",
-        "Mediana",
-        "Última Observação",
-        "Próxima Observação",
-        "Média Móvel Simples",
-        "Média Móvel Exponencial",
-        "Interpolação Linear",
-        "Interpolação Spline",
-        "Preencher com zero"
-      ]
-      imputation_method = st.selectbox("Selecione o método de imputação:", imputation_method_op, index=0, key="imputation_method_key")
+      imputation_method = st.selectbox("Selecione o método de imputação:", options=list(Imputation), index=0, format_func=lambda m: m.value, key="imputation_method_key")
       st.session_state.imputation_method = imputation_method
 
-      if imputation_method == "Média Móvel Simples":
+      if imputation_method == Imputation.SMA:
         st.session_state.window = st.slider("Tamanho da janela", min_value=1, max_value=30, value=3, key="window_key")
-      elif imputation_method == "Média Móvel Exponencial":
+      elif imputation_method == Imputation.EMA:
         st.session_state.span = st.slider("Valor do span", min_value=1, max_value=30, value=3, key="span_key")
-      elif imputation_method == "Interpolação Spline":
+      elif imputation_method == Imputation.SPLINE:
         st.session_state.order = st.slider("Ordem", min_value=1, max_value=5, value=2, key="order_key")
 
   # --- ETAPA 3: Nome do arquivo CSV ---
@@ -125,72 +124,25 @@ def configuration_dialog(dataset: str, uploaded_file: str):
   def prev_step():
     st.session_state.step -= 1
 
-  # Aplica as configurações no dataset
-  def configure_dataset():
-    # Cria uma cópia apenas das colunas selecionadas
-    date_col = st.session_state.columns["date"]
-    value_col = st.session_state.columns["value"]
-    df = dataset[[date_col, value_col]].copy()
-
-    # Renomeia as colunas para "date" e "value"
-    df.rename(columns={date_col: "date", value_col: "value"}, inplace=True)
-    # Ordena pela coluna "date" em ordem crescente
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values('date', ascending=True).reset_index(drop=True)
-
-    # Aplica tratamento de dados duplicados
-    duplicate_treatment = st.session_state.duplicate_treatment
-
-    if duplicate_treatment == "Manter o primeiro":
-      df = df.drop_duplicates(subset="date", keep="first")
-    elif duplicate_treatment == "Manter o último":
-      df = df.drop_duplicates(subset="date", keep="last")
-    elif duplicate_treatment == "Somar valores duplicados":
-      df = df.groupby("date", as_index=False)['value'].sum(min_count=1)
-
-    # Garante intervalo completo de datas
-    regularize_data = st.session_state.regularize_data
-    frequency = st.session_state.frequency
-    frequency_interval = st.session_state.frequency_interval
-
-    if regularize_data == "Sim":
-      freq_options = {"Diário": "D", "Semanal": "W", "Mensal": "M", "Anual": "Y", "Hora": "h", "Minuto": "min"}
-      frequency = freq_options[frequency] if frequency_interval == 1 else f"{frequency_interval}{freq_options[frequency]}"
-      df_range = pd.date_range(start=df["date"].min(), end=df["date"].max(), freq=frequency)
-      df_range = pd.DataFrame({"date": df_range })
-      df = pd.merge(df_range, df, on="date", how="left")
-
-    # Aplica imputação de dados ausentes
-    impute_data = st.session_state.impute_data
-    imputation_method = st.session_state.imputation_method
-    window = st.session_state.window
-    span = st.session_state.span
-    order = st.session_state.order
-
-    if impute_data == "Sim":
-      if imputation_method == "Média":
-        df["value"] = df["value"].fillna(round(df["value"].mean(), 2))
-      elif imputation_method == "Mediana":
-        df["value"] = df["value"].fillna(df["value"].median())
-      elif imputation_method == "Última Observação":
-        df["value"] = df["value"].ffill().bfill()
-      elif imputation_method == "Próxima Observação":
-        df["value"] = df["value"].bfill().ffill()
-      elif imputation_method == "Média Móvel Simples":
-        df["value"] = df["value"].fillna(df["value"].rolling(window=window, min_periods=1).mean()).ffill().bfill()
-      elif imputation_method == "Média Móvel Exponencial":
-        df["value"] = df["value"].fillna(df["value"].ewm(span=span, adjust=False).mean()).ffill().bfill()
-      elif imputation_method == "Interpolação Linear":
-        df["value"] = df["value"].interpolate(method='linear').ffill().bfill()
-      elif imputation_method == "Interpolação Spline":
-        try:
-          df["value"] = df["value"].interpolate(method='spline', order=order).ffill().bfill()
-        except:
-          df["value"] = df["value"].interpolate(method='linear').ffill().bfill()
-      elif imputation_method == "Preencher com zero":
-        df["value"] = df["value"].fillna(0)
-
-    return df
+  # Converte as escolhas do diálogo na configuração do pré-processamento
+  def preprocess_config() -> PreprocessConfig:
+    regularize = st.session_state.regularize_data == "Sim"
+    impute = st.session_state.impute_data == "Sim"
+    return PreprocessConfig(
+      date_col=st.session_state.columns["date"],
+      value_col=st.session_state.columns["value"],
+      duplicates=st.session_state.duplicate_treatment,
+      frequency=frequency_alias(st.session_state.frequency, st.session_state.frequency_interval) if regularize else None,
+      imputation=st.session_state.imputation_method if impute else None,
+      window=st.session_state.window,
+      span=st.session_state.span,
+      order=st.session_state.order
+    )
+
+  # Aplica as configurações no dataset, lendo o arquivo em blocos
+  def configure_dataset(csv_path: str) -> int:
+    uploaded_file.seek(0)
+    return StreamingIngestion(source=uploaded_file, config=preprocess_config()).run(csv_path)
 
   col1, col2 = st.columns(2, gap="large")
   with col1:
@@ -200,8 +152,8 @@ def configuration_dialog(dataset: str, uploaded_file: str):
     if st.session_state.step == 3:
       csv_path = f"data/{st.session_state.csv_name}.csv"
       if st.button("Confirmar", use_container_width=True, type="primary", disabled=os.path.isfile(csv_path)):
-        df = configure_dataset()
-        df.to_csv(csv_path, index=False)
+        configure_dataset(csv_path)
+        DatasetCache(csv_path).build()
         st.rerun()
     else:
       disabled = False
@@ -232,6 +184,8 @@ def confirmation_dialog(datasets: list):
       for dataset in datasets:
         try:
           os.remove(f"data/{dataset}")
+          DatasetCache(f"data/{dataset}").clear()
+          REGISTRY.invalidate(f"data/{dataset}")
         except FileNotFoundError:
           st.toast(f"Arquivo '{dataset}' não encontrado.", icon="⚠️")
         except Exception as e:
@@ -247,7 +201,7 @@ uploaded_file = st.file_uploader("Escolha um arquivo", on_change=upload, key="up
 
 # ---------------- Datasets disponíveis ----------------
 
-datasets = os.listdir("data") if os.path.exists("data") else []
+datasets = Data.list_datasets()
 
 if datasets:
   info = []
@@ -264,7 +218,8 @@ if datasets:
       file_extension = os.path.splitext(dataset)[1].upper() or "CSV"
 
       try:
-        row_count = len(pd.read_csv(file_path))
+        metadata = Data.metadata(file_path)
+        row_count = metadata["rows"] if metadata is not None else len(pd.read_csv(file_path))
       except Exception:
         row_count = "N/A"
     else:
@@ -0,0 +1,241 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+CACHE_DIR = '.cache'
+CACHE_VERSION = 4
+DAY_NS = 86_400_000_000_000
+SERIES_COL = 'series_id'
+
+def summarize(dates: np.ndarray, values: np.ndarray) -> dict:
+  """
+  Calcula os metadados de um dataset a partir das colunas ordenadas.
+
+  Args:
+    dates (np.ndarray): Datas em epoch int64 (ns), ordenadas dentro de cada série.
+    values (np.ndarray): Valores em float64.
+
+  Returns:
+    dict: Quantidade de linhas, intervalo de datas, frequência inferida e estatísticas dos valores.
+  """
+  # Datas sem horário (todas à meia-noite) são gravadas no CSV apenas como 'YYYY-MM-DD'
+  daily = bool((dates % DAY_NS == 0).all())
+  date_format = '%Y-%m-%d' if daily else '%Y-%m-%d %H:%M:%S'
+
+  frequency = None
+  if len(dates) > 1:
+    steps, counts = np.unique(np.diff(dates), return_counts=True)
+    step = pd.Timedelta(int(steps[counts.argmax()]))
+    frequency = pd.tseries.frequencies.to_offset(step).freqstr if step > pd.Timedelta(0) else None
+
+  valid = values[~np.isnan(values)]
+  stats = {"count": int(len(valid))}
+  if len(valid):
+    q1, q2, q3 = np.percentile(valid, [25, 50, 75])
+    stats.update({
+      "min": float(valid.min()),
+      "max": float(valid.max()),
+      "mean": float(valid.mean()),
+      "std": float(valid.std(ddof=1)) if len(valid) > 1 else None,
+      "25%": float(q1),
+      "50%": float(q2),
+      "75%": float(q3),
+    })
+
+  return {
+    "rows": int(len(dates)),
+    "daily": daily,
+    "start": pd.Timestamp(int(dates.min())).strftime(date_format) if len(dates) else None,
+    "end": pd.Timestamp(int(dates.max())).strftime(date_format) if len(dates) else None,
+    "frequency": frequency,
+    "stats": stats,
+  }
+
+class DatasetCache:
+  def __init__(self, path: str):
+    """
+    Classe responsável pelo cache colunar de um dataset.
+
+    O CSV continua sendo o formato de troca; na primeira leitura as colunas
+    'date' (epoch int64 em nanossegundos) e 'value' (float64) são gravadas em
+    arquivos .npy, lidos depois via memory-map. O cache é invalidado pelo
+    mtime/tamanho do CSV e, quando estes mudam, pelo hash do conteúdo.
+    As colunas são gravadas ordenadas por data, formando o índice temporal
+    usado nas buscas binárias de Data. O meta.json funciona também como índice
+    de metadados (linhas, intervalo de datas, frequência e estatísticas), lido
+    sem carregar as colunas.
+
+    Datasets em formato longo (colunas 'series_id', 'date' e 'value') são gravados
+    ordenados por série e data, com uma tabela de offsets (offsets.npy): cada série
+    é uma fatia contígua das colunas, lida sem tocar nas demais.
+
+    Args:
+      path (str): Caminho do arquivo CSV do dataset.
+    """
+    self.path = Path(path)
+    self.dir = self.path.parent / CACHE_DIR / self.path.name
+    self.meta_path = self.dir / 'meta.json'
+    self.date_path = self.dir / 'date.npy'
+    self.value_path = self.dir / 'value.npy'
+    self.offsets_path = self.dir / 'offsets.npy'
+    self.meta = None
+
+  def signature(self) -> dict:
+    """Retorna o mtime e o tamanho atuais do CSV."""
+    stat = os.stat(self.path)
+    return {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+  def content_hash(self) -> str:
+    """Calcula o hash do conteúdo do CSV em blocos."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(self.path, 'rb') as f:
+      for block in iter(lambda: f.read(1 << 20), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+  def read_meta(self) -> dict:
+    """Lê os metadados do cache, se existirem."""
+    try:
+      with open(self.meta_path) as f:
+        meta = json.load(f)
+      return meta if meta.get("version") == CACHE_VERSION else None
+    except (FileNotFoundError, json.JSONDecodeError):
+      return None
+
+  def write_meta(self, meta: dict) -> None:
+    """Grava os metadados do cache de forma atômica."""
+    tmp_path = self.meta_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+      json.dump(meta, f)
+    os.replace(tmp_path, self.meta_path)
+
+  def is_valid(self) -> bool:
+    """Verifica se o cache corresponde ao CSV atual."""
+    meta = self.read_meta()
+    if meta is None or not self.date_path.exists() or not self.value_path.exists():
+      return False
+    if "series" in meta and not self.offsets_path.exists():
+      return False
+
+    signature = self.signature()
+    if meta["mtime"] == signature["mtime"] and meta["size"] == signature["size"]:
+      self.meta = meta
+      return True
+
+    # O arquivo foi tocado: só reconstrói se o conteúdo de fato mudou
+    if meta["size"] == signature["size"] and meta["hash"] == self.content_hash():
+      meta.update(signature)
+      self.write_meta(meta)
+      self.meta = meta
+      return True
+    return False
+
+  def build(self) -> bool:
+    """Lê o CSV uma única vez e grava as colunas no cache."""
+    try:
+      print(f"[INFO] Construindo cache colunar para: {self.path}")
+      signature = self.signature()
+      header = pd.read_csv(self.path, nrows=0).columns
+      usecols = ['date', 'value'] + ([SERIES_COL] if SERIES_COL in header else [])
+      df = pd.read_csv(self.path, usecols=usecols, dtype={SERIES_COL: str})
+      dates = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]').view('int64')
+      values = df['value'].to_numpy(dtype='float64')
+
+      series = {}
+      if SERIES_COL in df:
+        # Formato longo: ordena por (série, data) e guarda onde cada série começa
+        codes, ids = pd.factorize(df[SERIES_COL], sort=True)
+        order = np.lexsort((dates, codes))
+        dates, values, codes = dates[order], values[order], codes[order]
+        offsets = np.searchsorted(codes, np.arange(len(ids) + 1))
+        series = {"series": [str(i) for i in ids]}
+      elif len(dates) > 1 and (dates[1:] < dates[:-1]).any():
+        order = np.argsort(dates, kind='stable')
+        dates, values = dates[order], values[order]
+
+      self.dir.mkdir(parents=True, exist_ok=True)
+      arrays = [(self.date_path, dates), (self.value_path, values)]
+      if series:
+        arrays.append((self.offsets_path, offsets))
+      for path, array in arrays:
+        tmp_path = path.with_suffix('.tmp.npy')
+        np.save(tmp_path, np.ascontiguousarray(array))
+        os.replace(tmp_path, path)
+
+      self.meta = {
+        "version": CACHE_VERSION,
+        "hash": self.content_hash(),
+        **summarize(dates, values),
+        **series,
+        **signature,
+      }
+      self.write_meta(self.meta)
+      return True
+    except (ValueError, TypeError, pd.errors.ParserError) as e:
+      print(f"[WARNING] Não foi possível gerar o cache de {self.path}: {e}")
+      return False
+
+  def load(self, series_id: str = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Retorna as colunas (date, value) do cache, construindo-o se necessário.
+
+    Args:
+      series_id (str): Série a ser retornada em datasets no formato longo (None retorna todas).
+
+    Returns:
+      tuple: (date em epoch int64 ns, value em float64), ambos via memory-map.
+    """
+    if not self.is_valid() and not self.build():
+      return None, None
+    dates = np.load(self.date_path, mmap_mode='r')
+    values = np.load(self.value_path, mmap_mode='r')
+    if series_id is None:
+      return dates, values
+
+    start, stop = self.series_offsets(series_id)
+    return dates[start:stop], values[start:stop]
+
+  def series_offsets(self, series_id: str) -> tuple[int, int]:
+    """Retorna a fatia [início, fim) de uma série na tabela de offsets."""
+    if series_id not in self.meta.get("series", []):
+      raise ValueError(f"Série '{series_id}' não encontrada em {self.path.name}.")
+    i = self.meta["series"].index(series_id)
+    offsets = np.load(self.offsets_path, mmap_mode='r')
+    return int(offsets[i]), int(offsets[i + 1])
+
+  def metadata(self, series_id: str = None) -> dict:
+    """
+    Retorna os metadados do dataset sem carregar as colunas.
+    O índice é reconstruído apenas se o CSV tiver mudado. Para uma série de um
+    dataset no formato longo, retorna apenas a quantidade de linhas e o intervalo de datas.
+    """
+    if not self.is_valid() and not self.build():
+      return None
+    if series_id is None:
+      return self.meta
+
+    start, stop = self.series_offsets(series_id)
+    dates = np.load(self.date_path, mmap_mode='r')
+    date_format = '%Y-%m-%d' if self.meta["daily"] else '%Y-%m-%d %H:%M:%S'
+    return {
+      "rows": stop - start,
+      "daily": self.meta["daily"],
+      "start": pd.Timestamp(int(dates[start])).strftime(date_format) if stop > start else None,
+      "end": pd.Timestamp(int(dates[stop - 1])).strftime(date_format) if stop > start else None,
+      "frequency": self.meta["frequency"],
+    }
+
+  def to_frame(self) -> pd.DataFrame:
+    """Retorna o dataset em cache como DataFrame com as colunas 'date' e 'value'."""
+    dates, values = self.load()
+    if dates is None:
+      return None
+    return pd.DataFrame({"date": dates.view('datetime64[ns]'), "value": values})
+
+  def clear(self) -> None:
+    """Remove o cache do dataset."""
+    shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,136 @@
+import numpy as np
+from enum import Enum
+
+from src.model.prompt import PromptModel, PromptType
+from src.model.tokens import TokenEstimator, ESTIMATOR
+from src.model.window import TimeSeriesWindow
+
+class Reduction(str, Enum):
+  NONE = 'NONE'
+  TRIM = 'TRIM'
+  PAA = 'PAA'
+  LTTB = 'LTTB'
+
+# ---------------------- REDUTORES ----------------------
+def reduce_paa(dates: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+  """Piecewise Aggregate Approximation: média de 'size' blocos consecutivos, datados pelo início de cada bloco."""
+  edges = np.linspace(0, len(values), size + 1).astype(np.int64)
+  means = np.add.reduceat(values, edges[:-1]) / np.diff(edges)
+  return dates[edges[:-1]], means
+
+def reduce_lttb(dates: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Largest-Triangle-Three-Buckets: escolhe 'size' pontos reais da série preservando a sua forma.
+  O primeiro e o último ponto são sempre mantidos; em cada bloco intermediário fica o ponto que
+  forma o maior triângulo com o ponto escolhido no bloco anterior e a média do bloco seguinte.
+  """
+  n = len(values)
+  if size < 3:
+    index = np.linspace(0, n - 1, size).round().astype(np.int64)
+    return dates[index], values[index]
+
+  x = np.arange(n, dtype=np.float64)
+  every = (n - 2) / (size - 2)
+  index = np.empty(size, dtype=np.int64)
+  index[0], index[-1] = 0, n - 1
+  chosen = 0
+  for i in range(size - 2):
+    start, end = int(i * every) + 1, int((i + 1) * every) + 1
+    after = slice(end, min(int((i + 2) * every) + 1, n))
+    mean_x, mean_y = x[after].mean(), values[after].mean()
+    area = np.abs(
+      (x[chosen] - mean_x) * (values[start:end] - values[chosen]) -
+      (x[chosen] - x[start:end]) * (mean_y - values[chosen])
+    )
+    chosen = start + int(np.argmax(area))
+    index[i + 1] = chosen
+  return dates[index], values[index]
+
+REDUCERS = {
+  Reduction.PAA: reduce_paa,
+  Reduction.LTTB: reduce_lttb
+}
+
+def reduce_window(window: TimeSeriesWindow, size: int, reduction: Reduction, recent: int) -> TimeSeriesWindow:
+  """
+  Reduz a janela a 'size' pontos mantendo os 'recent' pontos mais recentes intactos.
+
+  TRIM descarta o histórico mais antigo e devolve uma fatia da janela (que continua
+  reaproveitando o cache de serialização); PAA e LTTB resumem o histórico anterior aos
+  pontos recentes em 'size - recent' pontos.
+  """
+  n = len(window)
+  recent = min(recent, size)
+  if size >= n:
+    return window
+  if reduction == Reduction.TRIM or size == recent:
+    return window[n - size:]
+
+  older = n - recent
+  dates, values = REDUCERS[reduction](window.dates[:older].view('int64'), window.values[:older], size - recent)
+  return TimeSeriesWindow(
+    np.concatenate([dates, window.dates[older:].view('int64')]),
+    np.concatenate([values, window.values[older:]]).round(3)
+  )
+
+# ---------------------- AJUSTE AO CONTEXTO ----------------------
+def fit_context(
+  model: PromptModel, budget: int, reduction: Reduction = Reduction.LTTB,
+  recent: int = None, estimator: TokenEstimator = ESTIMATOR
+) -> tuple[PromptModel, dict]:
+  """
+  Ajusta a janela do prompt a um orçamento de tokens (prompt + resposta), entre Data.prompt e PromptModel.generate.
+
+  Se o prompt já cabe no orçamento, nada muda. Caso contrário, uma busca binária encontra o
+  maior número de pontos cuja janela reduzida cabe no orçamento.
+
+  Args:
+    model (PromptModel): Prompt com a janela completa.
+    budget (int): Orçamento de tokens do contexto.
+    reduction (Reduction): Redução aplicada ao histórico antigo (TRIM, PAA ou LTTB).
+    recent (int): Pontos mais recentes mantidos na resolução original (padrão: 4 x periods).
+    estimator (TokenEstimator): Estimador de tokens.
+
+  Returns:
+    tuple: (PromptModel com a janela ajustada, registro com reduction, points, original_points,
+      tokens, original_tokens e tokens_saved).
+
+  Raises:
+    ValueError: Se nem a menor janela possível couber no orçamento.
+  """
+  def tokens(window: TimeSeriesWindow) -> tuple[PromptModel, int]:
+    fitted = PromptModel(window, model.periods, model.prompt_type, model.ts_format, model.ts_type, model.series_id, model.layout)
+    return fitted, fitted.estimate(estimator, formats=[model.ts_format], types=[model.ts_type])[0]["total_tokens"]
+
+  window = model.window
+  original = tokens(window)[1]
+  record = {
+    "reduction": Reduction.NONE,
+    "points": len(window),
+    "original_points": len(window),
+    "tokens": original,
+    "original_tokens": original,
+    "tokens_saved": 0,
+  }
+  if original <= budget or reduction == Reduction.NONE:
+    return model, record
+
+  recent = 4 * model.periods if recent is None else recent
+  # FEW-SHOT e COT-FEW tiram os exemplos dos 96 primeiros pontos da janela
+  low = 96 if model.prompt_type in (PromptType.FEW_SHOT, PromptType.COT_FEW) else 1
+  best = None
+  high = len(window) - 1
+  while low <= high:
+    size = (low + high) // 2
+    fitted, used = tokens(reduce_window(window, size, reduction, recent))
+    if used <= budget:
+      best, low = (fitted, used), size + 1
+    else:
+      high = size - 1
+  if best is None:
+    raise ValueError(f"A janela não cabe no orçamento de {budget} tokens mesmo reduzida ({reduction.value}).")
+
+  fitted, used = best
+  record.update(reduction=reduction, points=len(fitted.window), tokens=used, tokens_saved=original - used)
+  print(f"[INFO] Janela ajustada ao contexto ({reduction.value}): {len(window)} -> {len(fitted.window)} pontos, {original} -> {used} tokens.")
+  return fitted, record
@@ -1,9 +1,17 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import date
+from typing import Iterator
+
+from src.model.cache import DatasetCache
+from src.model.registry import REGISTRY
+from src.model.window import TimeSeriesWindow
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
 
 class Data:
-  def __init__(self, dataset:str, start_date:date, end_date:date, periods:int):
+  def __init__(self, dataset:str, start_date:date, end_date:date, periods:int, series_id:str = None):
     """
     Classe para manipulação de dados.
 
@@ -12,20 +20,53 @@ class Data:
       start_date (date): Data de início do recorte dos dados.
       end_date (date): Data de fim do recorte dos dados.
       periods (int): Quantidade de períodos futuros a prever.
+      series_id (str): Série selecionada em datasets no formato longo (series_id, date, value).
     """
     self.dataset = dataset
     self.start_date = start_date
     self.end_date = end_date
     self.periods = periods
-    dir = Path(__file__).resolve().parent
-    self.path =  dir.parent.parent / 'data' / self.dataset
+    self.series_id = series_id
+    self.path = DATA_DIR / self.dataset
+    self.source = (str(self.path), self.series_id)
+    self.daily = False
+
+  @staticmethod
+  def list_datasets() -> list[str]:
+    """Lista os arquivos de dataset disponíveis, ignorando o diretório de cache."""
+    if not DATA_DIR.exists():
+      return []
+    return sorted(f.name for f in DATA_DIR.iterdir() if f.is_file() and not f.name.startswith('.'))
+
+  @staticmethod
+  def metadata(path: str, series_id: str = None) -> dict:
+    """Retorna o índice de metadados do dataset ou de uma de suas séries (linhas, datas, frequência e estatísticas)."""
+    try:
+      return DatasetCache(path).metadata(series_id)
+    except FileNotFoundError as e:
+      print(f"[ERROR] Arquivo não encontrado: {e}")
+      return None
+    except ValueError as e:
+      print(f"[ERROR] {e}")
+      return None
+
+  @staticmethod
+  def list_series(path: str) -> list[str]:
+    """Lista as séries de um dataset no formato longo (vazia para datasets com uma única série)."""
+    metadata = Data.metadata(path)
+    return metadata.get("series", []) if metadata else []
 
   @staticmethod
   def read_csv(path: str) -> pd.DataFrame:
-    """Lê um arquivo CSV do caminho especificado e retorna um DataFrame."""
+    """
+    Lê um arquivo CSV do caminho especificado e retorna um DataFrame.
+    A leitura passa pelo registro em memória e pelo cache colunar; o CSV só é analisado
+    quando o cache não existe ou está desatualizado.
+    """
     try:
       print(f"[INFO] Lendo dados do caminho: {path}")
-      dataset = pd.read_csv(path)
+      dates, values, _ = REGISTRY.get(path)
+      dataset = Data.frame(dates, values) if dates is not None else pd.read_csv(path)
       print(f"[INFO] Dados carregados com sucesso do arquivo: {path}")
       return dataset
     except FileNotFoundError as e:
@@ -35,18 +76,53 @@ class Data:
       print(f"[ERROR] Arquivo vazio: {e}")
       return None
 
+  @staticmethod
+  def frame(dates: np.ndarray, values: np.ndarray, offset: int = 0) -> pd.DataFrame:
+    """Monta um DataFrame sobre as colunas (date, value) sem copiá-las."""
+    return pd.DataFrame(
+      {"date": dates.view('datetime64[ns]'), "value": values},
+      index=pd.RangeIndex(offset, offset + len(dates)),
+      copy=False
+    )
+
+  def load(self) -> tuple[np.ndarray, np.ndarray]:
+    """Retorna as colunas (date, value) do dataset, ordenadas por data."""
+    print(f"[INFO] Lendo dados do caminho: {self.path}" + (f" (série {self.series_id})" if self.series_id else ""))
+    dates, values, meta = REGISTRY.get(self.path, self.series_id)
+    self.daily = bool(meta and meta.get("daily"))
+    if meta and "series" in meta and self.series_id is None:
+      raise ValueError(f"O dataset {self.dataset} possui várias séries: informe o series_id.")
+    return dates, values
+
+  def offsets(self, dates: np.ndarray) -> tuple[int, int, int]:
+    """
+    Converte start_date, end_date e periods em posições do índice temporal via busca binária.
+    Como na comparação das datas em texto do CSV, end_date só entra na janela em datasets
+    diários; nos demais a janela termina antes da meia-noite de end_date.
+
+    Args:
+      dates (np.ndarray): Datas ordenadas em epoch int64 (ns).
+
+    Returns:
+      tuple: (início, fim, limite) tais que dates[início:fim] é a janela e dates[fim:limite] os valores exatos.
+    """
+    start = int(np.searchsorted(dates, pd.Timestamp(self.start_date).value, side='left'))
+    end = int(np.searchsorted(dates, pd.Timestamp(self.end_date).value, side='right' if self.daily else 'left'))
+    return start, end, min(end + self.periods, len(dates))
+
   def period_selection(self) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Seleciona os dados entre as datas de início e fim e os dados futuros a prever."""
     try:
-      dataset = Data.read_csv(self.path)
-      if dataset is None or dataset.empty:
+      dates, values = self.load()
+      if dates is None or len(dates) == 0:
         raise ValueError("O dataset está vazio ou não foi carregado corretamente.")
       if self.start_date > self.end_date:
         raise ValueError("A data de início não pode ser maior que a data de fim.")
 
-      df = dataset.query("date >= @self.start_date and date <= @self.end_date")
-      df_true = dataset.query("date > @self.end_date")
-      return df, df_true[:self.periods]
+      start, end, stop = self.offsets(dates)
+      df = Data.frame(dates[start:end], values[start:end], start)
+      df_true = Data.frame(dates[end:stop], values[end:stop], end)
+      return df, df_true
     except ValueError as e:
       print(f"[ERROR] {e}")
       return None, None
@@ -54,18 +130,64 @@ class Data:
       print(f"[ERROR] Ocorreu um erro inesperado: {e}")
       return None, None
 
-  def prompt(self) -> tuple[list[float], list[float]]:
-    """Retorna os dados do período selecionado e os valores exatos a prever como listas."""
+  def origins(self, dates: np.ndarray, window: int, horizon: int, stride: int = 1) -> np.ndarray:
+    """
+    Calcula as posições de origem do backtest dentro do recorte [start_date, end_date].
+
+    Cada origem é a posição do primeiro valor previsto: há pelo menos 'window' valores
+    do recorte antes dela e 'horizon' valores exatos a partir dela.
+    """
+    start, end, _ = self.offsets(dates)
+    last = min(end, len(dates) - horizon)
+    return np.arange(start + window, last + 1, stride)
+
+  def rolling_origin(
+    self, window: int, horizon: int = None, stride: int = 1, expanding: bool = False
+  ) -> Iterator[tuple[TimeSeriesWindow, np.ndarray]]:
+    """
+    Gera pares (janela, y_true) para um backtest com origem móvel.
+
+    O dataset é carregado uma única vez; cada janela e cada y_true são visões
+    (sem cópia) das colunas em memória, de modo que o custo por origem é constante.
+    Use janela.to_frame() quando precisar de um DataFrame.
+
+    Args:
+      window (int): Tamanho da janela (tamanho mínimo quando expanding=True).
+      horizon (int): Quantidade de valores exatos por origem (padrão: periods).
+      stride (int): Distância entre origens consecutivas.
+      expanding (bool): Se True, a janela começa sempre em start_date e cresce a cada origem.
+
+    Yields:
+      tuple: (TimeSeriesWindow da janela, valores exatos em float64).
+    """
+    horizon = self.periods if horizon is None else horizon
+    if window <= 0 or horizon <= 0 or stride <= 0:
+      raise ValueError("window, horizon e stride devem ser inteiros positivos.")
+
+    dates, values = self.load()
+    if dates is None or len(dates) == 0:
+      raise ValueError("O dataset está vazio ou não foi carregado corretamente.")
+
+    first = self.offsets(dates)[0]
+    for origin in self.origins(dates, window, horizon, stride):
+      begin = first if expanding else origin - window
+      yield TimeSeriesWindow(dates[begin:origin], values[begin:origin], self.source, begin), values[origin:origin + horizon]
+
+  def prompt(self) -> tuple[TimeSeriesWindow, list[float]]:
+    """Retorna a janela do período selecionado e os valores exatos a prever, arredondados em 3 casas."""
     try:
-      dataset, df_true = self.period_selection()
-      if dataset is None or df_true is None:
+      dates, values = self.load()
+      if dates is None or len(dates) == 0:
         raise ValueError("Os dados não foram carregados corretamente.")
-      if dataset.empty or df_true.empty:
+      if self.start_date > self.end_date:
+        raise ValueError("A data de início não pode ser maior que a data de fim.")
+      start, end, stop = self.offsets(dates)
+      if start >= end or end >= stop:
         raise ValueError("Os dados estão vazios.")
 
       print(f"[INFO] Dados entre {self.start_date} e {self.end_date} carregados com sucesso.")
-      window = list(zip(dataset['date'].astype(str), dataset['value'].round(3)))
-      y_true = df_true['value'].round(3).tolist()
+      window = TimeSeriesWindow(dates[start:end], values[start:end], self.source, start).round(3)
+      y_true = values[end:stop].round(3).tolist()
       return window, y_true
     except ValueError as e:
       print(f"[ERROR] {e}")
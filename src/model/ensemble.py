@@ -0,0 +1,68 @@
+import warnings
+import numpy as np
+from enum import Enum
+
+class Aggregation(str, Enum):
+  MEDIAN = 'MEDIAN'
+  MEAN = 'MEAN'
+  TRIMMED_MEAN = 'TRIMMED_MEAN'
+
+def stack(samples: list, periods: int) -> np.ndarray:
+  """
+  Empilha as previsões das amostras em uma matriz float64 (amostras x periods).
+
+  Amostras mais curtas que o horizonte são completadas com NaN e as mais longas são cortadas,
+  de modo que um valor ausente em uma amostra não desloca as demais.
+  """
+  matrix = np.full((len(samples), periods), np.nan)
+  for i, sample in enumerate(samples):
+    values = np.asarray(sample, dtype=float)[:periods]
+    matrix[i, :len(values)] = values
+  return matrix
+
+# ---------------------- AGREGADORES ----------------------
+# Todos operam por coluna (período) e ignoram os NaN; colunas sem nenhum valor ficam NaN
+def aggregate_median(matrix: np.ndarray) -> np.ndarray:
+  return np.nanmedian(matrix, axis=0)
+
+def aggregate_mean(matrix: np.ndarray) -> np.ndarray:
+  return np.nanmean(matrix, axis=0)
+
+def aggregate_trimmed_mean(matrix: np.ndarray, proportion: float = 0.2) -> np.ndarray:
+  """Média aparada: descarta, em cada período, a fração 'proportion' dos menores e dos maiores valores."""
+  ordered = np.sort(matrix, axis=0) # Os NaN ficam no final de cada coluna
+  valid = (~np.isnan(matrix)).sum(axis=0)
+  cut = np.floor(valid * proportion).astype(np.int64)
+  rows = np.arange(len(matrix))[:, None]
+  keep = (rows >= cut) & (rows < valid - cut)
+  count = keep.sum(axis=0)
+  total = np.where(keep, ordered, 0.0).sum(axis=0)
+  return np.divide(total, count, out=np.full(matrix.shape[1], np.nan), where=count > 0)
+
+AGGREGATORS = {
+  Aggregation.MEDIAN: aggregate_median,
+  Aggregation.MEAN: aggregate_mean,
+  Aggregation.TRIMMED_MEAN: aggregate_trimmed_mean,
+}
+
+def aggregate(samples: list, periods: int, aggregation: Aggregation = Aggregation.MEDIAN) -> np.ndarray:
+  """
+  Combina as previsões de várias amostras em uma única previsão, período a período.
+
+  Args:
+    samples (list): Previsões de cada amostra (saídas de parse_timeseries).
+    periods (int): Horizonte da previsão.
+    aggregation (Aggregation): Agregação aplicada (MEDIAN, MEAN ou TRIMMED_MEAN).
+
+  Returns:
+    np.ndarray: Previsão agregada em float64, com NaN nos períodos que nenhuma amostra preencheu.
+  """
+  with warnings.catch_warnings():
+    warnings.simplefilter("ignore", RuntimeWarning) # Períodos sem nenhum valor
+    return AGGREGATORS[aggregation](stack(samples, periods))
+
+def quantiles(samples: list, periods: int, q: tuple = (0.1, 0.9)) -> np.ndarray:
+  """Retorna os quantis 'q' das amostras em cada período (matriz len(q) x periods), usados como faixa de incerteza."""
+  with warnings.catch_warnings():
+    warnings.simplefilter("ignore", RuntimeWarning)
+    return np.nanquantile(stack(samples, periods), q, axis=0)
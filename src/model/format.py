@@ -1,8 +1,11 @@
 import json
 import re
-import pandas as pd
-from io import StringIO
+import threading
+import numpy as np
 from enum import Enum
+from collections import Counter
+
+from src.model.window import TimeSeriesWindow
 
 # ---------------------- FORMATOS ----------------------
 class TSFormat(str, Enum):
@@ -20,39 +23,121 @@ class TSFormat(str, Enum):
 class TSType(str, Enum):
   NUMERIC = 'NUMERIC'
   TEXTUAL = 'TEXTUAL'
+  SCALED = 'SCALED'
+  DELTA = 'DELTA'
+  SYMBOLIC = 'SYMBOLIC'
+
+# Tipos codificados valor a valor, sem depender do restante da janela (e portanto cacheáveis)
+ELEMENTWISE = {TSType.NUMERIC, TSType.TEXTUAL}
 
 # ---------------------- FORMATADORES ----------------------
+SYMBOLS = ("↓", "→", "↑")
+JSON_CONSTANTS = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
+
+class Columns:
+  __slots__ = ('dates', 'texts', 'values')
+
+  def __init__(self, dates: list[str], texts: list[str], values):
+    """
+    Colunas de uma janela prontas para serialização, já codificadas pelo TSType.
+
+    Args:
+      dates (list[str]): Datas em texto.
+      texts (list[str]): Valores codificados, em texto.
+      values: Valores comparados pelo indicador de direção (array float64 ou os próprios textos).
+    """
+    self.dates = dates
+    self.texts = texts
+    self.values = values
+
+  def __len__(self) -> int:
+    return len(self.texts)
+
+  def __getitem__(self, key: slice) -> 'Columns':
+    return Columns(self.dates[key], self.texts[key], self.values[key])
+
+def columns(data) -> Columns:
+  """
+  Separa uma TimeSeriesWindow ou lista de tuplas (data, valor) nas colunas de datas e de valores
+  em texto. Na janela, as datas saem de uma única conversão vetorizada e os valores do array
+  float64, sem passar por tuplas.
+  """
+  if isinstance(data, Columns):
+    return data
+  if isinstance(data, TimeSeriesWindow):
+    return Columns(data.labels(), list(map(str, data.values.tolist())), data.values)
+  dates, values = zip(*data) if data else ((), ())
+  return Columns(list(map(str, dates)), list(map(str, values)), list(values))
+
+def join_rows(fields: list[list[str]], before: str, between: str, after: str, sep: str = "\n") -> str:
+  """
+  Monta as linhas before + campo1 + between + campo2 ... + after, separadas por sep.
+
+  Equivale a sep.join(f"{before}{d}{between}{v}{after}" ...), mas cada linha é montada
+  por str.join em C e o texto final sai de um único join, sem f-string por linha.
+  """
+  if not fields[0]:
+    return ""
+  return before + (after + sep + before).join(map(between.join, zip(*fields))) + after
+
+def directions(values) -> list[str]:
+  """
+  Indicadores de direção de cada valor em relação ao anterior (o primeiro é sempre "→").
+  As comparações são vetorizadas e seguem as do Python: valores em texto (TEXTUAL) são
+  comparados como texto e NaN resulta em "→".
+  """
+  values = np.asarray(values)
+  if len(values) == 0:
+    return []
+  steps = 1 + (values[1:] > values[:-1]).astype(np.int8) - (values[1:] < values[:-1])
+  return ["→"] + list(map(SYMBOLS.__getitem__, steps.tolist()))
+
+def json_values(data: Columns) -> list[str]:
+  """Serializa os valores como o json.dumps faria, em lote quando são todos float ou todos texto."""
+  values = data.values
+  if isinstance(values, np.ndarray) and values.dtype.kind == 'f' or all(type(v) is float for v in values):
+    return [JSON_CONSTANTS.get(v, v) for v in data.texts]
+  if all(type(v) is str for v in values):
+    return list(map(json.encoder.encode_basestring_ascii, values))
+  return list(map(json.dumps, values))
+
 def format_array(data) -> str:
-  if data and isinstance(data[0], (tuple, list)):
-    data = [v for _, v in data]
-  return "[" + ", ".join(map(str, data)) + "]"
+  if data and not isinstance(data, (Columns, TimeSeriesWindow)) and not isinstance(data[0], (tuple, list)):
+    return "[" + ", ".join(map(str, data)) + "]"
+  return "[" + ", ".join(columns(data).texts) + "]"
 
 def format_custom(data) -> str:
-  return "Date|Value\n" + "\n".join(f"{d}|{v}" for d, v in data)
+  data = columns(data)
+  return "Date|Value\n" + join_rows([data.dates, data.texts], "", "|", "")
 
 def format_tsv(data) -> str:
-  return "Date\tValue\n" + "\n".join(f"{d}\t{v}" for d, v in data)
+  data = columns(data)
+  return "Date\tValue\n" + join_rows([data.dates, data.texts], "", "\t", "")
 
 def format_plain(data) -> str:
-  return "\n".join(f"Date: {d}, Value: {v}" for d, v in data)
+  data = columns(data)
+  return join_rows([data.dates, data.texts], "Date: ", ", Value: ", "")
 
 def format_json(data) -> str:
-  return json.dumps([{"Date": d, "Value": v} for d, v in data])
+  data = columns(data)
+  dates = list(map(json.encoder.encode_basestring_ascii, data.dates))
+  return "[" + join_rows([dates, json_values(data)], '{"Date": ', ', "Value": ', "}", sep=", ") + "]"
 
 def format_markdown(data) -> str:
-  return "|Date|Value|\n|---|---|\n" + "\n".join(f"|{d}|{v}|" for d, v in data)
+  data = columns(data)
+  return "|Date|Value|\n|---|---|\n" + join_rows([data.dates, data.texts], "|", "|", "|")
 
 def format_context(data) -> str:
-  return "Date,Value\n" + "\n".join(f"{d},[{v}]" for d, v in data)
+  data = columns(data)
+  return "Date,Value\n" + join_rows([data.dates, data.texts], "", ",[", "]")
 
 def format_symbol(data) -> str:
-  def direction(i: int) -> str:
-    if i == 0: return "→"
-    return "↑" if data[i][1] > data[i-1][1] else "↓" if data[i][1] < data[i-1][1] else "→"
-  return "Date,Value,DirectionIndicator\n" + "\n".join(f"{d},{v},{direction(i)}" for i, (d, v) in enumerate(data))
+  data = columns(data)
+  return "Date,Value,DirectionIndicator\n" + join_rows([data.dates, data.texts, directions(data.values)], "", ",", "")
 
 def format_csv(data) -> str:
-  return "Date,Value\n" + "\n".join(f"{d},{v}" for d, v in data)
+  data = columns(data)
+  return "Date,Value\n" + join_rows([data.dates, data.texts], "", ",", "")
 
 FORMATTERS = {
   TSFormat.ARRAY: format_array,
@@ -67,46 +152,51 @@ FORMATTERS = {
 }
 
 # ---------------------- ANALISADORES ----------------------
-def parse_array(data: str) -> list:
+PLAIN_ROW = re.compile(r'Date:\s*([^,]+),\s*Value:\s*(.*)')
+
+def parse_columns(lines: list[str], sep: str) -> list[str]:
+  """
+  Extrai a coluna 'Value' de linhas delimitadas, sendo a primeira o cabeçalho, em uma única passada.
+
+  Como no pd.read_csv, a coluna é localizada pelo nome no cabeçalho, linhas em branco são
+  ignoradas e campos ausentes ou em branco viram NaN. Os valores saem em texto, sem espaços nem
+  aspas ao redor.
+  """
+  lines = [line for line in lines if line.strip()]
+  column = [name.strip().strip('"') for name in lines[0].split(sep)].index("Value")
+  values = []
+  for line in lines[1:]:
+    fields = line.split(sep, column + 1)
+    values.append((fields[column].strip().strip('"') if len(fields) > column else "") or "nan")
+  return values
+
+def parse_array(data: str) -> list[str]:
   return data.strip("[]").split(", ")
 
-def parse_custom(data: str) -> list:
-  df = pd.read_csv(StringIO(data), sep="|")
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+def parse_custom(data: str) -> list[str]:
+  return parse_columns(data.splitlines(), "|")
 
-def parse_tsv(data: str) -> list:
-  df = pd.read_csv(StringIO(data), sep="\t")
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+def parse_tsv(data: str) -> list[str]:
+  return parse_columns(data.splitlines(), "\t")
 
-def parse_plain(data: str) -> list:
-  out = []
-  for line in data.strip().splitlines():
-    match = re.match(r'Date:\s*([^,]+),\s*Value:\s*(.*)', line.strip())
-    if match: out.append((match[1], match[2]))
-  return out
+def parse_plain(data: str) -> list[str]:
+  return [match[2] for match in map(PLAIN_ROW.match, data.strip().splitlines()) if match]
 
 def parse_json(data: str) -> list:
-  return [(v["Date"], v["Value"]) for v in json.loads(data)]
+  return [v["Value"] for v in json.loads(data)]
 
-def parse_markdown(data: str) -> list:
+def parse_markdown(data: str) -> list[str]:
   data = data.strip().splitlines()
-  data = [line.strip().strip("|") for line in [data[0]] + data[2:]]
-  df = pd.read_csv(StringIO("\n".join(data)), sep="|", engine="python", skipinitialspace=True)
-  df.columns = [c.strip() for c in df.columns]
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+  return parse_columns([line.strip().strip("|") for line in [data[0]] + data[2:]], "|")
 
-def parse_context(data: str) -> list:
-  df = pd.read_csv(StringIO(data))
-  df["Value"] = df["Value"].astype(str).str.strip("[]")
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+def parse_context(data: str) -> list[str]:
+  return [v.strip("[]") for v in parse_columns(data.splitlines(), ",")]
 
-def parse_symbol(data: str) -> list:
-  df = pd.read_csv(StringIO(data))
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+def parse_symbol(data: str) -> list[str]:
+  return parse_columns(data.splitlines(), ",")
 
-def parse_csv(data: str) -> list:
-  df = pd.read_csv(StringIO(data))
-  return list(df[["Date", "Value"]].itertuples(index=False, name=None))
+def parse_csv(data: str) -> list[str]:
+  return parse_columns(data.splitlines(), ",")
 
 PARSERS = {
   TSFormat.ARRAY: parse_array,
@@ -120,56 +210,446 @@ PARSERS = {
   TSFormat.CSV: parse_csv
 }
 
+# ---------------------- ESCALA ----------------------
+SYMBOL_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+MISSING_SYMBOL = "?"
+
+class Scale:
+  __slots__ = ('low', 'high', 'last', 'digits', 'levels')
+
+  def __init__(self, low: float = 0.0, high: float = 1.0, last: float = 0.0, digits: int = 3, levels: int = 20):
+    """
+    Parâmetros das codificações que dependem da janela do prompt (SCALED, DELTA e SYMBOLIC).
+
+    A mesma escala codifica a janela e as suas fatias e decodifica a resposta do modelo,
+    de modo que os valores previstos voltam às unidades originais.
+
+    Args:
+      low (float): Menor valor da janela.
+      high (float): Maior valor da janela.
+      last (float): Último valor da janela, ponto de partida da previsão.
+      digits (int): Dígitos dos inteiros em SCALED (3 mapeia [low, high] em 0..999).
+      levels (int): Quantidade de símbolos em SYMBOLIC (até 26, de 'a' em diante).
+    """
+    if not 1 <= levels <= len(SYMBOL_ALPHABET):
+      raise ValueError(f"levels deve estar entre 1 e {len(SYMBOL_ALPHABET)}.")
+    self.low = low
+    self.high = high
+    self.last = last
+    self.digits = digits
+    self.levels = levels
+
+  def __repr__(self) -> str:
+    return f"Scale(low={self.low}, high={self.high}, last={self.last}, digits={self.digits}, levels={self.levels})"
+
+  @staticmethod
+  def fit(data, digits: int = 3, levels: int = 20) -> 'Scale':
+    """Ajusta a escala aos valores de uma TimeSeriesWindow ou lista de tuplas (data, valor)."""
+    values = data.values if isinstance(data, TimeSeriesWindow) else unzip(data)[1]
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+      return Scale(digits=digits, levels=levels)
+    return Scale(float(finite.min()), float(finite.max()), float(finite[-1]), digits, levels)
+
+  @property
+  def span(self) -> float:
+    return self.high - self.low
+
+  @property
+  def steps(self) -> int:
+    return 10 ** self.digits - 1
+
+def unzip(data) -> tuple[list, np.ndarray]:
+  """Separa uma janela, lista de tuplas (data, valor) ou lista de valores em datas (None para valores soltos) e valores float64."""
+  if isinstance(data, TimeSeriesWindow):
+    return data.labels(), data.values
+  if len(data) and isinstance(data[0], (tuple, list)):
+    dates, values = zip(*data)
+    return list(dates), np.array(values, dtype=np.float64)
+  return None, np.asarray(data, dtype=np.float64)
+
+def rezip(dates: list, encoded: list) -> list:
+  return encoded if dates is None else list(zip(dates, encoded))
+
 # ---------------------- CODIFICADORES ----------------------
-def encode_numeric(data: list) -> list:
+def encode_numeric(data: list, scale: Scale = None) -> list:
   return data
 
-def encode_textual(data: list) -> list:
+def encode_textual(data: list, scale: Scale = None) -> list:
   if data and isinstance(data[0], (tuple, list)):
     return [(d, ' '.join(str(v))) for d, v in data]
   return [' '.join(str(v)) for v in data]
 
+def encode_scaled(data: list, scale: Scale) -> list:
+  """Inteiros de 'digits' dígitos: [low, high] mapeado linearmente em 0..10^digits - 1."""
+  dates, values = unzip(data)
+  steps = np.rint((values - scale.low) / scale.span * scale.steps) if scale.span else np.zeros_like(values)
+  return rezip(dates, [int(k) if k == k else k for k in steps.tolist()])
+
+def encode_delta(data: list, scale: Scale = None) -> list:
+  """Primeiro valor absoluto e, a partir dele, a diferença para o valor anterior (3 casas), em cada bloco serializado."""
+  dates, values = unzip(data)
+  deltas = np.diff(values, prepend=0.0).round(3)
+  return rezip(dates, deltas.tolist())
+
+def encode_symbolic(data: list, scale: Scale) -> list:
+  """Quantização em 'levels' faixas de mesma largura entre low e high, uma letra por faixa."""
+  dates, values = unzip(data)
+  bins = np.floor((values - scale.low) / scale.span * scale.levels) if scale.span else np.zeros_like(values)
+  bins = np.clip(bins, 0, scale.levels - 1)
+  return rezip(dates, [SYMBOL_ALPHABET[int(b)] if b == b else MISSING_SYMBOL for b in bins.tolist()])
+
 ENCODERS = {
   TSType.NUMERIC: encode_numeric,
-  TSType.TEXTUAL: encode_textual
+  TSType.TEXTUAL: encode_textual,
+  TSType.SCALED: encode_scaled,
+  TSType.DELTA: encode_delta,
+  TSType.SYMBOLIC: encode_symbolic
 }
 
 # ---------------------- DECODIFICADORES ----------------------
-def decode_numeric(data: list) -> list:
-  if data and isinstance(data[0], (tuple, list)):
-    data = [v for _, v in data]
-  return [float(v) for v in data]
+def decode_numeric(data: list, scale: Scale = None) -> np.ndarray:
+  return np.array(data, dtype=np.float64)
 
-def decode_textual(data: list) -> list:
-  if data and isinstance(data[0], (tuple, list)):
-    data = [v for _, v in data]
-  return [float(str(v).replace(' ', '')) for v in data]
+def decode_textual(data: list, scale: Scale = None) -> np.ndarray:
+  return np.array([str(v).replace(' ', '') for v in data], dtype=np.float64)
+
+def decode_scaled(data: list, scale: Scale) -> np.ndarray:
+  """Inverso de encode_scaled: low + k * (high - low) / (10^digits - 1)."""
+  return scale.low + decode_numeric(data) * (scale.span / scale.steps)
+
+def decode_delta(data: list, scale: Scale = None) -> np.ndarray:
+  """Inverso de encode_delta: a resposta segue a convenção dos blocos do prompt, com o primeiro valor absoluto."""
+  return np.cumsum(decode_numeric(data)).round(3)
+
+def decode_symbolic(data: list, scale: Scale) -> np.ndarray:
+  """Cada letra volta ao centro da sua faixa; símbolos desconhecidos são rejeitados."""
+  width = scale.span / scale.levels
+  centers = {SYMBOL_ALPHABET[i]: scale.low + (i + 0.5) * width for i in range(scale.levels)}
+  centers[MISSING_SYMBOL] = np.nan
+  try:
+    return np.array([centers[str(v).strip().strip('"\'')] for v in data], dtype=np.float64)
+  except KeyError as e:
+    raise ValueError(f"Símbolo desconhecido: {e}") from e
 
 DECODERS = {
   TSType.NUMERIC: decode_numeric,
-  TSType.TEXTUAL: decode_textual
+  TSType.TEXTUAL: decode_textual,
+  TSType.SCALED: decode_scaled,
+  TSType.DELTA: decode_delta,
+  TSType.SYMBOLIC: decode_symbolic
+}
+
+# ---------------------- EXTRAÇÃO ----------------------
+class ParseStrategy(str, Enum):
+  DECLARED = 'DECLARED'
+  FENCED = 'FENCED'
+  ARRAY = 'ARRAY'
+  NUMERIC = 'NUMERIC'
+  PARTIAL = 'PARTIAL'
+  FAILED = 'FAILED'
+
+PARSE_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+FENCE = re.compile(r'```[\w-]*[^\S\n]*\n?(.*?)```', re.DOTALL)
+BRACKETS = re.compile(r'\[([^\[\]]*)\]')
+TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?')
+SPACED_DIGITS = re.compile(r'(?<=[\d.-]) (?=[\d.])')
+NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+# O que pode separar dois números de uma mesma sequência: pontuação, espaços e os nomes das colunas
+RUN_SEPARATOR = re.compile(r'(?:[\W_]|Date|Value|DirectionIndicator)*')
+
+def attempt(parse, *args) -> list[np.ndarray]:
+  """Executa um analisador e retorna [valores], ou [] se a resposta não estiver no formato esperado."""
+  try:
+    return [parse(*args)]
+  except PARSE_ERRORS:
+    return []
+
+def parse_declared(data: str, ts_format: TSFormat, ts_type: TSType, scale: Scale) -> np.ndarray:
+  return DECODERS[ts_type](PARSERS[ts_format](data.strip()), scale)
+
+def extract_declared(data: str, ts_format: TSFormat, ts_type: TSType, scale: Scale, periods: int = None) -> list[np.ndarray]:
+  """A resposta inteira no formato declarado."""
+  return attempt(parse_declared, data, ts_format, ts_type, scale)
+
+def extract_fenced(data: str, ts_format: TSFormat, ts_type: TSType, scale: Scale, periods: int = None) -> list[np.ndarray]:
+  """Blocos de código (```), do último para o primeiro, no formato declarado ou como ARRAY."""
+  candidates = []
+  for block in reversed(FENCE.findall(data)):
+    candidates += attempt(parse_declared, block, ts_format, ts_type, scale) or attempt(parse_declared, block, TSFormat.ARRAY, ts_type, scale)
+  return candidates
+
+def extract_array(data: str, ts_format: TSFormat, ts_type: TSType, scale: Scale, periods: int = None) -> list[np.ndarray]:
+  """Listas entre colchetes, da última para a primeira."""
+  candidates = []
+  for content in reversed(BRACKETS.findall(data)):
+    candidates += attempt(DECODERS[ts_type], [v.strip() for v in content.split(",")], scale)
+  return candidates
+
+def numeric_runs(data: str) -> list[list[str]]:
+  """Agrupa os números do texto em sequências contíguas, separadas por qualquer palavra que não seja um cabeçalho."""
+  runs, end = [], None
+  for match in NUMBER.finditer(data):
+    if end is None or not RUN_SEPARATOR.fullmatch(data, end, match.start()):
+      runs.append([])
+    runs[-1].append(match[0])
+    end = match.end()
+  return runs
+
+def extract_numeric(data: str, ts_format: TSFormat, ts_type: TSType, scale: Scale, periods: int = None) -> list[np.ndarray]:
+  """
+  Números da resposta, fora datas e horários (não se aplica a SYMBOLIC). Com 'periods', vence a
+  última sequência contígua com exatamente 'periods' números; sem ela, os 'periods' últimos
+  números, de modo que o texto antes da previsão (ex.: "os últimos 7 dias") não desloca os valores.
+  """
+  if ts_type == TSType.SYMBOLIC:
+    return []
+  data = TIMESTAMP.sub(" ", data)
+  if ts_type == TSType.TEXTUAL:
+    data = SPACED_DIGITS.sub("", data)
+  runs = numeric_runs(data)
+  numbers = [number for run in runs for number in run]
+  if periods:
+    exact = [run for run in runs if len(run) == periods]
+    numbers = exact[-1] if exact else numbers[-periods:]
+  return attempt(DECODERS[TSType.NUMERIC if ts_type == TSType.TEXTUAL else ts_type], numbers, scale)
+
+EXTRACTORS = {
+  ParseStrategy.DECLARED: extract_declared,
+  ParseStrategy.FENCED: extract_fenced,
+  ParseStrategy.ARRAY: extract_array,
+  ParseStrategy.NUMERIC: extract_numeric
 }
 
+class ParseTelemetry:
+  def __init__(self):
+    """
+    Contadores de extração das respostas por TSFormat: quantas respostas cada estratégia
+    resolveu e quantas não puderam ser lidas no formato declarado.
+    """
+    self.counts = {}
+    self.lock = threading.Lock()
+
+  def record(self, ts_format: TSFormat, strategy: ParseStrategy) -> None:
+    """Registra a estratégia que resolveu uma resposta."""
+    with self.lock:
+      self.counts.setdefault(ts_format, Counter())[strategy] += 1
+
+  def stats(self) -> dict:
+    """Retorna, por formato, o total de respostas, as falhas do formato declarado e a contagem por estratégia."""
+    with self.lock:
+      stats = {}
+      for ts_format, counts in self.counts.items():
+        total = sum(counts.values())
+        failures = total - counts[ParseStrategy.DECLARED]
+        stats[ts_format.value] = {
+          "responses": total,
+          "failures": failures,
+          "failure_rate": round(failures / total, 4),
+          "strategies": {strategy.value: n for strategy, n in counts.items()},
+        }
+      return stats
+
+  def reset(self) -> None:
+    """Zera os contadores."""
+    with self.lock:
+      self.counts.clear()
+
+PARSE_STATS = ParseTelemetry()
+
+class HorizonParser:
+  # Caracteres que podem fechar uma linha, uma lista, um objeto JSON ou um bloco de código
+  BOUNDARIES = frozenset('\n]}`')
+  # Início dos dados no formato declarado: uma linha de cabeçalho (Date...) ou uma lista JSON
+  START = re.compile(r'\|?Date\b|\[\s*\{')
+
+  def __init__(self, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC, periods: int = None, scale: Scale = None):
+    """
+    Leitor incremental de respostas em streaming: indica quando o horizonte já foi lido.
+
+    O texto recebido é acumulado e, a cada caractere que fecha uma estrutura (quebra de linha,
+    colchete, chave ou crase), verifica-se se já há 'periods' valores em uma estrutura completa:
+    o formato declarado a partir do último cabeçalho (exceto ARRAY, cuja lista pode estar aberta),
+    um bloco de código fechado ou uma lista entre colchetes fechada. Ao completar, o texto é
+    cortado no ponto em que o horizonte foi lido, descartando o que o modelo gerou depois.
+
+    A leitura é incremental: cursores marcam a linha em curso e o fim do último bloco de código e
+    da última lista, e cada fechamento lê só a estrutura que ele completou. As linhas do formato
+    declarado são contadas uma a uma, sem reler o bloco (exceto o JSON, lido inteiro ao fechar a lista).
+
+    Args:
+      ts_format (TSFormat): Formato em que a resposta foi pedida.
+      ts_type (TSType): Tipo de série.
+      periods (int): Quantidade de valores esperada.
+      scale (Scale): Escala da janela do prompt, obrigatória para SCALED, DELTA e SYMBOLIC.
+    """
+    self.ts_format = ts_format
+    self.ts_type = ts_type
+    self.periods = periods
+    self.scale = scale
+    self.reset()
+
+  def reset(self) -> None:
+    """Descarta o texto recebido, para uma nova tentativa da mesma requisição."""
+    self.text = ""
+    self.complete = False
+    self.line = 0 # Início da linha em curso
+    self.block = None # Início do último bloco no formato declarado (cabeçalho ou lista JSON)
+    self.header = None # Cabeçalho do bloco (no MARKDOWN, seguido da linha separadora)
+    self.separator = False # A próxima linha do MARKDOWN é a separadora do cabeçalho
+    self.rows = 0 # Valores das linhas completas do bloco (-1 se alguma não pôde ser lida)
+    self.fence = 0 # Fim do último bloco de código fechado
+    self.bracket = 0 # Fim do último colchete fechado
+
+  def kind(self, line: str):
+    """
+    Classifica uma linha: 'header' se ela abre um bloco no formato declarado, 'separator' se é a
+    separadora do cabeçalho do MARKDOWN, ou a quantidade de valores que ela contém (-1 se não pôde ser lida).
+    """
+    if self.ts_format == TSFormat.PLAIN:
+      text = line
+    elif HorizonParser.START.match(line):
+      return 'header'
+    elif self.header is None or self.ts_format in (TSFormat.ARRAY, TSFormat.JSON) or not line.strip():
+      return 0
+    elif self.separator:
+      return 'separator'
+    else:
+      text = self.header + "\n" + line
+    try:
+      return len(parse_declared(text, self.ts_format, self.ts_type, self.scale))
+    except PARSE_ERRORS:
+      return -1
+
+  def count(self, kind) -> int:
+    """Valores do bloco contando com uma linha da classe 'kind' (-1 se o bloco tem uma linha ilegível)."""
+    if kind == 'header':
+      return 0
+    if kind == 'separator':
+      return self.rows
+    return -1 if self.rows < 0 or kind < 0 else self.rows + kind
+
+  def reached(self, end: int) -> bool:
+    """
+    Verifica se text[:end], que termina em um caractere de fechamento, completou uma estrutura com
+    pelo menos 'periods' valores, e avança os cursores até 'end'.
+    """
+    char = self.text[end - 1]
+    candidates = []
+    if char == '`':
+      for match in FENCE.finditer(self.text, self.fence, end):
+        candidates += extract_fenced(match[0], self.ts_format, self.ts_type, self.scale)
+        self.fence = match.end()
+    elif char == ']':
+      start = self.text.rfind('[', self.bracket, end)
+      if start >= 0:
+        candidates += extract_array(self.text[start:end], self.ts_format, self.ts_type, self.scale)
+      self.bracket = end
+
+    # A linha em curso entra na contagem mesmo antes da quebra de linha, que a incorpora ao bloco
+    line = self.text[self.line:end - 1 if char == '\n' else end]
+    kind = self.kind(line)
+    rows = self.count(kind)
+    block = self.line if kind == 'header' else self.block
+    if char == '\n':
+      if kind == 'header':
+        self.block, self.header, self.separator = self.line, line, self.ts_format == TSFormat.MARKDOWN
+      elif kind == 'separator':
+        self.header, self.separator = self.header + "\n" + line, False
+      self.rows = rows
+      self.line = end
+
+    if self.ts_format == TSFormat.JSON:
+      if char == ']' and block is not None:
+        candidates += extract_declared(self.text[block:end], self.ts_format, self.ts_type, self.scale)
+    elif self.ts_format != TSFormat.ARRAY and rows >= self.periods:
+      return True
+    return any(len(values) >= self.periods for values in candidates)
+
+  def feed(self, chunk: str) -> bool:
+    """Acrescenta um trecho da resposta e retorna True quando o horizonte foi lido."""
+    if self.complete or not chunk:
+      return self.complete
+    start = len(self.text)
+    self.text += chunk
+    for i, char in enumerate(chunk):
+      if char in HorizonParser.BOUNDARIES and self.reached(start + i + 1):
+        self.text = self.text[:start + i + 1]
+        self.complete = True
+        break
+    return self.complete
+
 # ---------------------- FUNÇÕES PÚBLICAS ----------------------
-def format_timeseries(data: list, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC) -> str:
+def format_timeseries(data: list, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC, scale: Scale = None) -> str:
   """
-  Formata uma lista de tuplas (data, valor) para uma string no formato especificado.
+  Formata uma TimeSeriesWindow ou lista de tuplas (data, valor) para uma string no formato especificado.
+  Colunas (Columns) já estão codificadas e vão direto para o formatador. Sem 'scale', os tipos
+  SCALED e SYMBOLIC usam a escala dos próprios dados.
   """
   if ts_format not in FORMATTERS:
     raise ValueError(f"Formato desconhecido: {format}")
   if ts_type not in ENCODERS:
     raise ValueError(f"Tipo desconhecido: {ts_type}")
-  return FORMATTERS[ts_format](ENCODERS[ts_type](data))
+  if isinstance(data, Columns):
+    return FORMATTERS[ts_format](data)
+  if scale is None and ts_type not in ELEMENTWISE:
+    scale = Scale.fit(data)
+  return FORMATTERS[ts_format](ENCODERS[ts_type](data, scale))
 
-def parse_timeseries(data: str, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC) -> list:
+def extract_timeseries(
+  data: str, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC, periods: int = None, scale: Scale = None
+) -> tuple[np.ndarray, ParseStrategy]:
   """
-  Converte uma string formatada de volta para uma lista de tuplas (data, valor).
+  Extrai os valores previstos de uma resposta do modelo, tolerando texto ao redor.
+
+  As estratégias são tentadas em ordem: o formato declarado, os blocos de código, a última
+  lista entre colchetes e, por fim, os números soltos da resposta. Vence o primeiro candidato
+  com exatamente 'periods' valores (ou o primeiro não vazio, sem 'periods'). Se nenhum tiver
+  o tamanho certo, o primeiro candidato é truncado ou completado com NaN (PARTIAL); sem
+  candidatos, o resultado é só NaN (FAILED). A estratégia vencedora é registrada em PARSE_STATS.
+
+  Args:
+    data (str): Resposta do modelo.
+    ts_format (TSFormat): Formato em que a resposta foi pedida.
+    ts_type (TSType): Tipo de série (NUMERIC, TEXTUAL).
+    periods (int): Quantidade de valores esperada.
+    scale (Scale): Escala da janela do prompt, obrigatória para SCALED, DELTA e SYMBOLIC.
+
+  Returns:
+    tuple: (valores em float64, estratégia que os extraiu).
   """
   if ts_format not in PARSERS:
     raise ValueError(f"Formato desconhecido: {ts_format}")
   if ts_type not in DECODERS:
     raise ValueError(f"Tipo desconhecido: {ts_type}")
-  try:
-    return DECODERS[ts_type](PARSERS[ts_format](data))
-  except:
-    return DECODERS[TSType.NUMERIC](PARSERS[TSFormat.ARRAY](data))
+  if scale is None and ts_type not in ELEMENTWISE:
+    raise ValueError(f"O tipo {ts_type.value} requer a escala (Scale) da janela do prompt para decodificar a resposta.")
+
+  first = None
+  for strategy, extractor in EXTRACTORS.items():
+    for values in extractor(data or "", ts_format, ts_type, scale, periods):
+      if len(values) and (periods is None or len(values) == periods):
+        if strategy != ParseStrategy.DECLARED:
+          print(f"[INFO] Resposta fora do formato {ts_format.value}, valores extraídos pela estratégia {strategy.value}.")
+        PARSE_STATS.record(ts_format, strategy)
+        return values, strategy
+      if len(values) and first is None:
+        first = values
+
+  # Sem 'periods', qualquer candidato não vazio já teria vencido
+  if first is None:
+    values, strategy = np.full(periods or 0, np.nan), ParseStrategy.FAILED
+  else:
+    values, strategy = np.full(periods, np.nan), ParseStrategy.PARTIAL
+    values[:min(periods, len(first))] = first[:periods]
+  print(f"[ERROR] Resposta fora do formato {ts_format.value}: {len(first) if first is not None else 0} de {periods} valores extraídos ({strategy.value}).")
+  PARSE_STATS.record(ts_format, strategy)
+  return values, strategy
+
+def parse_timeseries(
+  data: str, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC, periods: int = None, scale: Scale = None
+) -> np.ndarray:
+  """
+  Converte uma resposta do modelo para os valores da série, em um array float64 (ver extract_timeseries).
+  """
+  return extract_timeseries(data, ts_format, ts_type, periods, scale)[0]
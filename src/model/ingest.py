@@ -0,0 +1,257 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from src.model.preprocessing import (
+  PreprocessConfig, Imputation, NAT,
+  deduplicate, align, ffill, bfill, rolling_mean, impute, read_columns, write_csv
+)
+
+CHUNK_SIZE = 500_000
+
+# Métodos que dependem apenas de um estado de tamanho fixo entre blocos
+CHUNK_SAFE = {Imputation.MEAN, Imputation.FFILL, Imputation.BFILL, Imputation.SMA, Imputation.LINEAR, Imputation.ZERO}
+
+class StreamingIngestion:
+  def __init__(self, source, config: PreprocessConfig, chunksize: int = CHUNK_SIZE):
+    """
+    Classe responsável pela ingestão de arquivos grandes com memória limitada.
+
+    Lê apenas as colunas de data e valor em blocos, ordena cada bloco em disco e
+    faz a intercalação (merge) externa por data, aplicando as mesmas etapas de
+    src.model.preprocessing (duplicados, uniformização e imputação) sem carregar
+    o arquivo inteiro. Mediana, média móvel exponencial e spline precisam da série
+    completa e são aplicadas apenas sobre a coluna de valores já tratada.
+
+    Args:
+      source: Caminho ou arquivo (file-like) CSV de origem.
+      config (PreprocessConfig): Configuração do pré-processamento.
+      chunksize (int): Quantidade de linhas por bloco.
+    """
+    self.source = source
+    self.config = config
+    self.chunksize = chunksize
+
+  def run(self, output_path: str) -> int:
+    """
+    Executa a ingestão e grava o CSV resultante com as colunas 'date' e 'value'.
+
+    Returns:
+      int: Quantidade de linhas gravadas.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+      runs = self.split(tmp)
+      blocks = self.merge(runs)
+      if self.config.duplicates is not None:
+        blocks = (deduplicate(dates, values, self.config.duplicates) for dates, values in blocks)
+      if self.config.frequency and runs:
+        blocks = self.regularize(blocks)
+      dates, values = self.spill(blocks, tmp)
+      if self.config.imputation is not None and len(values):
+        self.impute(values)
+      rows = write_csv(output_path, dates, values, self.chunksize)
+      del dates, values
+    print(f"[INFO] {rows} linhas gravadas em: {output_path}")
+    return rows
+
+  # ---------------------- ETAPAS ----------------------
+  def split(self, tmp: str) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Lê o arquivo em blocos e grava cada bloco ordenado por data (run) no diretório temporário."""
+    runs = []
+    self.start, self.end = None, None
+    for i, (dates, values) in enumerate(read_columns(self.source, self.config, self.chunksize)):
+      keep = dates != NAT
+      dates, values = dates[keep], values[keep]
+      if len(dates) == 0:
+        continue
+
+      order = np.argsort(dates, kind='stable')
+      date_path, value_path = os.path.join(tmp, f"run{i}_date.npy"), os.path.join(tmp, f"run{i}_value.npy")
+      np.save(date_path, dates[order])
+      np.save(value_path, values[order])
+      runs.append((np.load(date_path, mmap_mode='r'), np.load(value_path, mmap_mode='r')))
+
+      self.start = dates[order[0]] if self.start is None else min(self.start, dates[order[0]])
+      self.end = dates[order[-1]] if self.end is None else max(self.end, dates[order[-1]])
+      print(f"[INFO] Bloco {i} lido com {len(dates)} linhas.")
+    return runs
+
+  def merge(self, runs: list):
+    """
+    Intercala os runs ordenados, gerando blocos ordenados por data.
+    Um grupo de datas iguais nunca é dividido entre dois blocos, e dentro do grupo
+    a ordem original do arquivo é mantida.
+    """
+    block = max(self.chunksize // max(len(runs), 1), 1)
+    cursors = [0] * len(runs)
+    buffers = [(d[:0], v[:0]) for d, v in runs]
+
+    def extend(i: int):
+      d, v = runs[i]
+      stop = cursors[i] + block
+      buffers[i] = (np.concatenate([buffers[i][0], d[cursors[i]:stop]]), np.concatenate([buffers[i][1], v[cursors[i]:stop]]))
+      cursors[i] = min(stop, len(d))
+
+    while True:
+      for i in range(len(runs)):
+        if len(buffers[i][0]) == 0 and cursors[i] < len(runs[i][0]):
+          extend(i)
+
+      pending = [i for i in range(len(runs)) if cursors[i] < len(runs[i][0])]
+      cutoff = min(buffers[i][0][-1] for i in pending) if pending else None
+      cuts = [len(d) if cutoff is None else int(np.searchsorted(d, cutoff, side='left')) for d, _ in buffers]
+      if sum(cuts) == 0:
+        if cutoff is None:
+          return
+        # Todos os valores em memória são iguais ao corte: lê mais de quem ainda tem esse valor
+        for i in pending:
+          if buffers[i][0][-1] == cutoff:
+            extend(i)
+        continue
+
+      dates = np.concatenate([d[:c] for (d, _), c in zip(buffers, cuts)])
+      values = np.concatenate([v[:c] for (_, v), c in zip(buffers, cuts)])
+      buffers = [(d[c:], v[c:]) for (d, v), c in zip(buffers, cuts)]
+      order = np.argsort(dates, kind='stable')
+      yield dates[order], values[order]
+
+  def grid(self):
+    """Gera as datas uniformizadas entre o início e o fim do dataset em blocos."""
+    offset = pd.tseries.frequencies.to_offset(self.config.frequency)
+    cursor = pd.Timestamp(int(self.start))
+    while True:
+      points = pd.date_range(start=cursor, periods=self.chunksize, freq=offset).asi8
+      points = points[points <= self.end]
+      if len(points) == 0:
+        return
+      yield points
+      cursor = pd.Timestamp(int(points[-1])) + offset
+
+  def regularize(self, blocks):
+    """Alinha os blocos às datas uniformizadas (merge à esquerda), preenchendo as lacunas com NaN."""
+    blocks = iter(blocks)
+    buffer_d, buffer_v = np.empty(0, np.int64), np.empty(0, np.float64)
+    exhausted = False
+    for points in self.grid():
+      while not exhausted and (len(buffer_d) == 0 or buffer_d[-1] < points[-1]):
+        block = next(blocks, None)
+        if block is None:
+          exhausted = True
+        else:
+          buffer_d, buffer_v = np.concatenate([buffer_d, block[0]]), np.concatenate([buffer_v, block[1]])
+
+      yield points, align(points, buffer_d, buffer_v)
+
+      keep = np.searchsorted(buffer_d, points[-1], side='right')
+      buffer_d, buffer_v = buffer_d[keep:], buffer_v[keep:]
+
+  def spill(self, blocks, tmp: str) -> tuple[np.ndarray, np.ndarray]:
+    """Grava os blocos tratados em disco e os reabre via memory-map para a imputação."""
+    date_path, value_path = os.path.join(tmp, "date.bin"), os.path.join(tmp, "value.bin")
+    rows = 0
+    with open(date_path, 'wb') as fd, open(value_path, 'wb') as fv:
+      for dates, values in blocks:
+        fd.write(dates.tobytes())
+        fv.write(values.astype(np.float64).tobytes())
+        rows += len(dates)
+
+    if rows == 0:
+      return np.empty(0, np.int64), np.empty(0, np.float64)
+    return np.memmap(date_path, dtype=np.int64, mode='r'), np.memmap(value_path, dtype=np.float64, mode='r+')
+
+  def impute(self, values: np.ndarray) -> None:
+    """Aplica a imputação sobre a coluna de valores em disco, bloco a bloco quando possível."""
+    method = self.config.imputation
+    if method not in CHUNK_SAFE:
+      values[:] = impute(np.array(values), self.config)
+      return
+
+    n, size = len(values), self.chunksize
+    if method == Imputation.ZERO:
+      for i in range(0, n, size):
+        np.nan_to_num(values[i:i+size], copy=False, nan=0.0)
+
+    elif method == Imputation.MEAN:
+      total, count = 0.0, 0
+      for i in range(0, n, size):
+        chunk = values[i:i+size]
+        total += np.nansum(chunk)
+        count += int((~np.isnan(chunk)).sum())
+      if count:
+        mean = round(total / count, 2)
+        for i in range(0, n, size):
+          np.nan_to_num(values[i:i+size], copy=False, nan=mean)
+
+    elif method == Imputation.BFILL:
+      self.backward_fill(values)
+      self.forward_fill(values)
+
+    elif method == Imputation.LINEAR:
+      self.interpolate(values)
+
+    else:
+      if method == Imputation.SMA:
+        self.rolling_fill(values)
+      self.forward_fill(values)
+      self.backward_fill(values)
+
+  def forward_fill(self, values: np.ndarray) -> None:
+    """Equivalente em blocos a Series.ffill()."""
+    carry = np.nan
+    for i in range(0, len(values), self.chunksize):
+      chunk = ffill(values[i:i+self.chunksize], carry)
+      values[i:i+self.chunksize] = chunk
+      carry = chunk[-1]
+
+  def backward_fill(self, values: np.ndarray) -> None:
+    """Equivalente em blocos a Series.bfill()."""
+    carry = np.nan
+    for stop in range(len(values), 0, -self.chunksize):
+      start = max(stop - self.chunksize, 0)
+      chunk = bfill(values[start:stop], carry)
+      values[start:stop] = chunk
+      carry = chunk[0]
+
+  def rolling_fill(self, values: np.ndarray) -> None:
+    """Equivalente em blocos a fillna(rolling(window, min_periods=1).mean())."""
+    window = self.config.window
+    tail = np.empty(0)
+    for i in range(0, len(values), self.chunksize):
+      chunk = np.array(values[i:i+self.chunksize])
+      mean = rolling_mean(chunk, window, tail)
+      values[i:i+self.chunksize] = np.where(np.isnan(chunk), mean, chunk)
+      tail = np.concatenate([tail, chunk])[-(window - 1):] if window > 1 else np.empty(0)
+
+  def interpolate(self, values: np.ndarray) -> None:
+    """
+    Equivalente em blocos a interpolate(method='linear').ffill().bfill(): interpolação
+    linear entre observações válidas e valores constantes antes da primeira e após a última.
+    """
+    n, size = len(values), self.chunksize
+    prev = None
+    after = None
+    for i in range(0, n, size):
+      chunk = np.array(values[i:i+size])
+      valid = np.flatnonzero(~np.isnan(chunk))
+      xp, fp = list(i + valid), list(chunk[valid])
+
+      if len(valid) < len(chunk):
+        if prev is not None:
+          xp, fp = [prev[0]] + xp, [prev[1]] + fp
+        if len(valid) == 0 or valid[-1] < len(chunk) - 1:
+          # Busca a próxima observação válida após o bloco
+          if after is None or after[0] < i + len(chunk):
+            after = (n, np.nan)
+            for j in range(i + size, n, size):
+              found = np.flatnonzero(~np.isnan(values[j:j+size]))
+              if len(found):
+                after = (j + found[0], values[j + found[0]])
+                break
+          if after[0] < n:
+            xp, fp = xp + [after[0]], fp + [after[1]]
+        if xp:
+          values[i:i+size] = np.interp(np.arange(i, i + len(chunk)), xp, fp)
+
+      if len(valid):
+        prev = (i + valid[-1], chunk[valid[-1]])
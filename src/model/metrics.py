@@ -7,14 +7,24 @@ class Metrics:
     self.y_true = y_true
     self.y_pred = y_pred
 
+  def pairs(self) -> tuple[np.ndarray, np.ndarray]:
+    """Retorna os valores exatos e previstos alinhados, ignorando as posições que a resposta não preencheu (NaN)."""
+    y_true = np.asarray(self.y_true, dtype=float)
+    y_pred = np.asarray(self.y_pred, dtype=float)
+    n = min(len(y_true), len(y_pred))
+    y_true, y_pred = y_true[:n], y_pred[:n]
+    mask = np.isfinite(y_true) & np.isfinite(y_pred)
+    return y_true[mask], y_pred[mask]
+
   def smape(self) -> float:
     """Calcula o erro percentual absoluto médio simétrico (sMAPE).
 
     Returns:
       float: Erro percentual absoluto médio simétrico.
     """
-    y_true = np.array(self.y_true)
-    y_pred = np.array(self.y_pred)
+    y_true, y_pred = self.pairs()
+    if len(y_true) == 0:
+      return float('nan')
 
     numerator = np.abs(y_true - y_pred)
     denominator = (np.abs(y_true) + np.abs(y_pred))/2
@@ -39,8 +49,9 @@ class Metrics:
     Returns:
       float: Erro médio absoluto.
     """
-    y_true = np.array(self.y_true)
-    y_pred = np.array(self.y_pred)
+    y_true, y_pred = self.pairs()
+    if len(y_true) == 0:
+      return float('nan')
     mae = mean_absolute_error(y_true, y_pred)
     return round(mae, 2)
 
@@ -49,7 +60,8 @@ class Metrics:
     Returns:
       float: Raiz do erro quadrático médio.
     """
-    y_true = np.array(self.y_true)
-    y_pred = np.array(self.y_pred)
+    y_true, y_pred = self.pairs()
+    if len(y_true) == 0:
+      return float('nan')
     rmse = root_mean_squared_error(y_true, y_pred)
     return round(rmse, 2)
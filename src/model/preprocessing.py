@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+
+NAT = np.iinfo(np.int64).min
+DAY_NS = 86_400_000_000_000
+SECOND_NS = 1_000_000_000
+WRITE_CHUNK_SIZE = 500_000
+
+# ---------------------- OPÇÕES ----------------------
+class Duplicates(str, Enum):
+  FIRST = 'Manter o primeiro'
+  LAST = 'Manter o último'
+  SUM = 'Somar valores duplicados'
+
+class Imputation(str, Enum):
+  MEAN = 'Média'
+  MEDIAN = 'Mediana'
+  FFILL = 'Última Observação'
+  BFILL = 'Próxima Observação'
+  SMA = 'Média Móvel Simples'
+  EMA = 'Média Móvel Exponencial'
+  LINEAR = 'Interpolação Linear'
+  SPLINE = 'Interpolação Spline'
+  ZERO = 'Preencher com zero'
+
+FREQUENCIES = {"Diário": "D", "Semanal": "W", "Mensal": "M", "Anual": "Y", "Hora": "h", "Minuto": "min"}
+
+def frequency_alias(frequency: str, interval: int = 1) -> str:
+  """Converte a frequência exibida no diálogo (ex.: 'Hora', 2) no alias do pandas (ex.: '2h')."""
+  alias = FREQUENCIES[frequency]
+  return alias if interval == 1 else f"{interval}{alias}"
+
+def option(enum: type, value):
+  """Aceita tanto o valor ('Média') quanto o nome ('MEAN') de uma opção."""
+  if value is None or isinstance(value, enum):
+    return value
+  try:
+    return enum(value)
+  except ValueError:
+    return enum[value]
+
+# ---------------------- CONFIGURAÇÃO ----------------------
+class PreprocessConfig:
+  def __init__(
+    self, date_col: str = 'date', value_col: str = 'value',
+    duplicates: Duplicates = Duplicates.FIRST, frequency: str = None,
+    imputation: Imputation = None, window: int = 3, span: int = 3, order: int = 2
+  ):
+    """
+    Configuração declarativa do pré-processamento, com as mesmas opções do diálogo de upload.
+
+    Args:
+      date_col (str): Coluna de datas do arquivo de origem.
+      value_col (str): Coluna de valores do arquivo de origem.
+      duplicates (Duplicates): Tratamento de datas duplicadas (None mantém todas).
+      frequency (str): Alias de frequência do pandas para uniformizar as datas (ex.: 'h', '15min').
+      imputation (Imputation): Método de imputação dos valores ausentes (None não imputa).
+      window (int): Janela da média móvel simples.
+      span (int): Span da média móvel exponencial.
+      order (int): Ordem da interpolação spline.
+    """
+    self.date_col = date_col
+    self.value_col = value_col
+    self.duplicates = option(Duplicates, duplicates)
+    self.frequency = frequency
+    self.imputation = option(Imputation, imputation)
+    self.window = window
+    self.span = span
+    self.order = order
+
+  def to_dict(self) -> dict:
+    """Retorna a configuração como dicionário serializável."""
+    return {
+      "date_col": self.date_col,
+      "value_col": self.value_col,
+      "duplicates": self.duplicates.name if self.duplicates else None,
+      "frequency": self.frequency,
+      "imputation": self.imputation.name if self.imputation else None,
+      "window": self.window,
+      "span": self.span,
+      "order": self.order,
+    }
+
+# ---------------------- ETAPAS ----------------------
+def sort(dates: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  """Ordena por data mantendo a ordem original entre datas iguais."""
+  if len(dates) < 2 or (dates[1:] >= dates[:-1]).all():
+    return dates, values
+  order = np.argsort(dates, kind='stable')
+  return dates[order], values[order]
+
+def deduplicate(dates: np.ndarray, values: np.ndarray, policy: Duplicates) -> tuple[np.ndarray, np.ndarray]:
+  """Aplica o tratamento de datas duplicadas sobre colunas ordenadas por data."""
+  starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+  if policy is None or len(starts) == len(dates):
+    return dates, values
+  if policy == Duplicates.FIRST:
+    return dates[starts], values[starts]
+  if policy == Duplicates.LAST:
+    ends = np.r_[starts[1:], len(dates)] - 1
+    return dates[ends], values[ends]
+  # Soma ignorando ausentes; grupos só com ausentes continuam ausentes (min_count=1)
+  valid = ~np.isnan(values)
+  sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+  counts = np.add.reduceat(valid.astype(np.int64), starts)
+  sums[counts == 0] = np.nan
+  return dates[starts], sums
+
+def align(points: np.ndarray, dates: np.ndarray, values: np.ndarray) -> np.ndarray:
+  """Retorna os valores nas datas de 'points' (merge à esquerda), com NaN onde não há observação."""
+  out = np.full(len(points), np.nan)
+  idx = np.searchsorted(dates, points)
+  found = idx < len(dates)
+  found[found] = dates[idx[found]] == points[found]
+  out[found] = values[idx[found]]
+  return out
+
+def regularize(dates: np.ndarray, values: np.ndarray, frequency: str) -> tuple[np.ndarray, np.ndarray]:
+  """Garante todas as datas entre o início e o fim na frequência informada."""
+  if len(dates) == 0:
+    return dates, values
+  points = pd.date_range(start=pd.Timestamp(int(dates[0])), end=pd.Timestamp(int(dates[-1])), freq=frequency).asi8
+  return points, align(points, dates, values)
+
+# ---------------------- IMPUTAÇÃO ----------------------
+def ffill(values: np.ndarray, carry: float = np.nan) -> np.ndarray:
+  """Propaga a última observação válida, começando com o valor carregado do bloco anterior."""
+  idx = np.where(np.isnan(values), -1, np.arange(len(values)))
+  np.maximum.accumulate(idx, out=idx)
+  return np.where(idx >= 0, values[idx], carry)
+
+def bfill(values: np.ndarray, carry: float = np.nan) -> np.ndarray:
+  """Propaga a próxima observação válida, terminando com o valor carregado do bloco seguinte."""
+  return ffill(values[::-1], carry)[::-1]
+
+def rolling_mean(values: np.ndarray, window: int, tail: np.ndarray = None) -> np.ndarray:
+  """
+  Média móvel ignorando ausentes, equivalente a rolling(window, min_periods=1).mean().
+
+  Args:
+    values (np.ndarray): Valores do bloco.
+    window (int): Tamanho da janela.
+    tail (np.ndarray): Últimos window-1 valores do bloco anterior, se houver.
+  """
+  tail = np.empty(0) if tail is None else tail
+  ext = np.concatenate([tail, values])
+  valid = ~np.isnan(ext)
+  sums = np.concatenate([[0.0], np.cumsum(np.where(valid, ext, 0.0))])
+  counts = np.concatenate([[0], np.cumsum(valid)])
+  stop = np.arange(len(tail) + 1, len(ext) + 1)
+  begin = np.maximum(stop - window, 0)
+  count = counts[stop] - counts[begin]
+  with np.errstate(invalid='ignore', divide='ignore'):
+    return np.where(count > 0, (sums[stop] - sums[begin]) / count, np.nan)
+
+def interpolate(values: np.ndarray) -> np.ndarray:
+  """Interpolação linear por posição, constante antes da primeira e após a última observação."""
+  valid = np.flatnonzero(~np.isnan(values))
+  if len(valid) == 0 or len(valid) == len(values):
+    return values
+  return np.interp(np.arange(len(values)), valid, values[valid])
+
+def impute(values: np.ndarray, config: PreprocessConfig) -> np.ndarray:
+  """Preenche os valores ausentes conforme o método configurado."""
+  method = config.imputation
+  missing = np.isnan(values)
+  if method is None or not missing.any():
+    return values
+  if missing.all():
+    return np.zeros_like(values) if method == Imputation.ZERO else values
+
+  if method == Imputation.MEAN:
+    return np.where(missing, round(float(np.nanmean(values)), 2), values)
+  if method == Imputation.MEDIAN:
+    return np.where(missing, np.nanmedian(values), values)
+  if method == Imputation.ZERO:
+    return np.where(missing, 0.0, values)
+  if method == Imputation.FFILL:
+    return bfill(ffill(values))
+  if method == Imputation.BFILL:
+    return ffill(bfill(values))
+  if method == Imputation.LINEAR:
+    return interpolate(values)
+  if method == Imputation.SMA:
+    return bfill(ffill(np.where(missing, rolling_mean(values, config.window), values)))
+  if method == Imputation.EMA:
+    ema = pd.Series(values, copy=False).ewm(span=config.span, adjust=False).mean().to_numpy()
+    return bfill(ffill(np.where(missing, ema, values)))
+  if method == Imputation.SPLINE:
+    try:
+      spline = pd.Series(values, copy=False).interpolate(method='spline', order=config.order).to_numpy()
+      return bfill(ffill(spline))
+    except Exception:
+      return interpolate(values)
+  raise ValueError(f"Método de imputação desconhecido: {method}")
+
+# ---------------------- PIPELINE ----------------------
+def preprocess(dates: np.ndarray, values: np.ndarray, config: PreprocessConfig) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Executa o pré-processamento sobre as colunas de datas (epoch int64 ns) e valores (float64).
+
+  Returns:
+    tuple: (datas, valores) ordenados, sem duplicados, uniformizados e imputados conforme a configuração.
+  """
+  keep = dates != NAT
+  dates, values = sort(dates[keep], values[keep])
+  dates, values = deduplicate(dates, values, config.duplicates)
+  if config.frequency:
+    dates, values = regularize(dates, values, config.frequency)
+  return dates, impute(values, config)
+
+def read_columns(source, config: PreprocessConfig, chunksize: int = None):
+  """Lê apenas as colunas de data e valor do CSV, convertidas para epoch int64 (ns) e float64."""
+  def convert(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    dates = pd.to_datetime(df[config.date_col]).to_numpy(dtype='datetime64[ns]').view('int64')
+    values = pd.to_numeric(df[config.value_col], errors='coerce').to_numpy(dtype='float64')
+    return dates, values
+
+  reader = pd.read_csv(source, usecols=[config.date_col, config.value_col], chunksize=chunksize)
+  return (convert(chunk) for chunk in reader) if chunksize else convert(reader)
+
+def write_csv(path: str, dates: np.ndarray, values: np.ndarray, chunksize: int = WRITE_CHUNK_SIZE) -> int:
+  """
+  Grava as colunas em CSV de forma incremental, no mesmo formato de DataFrame.to_csv.
+
+  Returns:
+    int: Quantidade de linhas gravadas.
+  """
+  daily, seconds = True, True
+  for i in range(0, len(dates), chunksize):
+    chunk = dates[i:i+chunksize]
+    daily = daily and bool((chunk % DAY_NS == 0).all())
+    seconds = seconds and bool((chunk % SECOND_NS == 0).all())
+  date_format = '%Y-%m-%d' if daily else '%Y-%m-%d %H:%M:%S' if seconds else None
+  with open(path, 'w', newline='') as f:
+    if len(dates) == 0:
+      f.write("date,value\n")
+    for i in range(0, len(dates), chunksize):
+      df = pd.DataFrame({"date": dates[i:i+chunksize].view('datetime64[ns]'), "value": values[i:i+chunksize]})
+      df.to_csv(f, header=(i == 0), index=False, date_format=date_format)
+  return len(dates)
+
+def preprocess_file(source: str, output_path: str, config: PreprocessConfig) -> int:
+  """
+  Lê, pré-processa e grava um arquivo CSV.
+
+  Returns:
+    int: Quantidade de linhas gravadas.
+  """
+  dates, values = preprocess(*read_columns(source, config), config)
+  rows = write_csv(output_path, dates, values)
+  print(f"[INFO] {rows} linhas gravadas em: {output_path}")
+  return rows
+
+def preprocess_many(jobs: list[tuple[str, str, PreprocessConfig]], max_workers: int = None) -> list[int]:
+  """
+  Pré-processa vários arquivos em paralelo em um pool de processos.
+
+  Args:
+    jobs (list): Lista de tuplas (origem, destino, configuração).
+    max_workers (int): Quantidade máxima de processos (padrão: número de CPUs).
+
+  Returns:
+    list[int]: Quantidade de linhas gravadas por arquivo, na ordem dos jobs.
+  """
+  with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    futures = [executor.submit(preprocess_file, *job) for job in jobs]
+    return [future.result() for future in futures]
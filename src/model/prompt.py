@@ -1,11 +1,16 @@
 from enum import Enum
 
-from src.prompts.zero_shot import ZERO_SHOT
-from src.prompts.cot import COT
-from src.prompts.few_shot import FEW_SHOT
-from src.prompts.cot_few import COT_FEW
-
-from src.model.format import TSFormat, TSType, format_timeseries
+from src.prompts.zero_shot import ZERO_SHOT, ZERO_SHOT_PREFIX
+from src.prompts.cot import COT, COT_PREFIX
+from src.prompts.few_shot import FEW_SHOT, FEW_SHOT_PREFIX
+from src.prompts.cot_few import COT_FEW, COT_FEW_PREFIX
+from src.prompts.request import REQUEST, REQUEST_FEW
+from src.prompts.encoding import SCALED_ENCODING, DELTA_ENCODING, SYMBOLIC_ENCODING
+
+from src.model.format import TSFormat, TSType, Scale, SYMBOL_ALPHABET
+from src.model.serializer import SEGMENTS
+from src.model.tokens import TokenEstimator, ESTIMATOR
+from src.model.window import TimeSeriesWindow
 
 class PromptType(str, Enum):
   ZERO_SHOT = 'ZERO_SHOT'
@@ -13,20 +18,52 @@ class PromptType(str, Enum):
   COT = 'COT'
   COT_FEW = 'COT_FEW'
 
+class PromptLayout(str, Enum):
+  INLINE = 'INLINE'
+  PREFIX = 'PREFIX'
+
+# INLINE intercala os valores da requisição nas instruções (layout original). PREFIX mantém as
+# instruções como um prefixo idêntico entre requisições e deixa todo o conteúdo variável no final,
+# permitindo que o cache de prompt dos provedores (OpenAI, Azure, servidores locais) reaproveite o prefixo.
+TEMPLATES = {
+  PromptLayout.INLINE: {
+    PromptType.ZERO_SHOT: ZERO_SHOT,
+    PromptType.FEW_SHOT: FEW_SHOT,
+    PromptType.COT: COT,
+    PromptType.COT_FEW: COT_FEW,
+  },
+  PromptLayout.PREFIX: {
+    PromptType.ZERO_SHOT: ZERO_SHOT_PREFIX + REQUEST,
+    PromptType.FEW_SHOT: FEW_SHOT_PREFIX + REQUEST_FEW,
+    PromptType.COT: COT_PREFIX + REQUEST,
+    PromptType.COT_FEW: COT_FEW_PREFIX + REQUEST_FEW,
+  },
+}
+
+PREFIXES = {
+  PromptType.ZERO_SHOT: ZERO_SHOT_PREFIX,
+  PromptType.FEW_SHOT: FEW_SHOT_PREFIX,
+  PromptType.COT: COT_PREFIX,
+  PromptType.COT_FEW: COT_FEW_PREFIX,
+}
+
 class PromptModel:
   def __init__(
-      self, window:list, periods:int, prompt_type:PromptType,
-      ts_format:TSFormat = TSFormat.CSV, ts_type:TSType = TSType.NUMERIC
+      self, window:TimeSeriesWindow, periods:int, prompt_type:PromptType,
+      ts_format:TSFormat = TSFormat.CSV, ts_type:TSType = TSType.NUMERIC,
+      series_id:str = None, layout:PromptLayout = PromptLayout.INLINE
   ):
     """
     Classe responsável por gerar prompts com base em um tipo definido.
 
     Args:
-      window (list): Lista com dados de entrada.
+      window (TimeSeriesWindow): Janela com os dados de entrada (ou lista de tuplas (data, valor)).
       periods (int): Número de dias a serem previstos.
       prompt_type (PromptType): Tipo do prompt (ZERO_SHOT, FEW_SHOT, etc.)
       ts_format (TSFormat): Formato dos dados temporais (ARRAY, CSV, etc.).
-      ts_type (TSType): Tipo de série (NUMERIC, TEXTUAL).
+      ts_type (TSType): Tipo de série (NUMERIC, TEXTUAL, SCALED, DELTA, SYMBOLIC).
+      series_id (str): Série de origem da janela em datasets no formato longo.
+      layout (PromptLayout): Disposição do prompt (INLINE ou PREFIX, com as instruções como prefixo estável).
     """
 
     if not isinstance(periods, int) or periods <= 0:
@@ -37,20 +74,129 @@ class PromptModel:
     self.prompt_type = prompt_type
     self.ts_format = ts_format
     self.ts_type = ts_type
+    self.series_id = series_id
+    self.layout = layout
+    # Escala da janela inteira: codifica a janela e as suas fatias e decodifica a resposta
+    self.scale = Scale.fit(window) if window is not None else None
+
+  def serialize(self, window:TimeSeriesWindow) -> str:
+    """Formata a janela (ou uma fatia dela) reaproveitando as linhas já serializadas do dataset."""
+    return SEGMENTS.format(window, self.ts_format, self.ts_type, self.scale)
+
+  @classmethod
+  def auto(
+    cls, window:TimeSeriesWindow, periods:int, prompt_type:PromptType, budget:int = None,
+    ts_type:TSType = None, estimator:TokenEstimator = ESTIMATOR, series_id:str = None,
+    layout:PromptLayout = PromptLayout.INLINE
+  ) -> 'PromptModel':
+    """
+    Cria o PromptModel com o formato mais barato em tokens (prompt + resposta) que cabe no orçamento.
 
-  def generate(self) -> str:
+    Args:
+      budget (int): Orçamento de tokens do contexto (None escolhe apenas o mais barato).
+      ts_type (TSType): Tipo de série fixo (None compara todos os TSType).
+      estimator (TokenEstimator): Estimador de tokens.
+
+    Raises:
+      ValueError: Se nenhum formato couber no orçamento.
+    """
+    estimates = cls(window, periods, prompt_type, series_id=series_id, layout=layout).estimate(estimator, types=[ts_type] if ts_type else None)
+    fits = [e for e in estimates if budget is None or e["total_tokens"] <= budget]
+    if not fits:
+      raise ValueError(f"Nenhum formato cabe no orçamento de {budget} tokens (o mais barato usa {estimates[0]['total_tokens']}).")
+    best = fits[0]
+    print(f"[INFO] Formato automático: {best['ts_format'].value}/{best['ts_type'].value} com ~{best['total_tokens']} tokens.")
+    return cls(window, periods, prompt_type, best["ts_format"], best["ts_type"], series_id, layout)
+
+  def estimate(self, estimator:TokenEstimator = ESTIMATOR, formats:list = None, types:list = None) -> list[dict]:
     """
-    Gera o prompt formatado com base no tipo escolhido.
+    Estima os tokens do prompt e da resposta para cada combinação TSFormat x TSType, sem enviar nada.
+
+    A resposta é estimada pelos últimos 'periods' pontos da janela no mesmo formato. Combinações
+    que a janela não comporta são omitidas.
+
+    Returns:
+      list[dict]: Uma linha por combinação (ts_format, ts_type, prompt_tokens, response_tokens,
+        total_tokens), da mais barata para a mais cara.
+
+    Raises:
+      ValueError: Se nenhuma combinação puder ser gerada (ex.: FEW_SHOT com menos de 96 pontos).
+    """
+    estimates, errors = [], []
+    for ts_type in types or list(TSType):
+      for ts_format in formats or list(TSFormat):
+        model = PromptModel(self.window, self.periods, self.prompt_type, ts_format, ts_type, self.series_id, self.layout)
+        try:
+          prompt = model.generate(verbose=False)
+        except ValueError as e:
+          errors.append(e)
+          continue
+        prompt_tokens = estimator.count(prompt)
+        response_tokens = estimator.count(model.serialize(self.window[-self.periods:]))
+        estimates.append({
+          "ts_format": ts_format,
+          "ts_type": ts_type,
+          "prompt_tokens": prompt_tokens,
+          "response_tokens": response_tokens,
+          "total_tokens": prompt_tokens + response_tokens,
+        })
+    if errors and not estimates:
+      raise errors[0]
+    return sorted(estimates, key=lambda e: e["total_tokens"])
+
+  def encoding(self) -> str:
+    """
+    Explica ao modelo a codificação dos valores em SCALED, DELTA e SYMBOLIC, com os parâmetros da
+    escala da janela. NUMERIC e TEXTUAL não têm explicação (o prompt fica igual ao original).
+    """
+    scale = self.scale
+    if self.ts_type == TSType.SCALED:
+      return SCALED_ENCODING.format(steps=scale.steps, low=round(scale.low, 3), high=round(scale.high, 3))
+    if self.ts_type == TSType.DELTA:
+      return DELTA_ENCODING
+    if self.ts_type == TSType.SYMBOLIC:
+      return SYMBOLIC_ENCODING.format(
+        low=round(scale.low, 3), high=round(scale.high, 3), levels=scale.levels,
+        first=SYMBOL_ALPHABET[0], last=SYMBOL_ALPHABET[scale.levels - 1]
+      )
+    return ""
+
+  def prefix(self) -> str:
+    """
+    Retorna o trecho inicial do prompt que se repete byte a byte entre requisições do mesmo PromptType.
+
+    No layout PREFIX são as instruções inteiras; no INLINE, apenas o texto anterior ao primeiro
+    valor da requisição. Os provedores só reaproveitam prefixos longos (a OpenAI exige 1024 tokens).
+    """
+    if self.layout == PromptLayout.PREFIX:
+      return PREFIXES[self.prompt_type].format(timestamp="hora")
+    template = TEMPLATES[self.layout][self.prompt_type]
+    return template[:template.index("{")]
+
+  def generate(self, verbose:bool = True) -> str:
+    """
+    Gera o prompt formatado com base no tipo e no layout escolhidos.
+
+    Args:
+      verbose (bool): Se False, não registra o formato e o tipo do prompt no log.
 
     Returns:
       str: Prompt formatado para entrada no modelo.
     """
-    print(f"[INFO] Formato dos dados: {self.ts_format.value}")
-    print(f"[INFO] Tipo de série: {self.ts_type.value}")
+    log = print if verbose else lambda *args: None
+    log(f"[INFO] Formato dos dados: {self.ts_format.value}")
+    log(f"[INFO] Tipo de série: {self.ts_type.value}")
+    log(f"[INFO] Layout do prompt: {self.layout.value}")
+    if self.series_id is not None:
+      log(f"[INFO] Série: {self.series_id}")
+
+    if self.prompt_type not in TEMPLATES[self.layout]:
+      raise ValueError(f"Tipo de prompt inválido: {self.prompt_type}")
 
-    start_forecast = format_timeseries(self.window[:4], self.ts_format, self.ts_type)
-    output_example = format_timeseries(self.window[:24], self.ts_format, self.ts_type)
-    window = format_timeseries(self.window, self.ts_format, self.ts_type)
+    # A janela inteira é convertida uma única vez; as fatias abaixo só juntam linhas prontas
+    window = self.serialize(self.window)
+    start_forecast = self.serialize(self.window[:4])
+    output_example = self.serialize(self.window[:24])
 
     base_kwargs = {
       "periods": len(self.window),
@@ -58,24 +204,24 @@ class PromptModel:
       "output": self.periods,
       "output_example": output_example,
       "data_prompt": window,
+      "encoding": self.encoding(),
       "timestamp": "hora",
       "n": self.periods,
     }
 
     if self.prompt_type == PromptType.ZERO_SHOT:
-      print(f"[INFO] Prompt ZERO-SHOT gerado com {len(self.window)} períodos.")
-      return ZERO_SHOT.format(**base_kwargs)
+      log(f"[INFO] Prompt ZERO-SHOT gerado com {len(self.window)} períodos.")
 
     elif self.prompt_type == PromptType.FEW_SHOT or self.prompt_type == PromptType.COT_FEW:
-      print(f"[INFO] Prompt FEW-SHOT ou COT-FEW gerado com {len(self.window)} períodos.")
+      log(f"[INFO] Prompt FEW-SHOT ou COT-FEW gerado com {len(self.window)} períodos.")
       # Verificação se há dados suficientes
       if len(self.window) < 96:
         raise ValueError("Para FEW-SHOT ou COT-FEW, window deve conter pelo menos 96 elementos.")
 
-      period1 = format_timeseries(self.window[:24], self.ts_format, self.ts_type)
-      period2 = format_timeseries(self.window[24:48], self.ts_format, self.ts_type)
-      period3 = format_timeseries(self.window[48:72], self.ts_format, self.ts_type)
-      period4 = format_timeseries(self.window[72:96], self.ts_format, self.ts_type)
+      period1 = self.serialize(self.window[:24])
+      period2 = self.serialize(self.window[24:48])
+      period3 = self.serialize(self.window[48:72])
+      period4 = self.serialize(self.window[72:96])
 
       exemplos = {
         "period1": period1,
@@ -85,14 +231,7 @@ class PromptModel:
       }
       base_kwargs.update(exemplos)
 
-      if self.prompt_type == PromptType.FEW_SHOT:
-        return FEW_SHOT.format(**base_kwargs)
-      else:
-        return COT_FEW.format(**base_kwargs)
-
     elif self.prompt_type == PromptType.COT:
-      print(f"[INFO] Prompt COT gerado com {len(self.window)} períodos.")
-      return COT.format(**base_kwargs)
+      log(f"[INFO] Prompt COT gerado com {len(self.window)} períodos.")
 
-    else:
-      raise ValueError(f"Tipo de prompt inválido: {self.prompt_type}")
+    return TEMPLATES[self.layout][self.prompt_type].format(**base_kwargs)
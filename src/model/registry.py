@@ -0,0 +1,136 @@
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from src.model.cache import DatasetCache
+
+class DatasetRegistry:
+  def __init__(self, max_bytes: int):
+    """
+    Registro de datasets em memória compartilhado por todas as sessões e páginas do processo.
+
+    Cada entrada é indexada por (caminho, mtime, tamanho) do CSV e pela série, em datasets
+    no formato longo, de modo que uma alteração no arquivo gera uma nova chave e cada série
+    ocupa apenas a sua fatia de memória. Quando a soma dos bytes ultrapassa o orçamento, as
+    entradas menos usadas recentemente são descartadas. Acessos simultâneos à mesma chave
+    ausente esperam uma única carga, contada como uma falha.
+
+    Args:
+      max_bytes (int): Orçamento máximo de memória, em bytes.
+    """
+    self.max_bytes = max_bytes
+    self.entries = OrderedDict()
+    self.versions = {}
+    self.loading = {}
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.lock = threading.Lock()
+
+  @staticmethod
+  def key(path: str, series_id: str = None) -> tuple[str, int, int, str]:
+    """Retorna a chave (caminho, mtime, tamanho, série) do arquivo."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size, series_id
+
+  def get(self, path: str, series_id: str = None) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    Retorna as colunas (date, value) e os metadados do dataset, carregando-o no primeiro acesso.
+
+    Args:
+      path (str): Caminho do arquivo CSV do dataset.
+      series_id (str): Série de um dataset no formato longo (None retorna todas as linhas).
+
+    Returns:
+      tuple: (date em epoch int64 ns, value em float64, metadados do cache).
+    """
+    key = DatasetRegistry.key(path, series_id)
+    with self.lock:
+      if key in self.entries:
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return self.entries[key]
+      key_lock = self.loading.setdefault(key, threading.Lock())
+
+    # Sessões que pedem a mesma chave ao mesmo tempo esperam uma única carga
+    with key_lock:
+      with self.lock:
+        if key in self.entries:
+          self.entries.move_to_end(key)
+          self.hits += 1
+          return self.entries[key]
+        self.misses += 1
+      try:
+        entry = self.load(path, series_id)
+        if entry is None:
+          return None, None, None
+        self.store(key, entry)
+        return entry
+      finally:
+        with self.lock:
+          self.loading.pop(key, None)
+
+  @staticmethod
+  def load(path: str, series_id: str = None) -> tuple[np.ndarray, np.ndarray, dict]:
+    """Lê as colunas do cache colunar como arrays somente leitura (None se o dataset não puder ser lido)."""
+    cache = DatasetCache(path)
+    dates, values = cache.load(series_id)
+    if dates is None:
+      return None
+    entry = (np.array(dates), np.array(values), cache.meta)
+    # As colunas são compartilhadas entre sessões: ninguém deve alterá-las
+    entry[0].setflags(write=False)
+    entry[1].setflags(write=False)
+    return entry
+
+  def store(self, key: tuple, entry: tuple) -> None:
+    """Guarda a entrada no registro, descartando as menos usadas acima do orçamento."""
+    with self.lock:
+      # Uma nova versão do arquivo torna obsoletas todas as suas séries em memória
+      if self.versions.get(key[0], key[1:3]) != key[1:3]:
+        self.discard(key[0])
+      size = entry[0].nbytes + entry[1].nbytes
+      if size <= self.max_bytes:
+        self.entries[key] = entry
+        self.versions[key[0]] = key[1:3]
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+          self.evict()
+
+  def discard(self, path: str) -> None:
+    """Remove as entradas de um caminho, se houver (chamar com o lock adquirido)."""
+    path = os.path.abspath(path)
+    self.versions.pop(path, None)
+    for key in [key for key in self.entries if key[0] == path]:
+      dates, values, _ = self.entries.pop(key)
+      self.bytes -= dates.nbytes + values.nbytes
+
+  def evict(self) -> None:
+    """Descarta a entrada menos usada recentemente (chamar com o lock adquirido)."""
+    key, (dates, values, _) = self.entries.popitem(last=False)
+    if not any(other[0] == key[0] for other in self.entries):
+      self.versions.pop(key[0], None)
+    self.bytes -= dates.nbytes + values.nbytes
+    self.evictions += 1
+
+  def invalidate(self, path: str) -> None:
+    """Remove um dataset do registro (ex.: após renomear ou excluir o arquivo)."""
+    with self.lock:
+      self.discard(path)
+
+  def stats(self) -> dict:
+    """Retorna os contadores de uso do registro."""
+    with self.lock:
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "entries": len(self.entries),
+        "bytes": self.bytes,
+        "max_bytes": self.max_bytes,
+      }
+
+REGISTRY = DatasetRegistry(max_bytes=int(os.getenv("DATASET_CACHE_MB", "512")) * 1024 * 1024)
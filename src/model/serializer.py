@@ -0,0 +1,174 @@
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from src.model.format import TSFormat, TSType, Columns, Scale, ENCODERS, ELEMENTWISE, columns, format_timeseries
+from src.model.window import TimeSeriesWindow
+
+class Segment:
+  __slots__ = ('start', 'dates', 'values', 'labels', 'texts')
+
+  def __init__(self, start: int, dates: np.ndarray, values: np.ndarray, labels: list[str], texts: list[str]):
+    """
+    Trecho contínuo de um dataset com as datas e os valores já convertidos em texto.
+
+    Args:
+      start (int): Posição do primeiro ponto do trecho no dataset.
+      dates (np.ndarray): Datas em epoch int64 (ns), usadas para validar o trecho.
+      values (np.ndarray): Valores em float64, usados para validar o trecho.
+      labels (list[str]): Datas em texto.
+      texts (list[str]): Valores codificados em texto.
+    """
+    self.start = start
+    self.dates = dates
+    self.values = values
+    self.labels = labels
+    self.texts = texts
+
+  @property
+  def end(self) -> int:
+    return self.start + len(self.texts)
+
+class SegmentCache:
+  def __init__(self, max_rows: int):
+    """
+    Cache das linhas já serializadas das janelas, compartilhado por prompts e backtests.
+
+    Cada dataset (origem da janela), TSType e resolução das datas tem um trecho contínuo de
+    linhas em texto, indexado pela posição no dataset. Janelas e fatias que caem dentro do trecho
+    não convertem nada: o texto final sai de um único join sobre as linhas prontas, em qualquer
+    TSFormat. Janelas que avançam sobre o trecho (origens de um backtest) convertem só as
+    posições novas. Antes de reaproveitar linhas, as datas e os bits dos valores da janela são
+    comparados com os do trecho, de modo que janelas arredondadas ou de uma versão anterior do
+    arquivo nunca reaproveitam texto alheio.
+
+    Args:
+      max_rows (int): Orçamento máximo de linhas em memória.
+    """
+    self.max_rows = max_rows
+    self.entries = OrderedDict()
+    self.rows = 0
+    self.hits = 0
+    self.misses = 0
+    self.rendered = 0
+    self.evictions = 0
+    self.lock = threading.Lock()
+
+  @staticmethod
+  def render(window: TimeSeriesWindow, ts_type: TSType, unit: str) -> tuple[list[str], list[str]]:
+    """Converte as datas (na resolução 'unit') e os valores codificados da janela em texto."""
+    return window.labels(unit=unit), list(map(str, ENCODERS[ts_type](window.values.tolist())))
+
+  @staticmethod
+  def matches(segment: Segment, window: TimeSeriesWindow) -> bool:
+    """Verifica se as datas e os valores da janela coincidem com os do trecho onde se sobrepõem."""
+    start = max(segment.start, window.offset)
+    end = min(segment.end, window.offset + len(window))
+    if start >= end:
+      return True
+    cached = slice(start - segment.start, end - segment.start)
+    other = slice(start - window.offset, end - window.offset)
+    return (
+      np.array_equal(segment.dates[cached], window.dates[other].view('int64')) and
+      np.array_equal(segment.values[cached].view('int64'), window.values[other].view('int64'))
+    )
+
+  def columns(self, window: TimeSeriesWindow, ts_type: TSType = TSType.NUMERIC, scale: Scale = None) -> Columns:
+    """
+    Retorna as colunas em texto da janela, codificadas pelo TSType, reaproveitando as linhas em cache.
+
+    Listas de tuplas, janelas sem origem, vazias ou com datas em nanossegundos (cujo texto
+    depende da janela inteira) e tipos que dependem da escala ou do valor anterior (fora de
+    ELEMENTWISE) são convertidos diretamente, sem cache.
+    """
+    if (
+      not isinstance(window, TimeSeriesWindow) or window.source is None or len(window) == 0 or
+      window.unit == 'ns' or ts_type not in ELEMENTWISE
+    ):
+      if scale is None and ts_type not in ELEMENTWISE:
+        scale = Scale.fit(window)
+      return columns(ENCODERS[ts_type](window, scale))
+    key = (window.source, ts_type, window.unit)
+    start, end = window.offset, window.offset + len(window)
+
+    with self.lock:
+      segment = self.entries.get(key)
+      if segment is not None and segment.start <= start and end <= segment.end and SegmentCache.matches(segment, window):
+        self.entries.move_to_end(key)
+        self.hits += 1
+      else:
+        self.misses += 1
+        if segment is not None:
+          self.discard(key)
+        if segment is not None and start <= segment.end and segment.start <= end and SegmentCache.matches(segment, window):
+          segment = self.extend(segment, window, ts_type, key[2])
+        else:
+          labels, texts = SegmentCache.render(window, ts_type, key[2])
+          self.rendered += len(texts)
+          segment = Segment(start, window.dates.view('int64').copy(), window.values.copy(), labels, texts)
+        self.store(key, segment)
+
+      begin = start - segment.start
+      labels = segment.labels[begin:begin + len(window)]
+      texts = segment.texts[begin:begin + len(window)]
+    return Columns(labels, texts, window.values if ts_type == TSType.NUMERIC else texts)
+
+  def extend(self, segment: Segment, window: TimeSeriesWindow, ts_type: TSType, unit: str) -> Segment:
+    """Estende o trecho com as posições da janela que ainda não foram convertidas (chamar com o lock adquirido)."""
+    before = window[:max(segment.start - window.offset, 0)]
+    after = window[max(segment.end - window.offset, 0):]
+    left, right = SegmentCache.render(before, ts_type, unit), SegmentCache.render(after, ts_type, unit)
+    self.rendered += len(before) + len(after)
+    # Avançar sobre o trecho (o caso comum em backtests) só acrescenta linhas ao final das listas
+    labels = left[0] + segment.labels if len(before) else segment.labels
+    texts = left[1] + segment.texts if len(before) else segment.texts
+    labels.extend(right[0])
+    texts.extend(right[1])
+    return Segment(
+      min(segment.start, window.offset),
+      np.concatenate([before.dates.view('int64'), segment.dates, after.dates.view('int64')]),
+      np.concatenate([before.values, segment.values, after.values]),
+      labels, texts
+    )
+
+  def discard(self, key: tuple) -> None:
+    """Remove o trecho de uma chave (chamar com o lock adquirido)."""
+    segment = self.entries.pop(key)
+    self.rows -= len(segment.texts)
+
+  def store(self, key: tuple, segment: Segment) -> None:
+    """Guarda o trecho e descarta os menos usados acima do orçamento (chamar com o lock adquirido)."""
+    if len(segment.texts) > self.max_rows:
+      return
+    self.entries[key] = segment
+    self.rows += len(segment.texts)
+    while self.rows > self.max_rows:
+      _, evicted = self.entries.popitem(last=False)
+      self.rows -= len(evicted.texts)
+      self.evictions += 1
+
+  def format(self, window: TimeSeriesWindow, ts_format: TSFormat, ts_type: TSType = TSType.NUMERIC, scale: Scale = None) -> str:
+    """Formata a janela (ou lista de tuplas) como format_timeseries, reaproveitando as linhas em cache."""
+    return format_timeseries(self.columns(window, ts_type, scale), ts_format, ts_type)
+
+  def clear(self) -> None:
+    """Remove todos os trechos do cache."""
+    with self.lock:
+      self.entries.clear()
+      self.rows = 0
+
+  def stats(self) -> dict:
+    """Retorna os contadores de uso do cache."""
+    with self.lock:
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "rendered": self.rendered,
+        "evictions": self.evictions,
+        "entries": len(self.entries),
+        "rows": self.rows,
+        "max_rows": self.max_rows,
+      }
+
+SEGMENTS = SegmentCache(max_rows=int(os.getenv("SEGMENT_CACHE_ROWS", "1000000")))
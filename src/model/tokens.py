@@ -0,0 +1,59 @@
+import re
+from typing import Callable
+
+PIECES = re.compile(r'\d+|[^\W\d_]+|\n+|[^\S\n]+|[^\w\s]')
+
+def heuristic_tokens(text: str) -> int:
+  """
+  Estima a quantidade de tokens de um texto sem tokenizador nem acesso à rede.
+
+  Segue o comportamento dos tokenizadores BPE (cl100k/o200k) em prompts de séries temporais:
+  números são quebrados em blocos de até 3 dígitos, palavras rendem cerca de um token a cada
+  4 letras, cada sinal de pontuação é um token, quebras de linha consecutivas formam um token
+  e espaços simples se juntam à palavra seguinte.
+  """
+  tokens = 0
+  for piece in PIECES.findall(text):
+    first = piece[0]
+    if first.isdigit():
+      tokens += (len(piece) + 2) // 3
+    elif first == '\n':
+      tokens += 1
+    elif first.isspace():
+      tokens += len(piece) > 1
+    elif first.isalpha():
+      tokens += (len(piece) + 3) // 4
+    else:
+      tokens += 1
+  return tokens
+
+def tiktoken_tokens(encoding: str = "o200k_base") -> Callable[[str], int]:
+  """
+  Retorna um contador de tokens exato baseado no tiktoken (dependência opcional).
+
+  Args:
+    encoding (str): Codificação do tiktoken (ex.: 'o200k_base', 'cl100k_base').
+  """
+  try:
+    import tiktoken
+  except ImportError as e:
+    raise ImportError("O contador exato de tokens requer o pacote tiktoken (pip install tiktoken).") from e
+  encoder = tiktoken.get_encoding(encoding)
+  return lambda text: len(encoder.encode(text, disallowed_special=()))
+
+class TokenEstimator:
+  def __init__(self, tokenizer: Callable[[str], int] = heuristic_tokens):
+    """
+    Estimador offline da quantidade de tokens de prompts e respostas.
+
+    Args:
+      tokenizer (Callable[[str], int]): Função que conta os tokens de um texto. O padrão é a
+        heurística heuristic_tokens; use tiktoken_tokens() ou o tokenizador do modelo para contagens exatas.
+    """
+    self.tokenizer = tokenizer
+
+  def count(self, text: str) -> int:
+    """Retorna a quantidade estimada de tokens do texto."""
+    return self.tokenizer(text) if text else 0
+
+ESTIMATOR = TokenEstimator()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+DAY_NS = 86_400_000_000_000
+SECOND_NS = 1_000_000_000
+
+class TimeSeriesWindow:
+  __slots__ = ('dates', 'values', 'source', 'offset', '_unit')
+
+  def __init__(self, dates: np.ndarray, values: np.ndarray, source: tuple = None, offset: int = 0):
+    """
+    Janela de uma série temporal apoiada em arrays NumPy.
+
+    Substitui a lista de tuplas (data, valor): as datas ficam em um array datetime64[ns]
+    e os valores em um array float64. Fatiar a janela devolve outra janela sobre os mesmos
+    arrays (sem cópia). Indexar ou iterar produz tuplas (data em texto, valor), no mesmo
+    formato de Series.astype(str), de modo que a janela pode ser usada onde antes se
+    usava a lista.
+
+    Args:
+      dates (np.ndarray): Datas em datetime64 (convertidas para ns) ou epoch int64 ns.
+      values (np.ndarray): Valores em float64.
+      source (tuple): Identificação do dataset de origem (ex.: (caminho, série)).
+      offset (int): Posição do primeiro ponto da janela no dataset de origem.
+    """
+    # O pandas 3 devolve datetime64[us] em DatetimeIndex.values: só datas em ns são reaproveitadas sem cópia
+    self.dates = dates.astype('datetime64[ns]', copy=False) if dates.dtype.kind == 'M' else dates.view('datetime64[ns]')
+    self.values = values
+    self.source = source
+    self.offset = offset
+    self._unit = None
+
+  def __len__(self) -> int:
+    return len(self.values)
+
+  def __getitem__(self, key):
+    if isinstance(key, slice):
+      start = range(len(self))[key].start if len(self) else 0
+      return TimeSeriesWindow(self.dates[key], self.values[key], self.source, self.offset + start)
+    if self.unit == 'ns':
+      return self.labels()[key], float(self.values[key])
+    return self.labels(self.dates[key:key + 1 or None])[0], float(self.values[key])
+
+  def __iter__(self):
+    return zip(self.labels(), self.values.tolist())
+
+  def __array__(self, dtype=None, copy=None):
+    return self.values if dtype is None else self.values.astype(dtype)
+
+  def __repr__(self) -> str:
+    return f"TimeSeriesWindow(len={len(self)}, offset={self.offset}, source={self.source})"
+
+  @property
+  def unit(self) -> str:
+    """Resolução das datas em texto da janela: 'D' (todas à meia-noite), 's' ou 'ns'."""
+    if self._unit is None:
+      epoch = self.dates.view('int64')
+      self._unit = 'D' if (epoch % DAY_NS == 0).all() else 's' if not (epoch % SECOND_NS).any() else 'ns'
+    return self._unit
+
+  def labels(self, dates: np.ndarray = None, unit: str = None) -> list[str]:
+    """
+    Converte as datas (por padrão, todas as da janela) em texto como Series.astype(str)
+    aplicado à janela inteira: sem horário quando todas as datas estão à meia-noite.
+    Informe 'unit' para converter na resolução de outra janela que contenha estas datas.
+    """
+    dates = self.dates if dates is None else dates
+    unit = self.unit if unit is None else unit
+    if unit == 'ns':
+      return pd.Series(dates).astype(str).tolist()
+    if unit == 'D':
+      return np.datetime_as_string(dates, unit='D').tolist()
+    labels = np.datetime_as_string(dates, unit='s')
+    # Troca o 'T' (11º caractere de 'AAAA-MM-DDTHH:MM:SS') por espaço direto no buffer UCS-4
+    labels.view(np.uint32)[10::labels.itemsize // 4] = ord(' ')
+    return labels.tolist()
+
+  def round(self, decimals: int) -> 'TimeSeriesWindow':
+    """Retorna uma janela com os valores arredondados (as datas continuam compartilhadas)."""
+    return TimeSeriesWindow(self.dates, self.values.round(decimals), self.source, self.offset)
+
+  def to_frame(self) -> pd.DataFrame:
+    """Retorna a janela como DataFrame com as colunas 'date' e 'value'."""
+    return pd.DataFrame(
+      {"date": self.dates, "value": self.values},
+      index=pd.RangeIndex(self.offset, self.offset + len(self)),
+      copy=False
+    )
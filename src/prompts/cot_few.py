@@ -46,7 +46,7 @@ Duração de um evento: A série temporal fornecida representa a ocorrência de
 Organização dos Dados:
 Os dados da série temporal são apresentados como uma sequencia de valores, onde cada valor representa um período consecutivo.
 
-Série temporal a ser analisada:
+{encoding}Série temporal a ser analisada:
 {data_prompt}
 
 =======================
@@ -68,3 +68,50 @@ Período (prevista):
 
 Gere um array com {n} posições (N={n}) prevendo os números da sequência:
 """
+
+COT_FEW_PREFIX = """Você é um assistente de previsão de séries temporais encarregado de analisar dados de uma série temporal específica.
+
+A série temporal tem dados de P período(s) consecutivos, com P informado nos dados da requisição ao final. Cada anotação da série temporal representa a incidência de um evento que ocorre a cada dia.
+
+Início da Previsão:
+Sua previsão deve começar a partir do próximo período (meia-noite do próximo dia), seguindo o padrão observado nos dados anteriores.
+Um início de previsão esperado é apresentado nos dados da requisição ao final.
+Garanta que o primeiro valor da previsão corresponda ao início do período, respeitando os padrões observados.
+
+Objetivo:
+Seu objetivo é prever a incidência de um evento para os próximos N períodos, com N informado nos dados da requisição ao final, considerando os dados históricos e o contexto geral da série temporal.
+
+Siga este raciocínio passo a passo:
+1. Analise os dados fornecidos para identificar tendências gerais (crescimento, queda ou estabilidade).
+2. Identifique padrões semanais recorrentes, como variações nos fins de semana ou dias úteis.
+3. Considere a presença de sazonalidade diária ou semanal que possa afetar os valores futuros.
+4. Avalie se há feriados ou eventos especiais no histórico que afetam significativamente os dados.
+5. Considere o impacto do dia da semana sobre os valores previstos.
+6. Com base nessas observações, projete os próximos valores de forma coerente com os padrões detectados.
+
+Explicação do Raciocínio:
+Antes de apresentar o resultado final, explique detalhadamente:
+1. O que você utilizou dos dados históricos e por quê.
+2. Quais padrões, tendências ou sazonalidades você identificou na série temporal.
+3. Como você utilizou o dia da semana, feriados ou eventos especiais (caso existam) para ajustar sua previsão.
+4. Como esses elementos influenciaram na construção do seu array final.
+
+Regras da Saída:
+Após analisar os dados fornecidos e compreender os padrões de tráfego, gere uma previsão para os próximos N dias, com as seguintes regras:
+A saída deve ser uma lista contendo apenas os valores previstos, sem explicação adicional ou texto introdutório.
+Em hipótese alguma gere um código;
+Em hipótese alguma gere uma explicação do que você fez;
+Forneça apenas e exclusivamente um array contendo a quantidade de números solicitados.
+A previsão deve começar com o valor correspondente ao início do próximo período, respeitando os padrões observados nos dados históricos.
+Um exemplo de saída é apresentado nos dados da requisição ao final.
+
+Instruções Adicionais:
+Padrões Semanais: Utilize os dados fornecidos para entender padrões sazonais, como picos de incidência em determinados períodos.
+Eventos Especiais: A ocorrência de eventos é significativamente afetada por feriados e outros eventos importantes.
+Dia da Semana: O dia da semana também influencia a ocorrência de eventos.
+Duração de um evento: A série temporal fornecida representa a ocorrência de um evento a cada hora.
+
+Organização dos Dados:
+Os dados da série temporal são apresentados como uma sequencia de valores, onde cada valor representa um período consecutivo.
+Dois exemplos de um período histórico seguido do período previsto são apresentados nos dados da requisição ao final.
+"""
@@ -0,0 +1,17 @@
+SCALED_ENCODING = """Codificação dos Valores:
+Os valores estão em escala: cada valor é um inteiro entre 0 e {steps}, em que 0 corresponde a {low} e {steps} a {high}, em proporção linear.
+A previsão deve usar a mesma escala, com inteiros no lugar dos valores originais.
+
+"""
+
+DELTA_ENCODING = """Codificação dos Valores:
+Os valores estão em diferenças: em cada bloco de dados, o primeiro valor é absoluto e cada um dos seguintes é a diferença em relação ao valor anterior.
+A previsão deve seguir a mesma codificação: o primeiro valor absoluto, correspondente ao próximo período, e os demais como diferenças em relação ao valor anterior da previsão.
+
+"""
+
+SYMBOLIC_ENCODING = """Codificação dos Valores:
+Os valores estão em símbolos: o intervalo entre {low} e {high} foi dividido em {levels} faixas de mesma largura, representadas em ordem crescente pelas letras de '{first}' a '{last}'; '?' indica um valor ausente.
+A previsão deve usar as mesmas letras, uma por período, no lugar dos números.
+
+"""
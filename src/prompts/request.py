@@ -0,0 +1,55 @@
+REQUEST = """
+=======================
+Dados da Requisição:
+
+Períodos da série (P): {periods}
+Valores a prever (N): {n}
+
+{encoding}Série temporal a ser analisada:
+{data_prompt}
+
+Início de previsão esperado:
+{start_forecast}
+
+Exemplo de Saída para N={output}:
+{output_example}
+
+=======================
+
+Gere um array com {n} posições (N={n}) prevendo os números da sequência:
+"""
+
+REQUEST_FEW = """
+=======================
+Dados da Requisição:
+
+Períodos da série (P): {periods}
+Valores a prever (N): {n}
+
+{encoding}Série temporal a ser analisada:
+{data_prompt}
+
+Início de previsão esperado:
+{start_forecast}
+
+Exemplo de Saída para N={output}:
+{output_example}
+
+Exemplos de um Período N={n}:
+
+Exemplo 1:
+Período (histórico):
+{period1}
+Período (prevista):
+{period2}
+
+Exemplo 2:
+Período (histórico):
+{period3}
+Período (prevista):
+{period4}
+
+=======================
+
+Gere um array com {n} posições (N={n}) prevendo os números da sequência:
+"""
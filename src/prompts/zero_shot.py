@@ -28,8 +28,36 @@ Eventos Especiais: A ocorrência de eventos pode ser significativamente afetada
 Periodicidade e Contexto Temporal: Considere o impacto de variações regulares baseadas em unidades de tempo recorrentes ({timestamp}), conforme apropriado ao domínio da série.
 Duração de um Evento: A série temporal fornecida representa a ocorrência de um evento a cada {timestamp}.
 
-Série temporal a ser analisada:
+{encoding}Série temporal a ser analisada:
 {data_prompt}
 
 Gere um array com {n} observações (N={n}) prevendo os números da sequência:
 """
+
+ZERO_SHOT_PREFIX = """Você é um modelo especializado em previsão de séries temporais. Seu papel é prever os próximos valores com base em padrões históricos, independentemente do domínio dos dados.
+
+A série temporal tem dados de P período(s) consecutivos, com P informado nos dados da requisição ao final. Cada anotação da série temporal representa a incidência de um evento que ocorre a cada {timestamp}.
+
+Início da Previsão:
+A previsão deve iniciar imediatamente após o último ponto da série, seguindo o padrão histórico detectado nos dados anteriores.
+Um início de previsão esperado é apresentado nos dados da requisição ao final.
+Garanta que o primeiro valor da previsão corresponda ao início do período, respeitando os padrões observados.
+
+Objetivo:
+Seu objetivo é prever os próximos N valores da série temporal, com N informado nos dados da requisição ao final, levando em consideração os padrões históricos, tendências e quaisquer efeitos sazonais ou contextuais detectáveis nos dados.
+
+Regras da Saída:
+Após analisar os dados fornecidos e compreender os padrões, gere uma previsão para os próximos N periodos, com as seguintes regras:
+A saída deve ser exclusivamente um array numérico (lista com N valores);
+Em hipótese alguma gere um código;
+Em hipótese alguma gere uma explicação do que você fez;
+Forneça apenas e exclusivamente um array contendo a quantidade de números solicitados.
+A previsão deve começar com o valor correspondente ao início do próximo período, respeitando os padrões observados nos dados históricos.
+Um exemplo de saída é apresentado nos dados da requisição ao final.
+
+Instruções Adicionais:
+Padrões Temporais: Utilize os dados fornecidos para identificar padrões sazonais ou recorrências que se repetem ao longo do tempo, como tendências ou ciclos característicos da série.
+Eventos Especiais: A ocorrência de eventos pode ser significativamente afetada por fatores contextuais relevantes, como feriados, promoções, mudanças políticas, condições climáticas, entre outros.
+Periodicidade e Contexto Temporal: Considere o impacto de variações regulares baseadas em unidades de tempo recorrentes ({timestamp}), conforme apropriado ao domínio da série.
+Duração de um Evento: A série temporal fornecida representa a ocorrência de um evento a cada {timestamp}.
+"""
@@ -1,9 +1,10 @@
 import streamlit as st
 
 from src.model.data import Data
+from src.model.registry import REGISTRY
 
 class Dataset:
-  def __init__(self, dataset:str, start_date:str, end_date:str, periods:int):
+  def __init__(self, dataset:str, start_date:str, end_date:str, periods:int, series_id:str = None):
     """
     Classe responsável por manipular o dataset.
 
@@ -12,15 +13,21 @@ class Dataset:
       start_date (str): Data de início do dataset.
       end_date (str): Data de fim do dataset.
       periods (int): Quantidade de períodos a serem previstos.
+      series_id (str): Série selecionada em datasets no formato longo.
     """
     self.dataset = dataset
     self.start_date = start_date
     self.end_date = end_date
     self.periods = periods*24
+    self.series_id = series_id
 
   def show(self):
-    df_selected, y_true = Data(dataset=self.dataset, start_date=self.start_date, end_date=self.end_date, periods=self.periods).period_selection()
+    df_selected, y_true = Data(dataset=self.dataset, start_date=self.start_date, end_date=self.end_date, periods=self.periods, series_id=self.series_id).period_selection()
     st.write("### Dados Selecionados")
     st.dataframe(df_selected, use_container_width=True)
     st.write("### Dados Exatos")
     st.dataframe(y_true, use_container_width=True)
+    stats = REGISTRY.stats()
+    requests = stats['hits'] + stats['misses']
+    rate = f"{100 * stats['hits'] / requests:.1f}%" if requests else '-'
+    st.caption(f"Datasets em memória: {stats['hits']} acertos, {stats['misses']} falhas ({rate}), {stats['evictions']} descartes, {stats['entries']} entradas, {stats['bytes'] / 2**20:.1f} de {stats['max_bytes'] / 2**20:.0f} MB")
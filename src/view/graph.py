@@ -1,11 +1,13 @@
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 
 class Graph:
   @staticmethod
-  def sample(title:str, values:list):
+  def sample(title:str, values:np.ndarray):
+    values = np.asarray(values)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=list(range(len(values))), y=values, mode='lines', name='Série Temporal'))
+    fig.add_trace(go.Scatter(x=np.arange(len(values)), y=values, mode='lines', name='Série Temporal'))
     fig.update_layout(
       title=title,
       xaxis_title='Períodos',
@@ -17,8 +19,13 @@ class Graph:
     st.write('---')
 
   @staticmethod
-  def forecast(title:str, y_true:list, y_pred:list, key:int=1):
+  def forecast(title:str, y_true:list, y_pred:list, key:int=1, band:list=None):
     fig = go.Figure()
+    if band is not None:
+      # Faixa entre os quantis inferior e superior das amostras do ensemble
+      low, high = band
+      fig.add_trace(go.Scatter(x=list(range(len(high))), y=high, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+      fig.add_trace(go.Scatter(x=list(range(len(low))), y=low, mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(255, 127, 14, 0.2)', name='Faixa P10–P90'))
     fig.add_trace(go.Scatter(x=list(range(len(y_true))), y=y_true, mode='lines', name='Valores Reais'))
     fig.add_trace(go.Scatter(x=list(range(len(y_pred))), y=y_pred, mode='lines', name='Valores Previsto'))
     fig.update_layout(
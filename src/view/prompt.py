@@ -1,15 +1,34 @@
+import hashlib
 import streamlit as st
-from src.model.prompt import PromptModel, PromptType
+import pandas as pd
+from src.model.prompt import PromptModel, PromptType, PromptLayout
+from src.model.context import Reduction, fit_context
 from src.model.data import Data
 from src.model.format import TSFormat, TSType
 from src.view.graph import Graph
 
+@st.cache_data(max_entries=32, show_spinner="Estimando tokens...")
+def estimate_tokens(key: tuple, _model: PromptModel) -> list[dict]:
+  """Estima os tokens de todas as combinações TSFormat x TSType, em cache pela janela e pela configuração do prompt (key)."""
+  return _model.estimate()
+
+def estimate_key(model: PromptModel) -> tuple:
+  """Identifica a janela (origem, posição e conteúdo) e a configuração do prompt para o cache das estimativas."""
+  window = model.window
+  digest = hashlib.blake2b(window.dates.tobytes() + window.values.tobytes(), digest_size=16).hexdigest()
+  return (window.source, window.offset, len(window), digest, model.periods, model.prompt_type.value, model.layout.value)
+
 class Prompt:
   def __init__(
     self, dataset:str, start_date:str, end_date:str,
     periods: int, prompt_type:PromptType,
     ts_format:TSFormat=TSFormat.CSV,
-    ts_type:TSType=TSType.NUMERIC
+    ts_type:TSType=TSType.NUMERIC,
+    series_id:str=None,
+    auto:bool=False,
+    budget:int=None,
+    reduction:Reduction=Reduction.NONE,
+    layout:PromptLayout=PromptLayout.INLINE
   ):
     """
     Classe responsável por manipular o dataset.
@@ -22,6 +41,11 @@ class Prompt:
       prompt_type (PromptType): Tipo do prompt (ZERO_SHOT, FEW_SHOT, etc.)
       ts_format (TSFormat): Formato dos dados temporais (ARRAY, CSV, etc.).
       ts_type (TSType): Tipo de série (NUMERIC, TEXTUAL).
+      series_id (str): Série selecionada em datasets no formato longo.
+      auto (bool): Se True, usa o formato mais barato em tokens que cabe no orçamento (ts_format é atualizado).
+      budget (int): Orçamento de tokens do contexto para o formato automático e o ajuste da janela.
+      reduction (Reduction): Redução do histórico antigo quando o prompt não cabe no orçamento.
+      layout (PromptLayout): Disposição do prompt (INLINE ou PREFIX, com as instruções como prefixo estável).
     """
     self.dataset = dataset
     self.start_date = start_date
@@ -30,18 +54,69 @@ class Prompt:
     self.prompt_type = prompt_type
     self.ts_format = ts_format
     self.ts_type = ts_type
+    self.series_id = series_id
+    self.auto = auto
+    self.budget = budget
+    self.reduction = reduction
+    self.layout = layout
+    self.context = None
+    self.scale = None
 
   def view(self):
-    window, y_true = Data(dataset=self.dataset, start_date=self.start_date, end_date=self.end_date, periods=self.periods).prompt()
-    prompt = PromptModel(window=window, periods=self.periods, prompt_type=self.prompt_type, ts_format=self.ts_format, ts_type=self.ts_type).generate()
+    window, y_true = Data(dataset=self.dataset, start_date=self.start_date, end_date=self.end_date, periods=self.periods, series_id=self.series_id).prompt()
+    if window is None:
+      st.error("Não há dados suficientes no período selecionado para gerar o prompt.", icon="🚨")
+      st.stop()
+    original = PromptModel(window=window, periods=self.periods, prompt_type=self.prompt_type, ts_format=self.ts_format, ts_type=self.ts_type, series_id=self.series_id, layout=self.layout)
+    try:
+      model = original
+      if self.auto:
+        # Com ajuste ao contexto, o formato mais barato é escolhido antes e a janela é reduzida depois
+        budget = None if self.reduction != Reduction.NONE else self.budget
+        model = PromptModel.auto(window=window, periods=self.periods, prompt_type=self.prompt_type, budget=budget, ts_type=self.ts_type, series_id=self.series_id, layout=self.layout)
+        self.ts_format = model.ts_format
+      model, self.context = fit_context(model, self.budget, self.reduction) if self.budget else (model, None)
+      prompt = model.generate()
+    except ValueError as e:
+      st.error(str(e), icon="🚨")
+      st.stop()
+    self.scale = model.scale
 
     st.write('---')
+    Prompt.estimates(original)
+
     st.write('### Prompt')
     st.code(prompt, language='python', line_numbers=True)
 
     st.write('### Gráfico Série Temporal - Prompt')
+    if self.context and self.context["reduction"] != Reduction.NONE:
+      st.info(f"Janela ajustada ao contexto ({self.context['reduction'].value}): {self.context['original_points']} → {self.context['points']} pontos, {self.context['tokens_saved']} tokens economizados.")
     Graph.sample(
       title="Série Temporal - Prompt",
-      values=[v for _, v in window]
+      values=model.window.values
     )
     return prompt, y_true
+
+  @staticmethod
+  @st.fragment
+  def estimates(model: PromptModel):
+    """
+    Tabela de tokens estimados por formato, calculada só quando pedida. O fragmento reexecuta
+    apenas a tabela ao clicar no botão, sem refazer a análise da página.
+    """
+    with st.expander('Tokens estimados'):
+      if not st.button('Estimar tokens de todos os formatos', help='Gera o prompt em cada combinação de formato e tipo de série para comparar os tokens, sem enviar nada ao modelo.'):
+        return
+      try:
+        estimates = estimate_tokens(estimate_key(model), model)
+      except ValueError as e:
+        st.warning(str(e), icon="⚠️")
+        return
+      st.dataframe(
+        pd.DataFrame(estimates).assign(ts_format=lambda df: df.ts_format.map(lambda f: f.name), ts_type=lambda df: df.ts_type.map(lambda t: t.name)),
+        column_config={
+          'ts_format': 'Formato', 'ts_type': 'Série',
+          'prompt_tokens': 'Tokens Prompt', 'response_tokens': 'Tokens Resposta', 'total_tokens': 'Total',
+        },
+        hide_index=True
+      )
@@ -1,11 +1,15 @@
 import streamlit as st
 from src.model.metrics import Metrics
+from src.model.ensemble import Aggregation
 from src.view.graph import Graph
 
 class Results:
   def __init__(
     self, y_true:list, y_pred:str, total_tokens_prompt:int,
-    total_tokens_response:int, response_time:float
+    total_tokens_response:int, response_time:float,
+    cached_tokens:int = None, time_to_first_token:float = None, time_to_horizon:float = None,
+    cache_hit:bool = False, cache_stats:dict = None, load_time:float = None,
+    samples:int = None, aggregation:Aggregation = None, y_band:list = None
   ):
     """
     Classe responsável por exibir os resultados.
@@ -16,23 +20,55 @@ class Results:
       total_tokens_prompt (int): Quantidade de tokens do prompt.
       total_tokens_response (int): Quantidade de tokens da resposta.
       response_time (float): response_time de execução.
+      cached_tokens (int): Tokens do prompt servidos pelo cache de prefixo do provedor (None se não informado).
+      time_to_first_token (float): Tempo até o primeiro token, em streaming (None sem streaming).
+      time_to_horizon (float): Tempo até a leitura dos valores previstos, em streaming (None se não atingido).
+      cache_hit (bool): Se a resposta veio do cache de respostas, sem chamar o provedor.
+      cache_stats (dict): Contadores do cache de respostas (ResponseCache.stats).
+      load_time (float): Tempo de carga do modelo no LM Studio, fora do tempo de execução (None sem carga).
+      samples (int): Amostras combinadas no ensemble (None com uma única resposta).
+      aggregation (Aggregation): Agregação das amostras do ensemble.
+      y_band (list): Quantis P10 e P90 das amostras em cada período, exibidos como faixa no gráfico.
     """
     self.y_true = y_true
     self.y_pred = y_pred
     self.total_tokens_prompt = total_tokens_prompt
     self.total_tokens_response = total_tokens_response
     self.response_time = response_time
+    self.cached_tokens = cached_tokens
+    self.time_to_first_token = time_to_first_token
+    self.time_to_horizon = time_to_horizon
+    self.cache_hit = cache_hit
+    self.cache_stats = cache_stats
+    self.load_time = load_time
+    self.samples = samples
+    self.aggregation = aggregation
+    self.y_band = y_band
 
   def show(self):
     metrics = Metrics(y_pred=self.y_pred, y_true=self.y_true)
 
     col1, col2, col3 = st.columns(3)
     with col1:
-      st.metric(label='Tokens Prompt', value=self.total_tokens_prompt)
+      st.metric(label='Tokens Prompt', value=self.total_tokens_prompt, help=f"{self.cached_tokens} tokens servidos pelo cache de prompt do provedor." if self.cached_tokens is not None else None)
     with col2:
       st.metric(label='Tokens Resposta', value=self.total_tokens_response)
     with col3:
-      st.metric(label='Tempo de Execução', value=f"{self.response_time:.2f} segundos")
+      st.metric(label='Tempo de Execução', value=f"{self.response_time:.2f} segundos", help=f"Sem os {self.load_time:.2f} segundos de carga do modelo." if self.load_time else None)
+
+    if self.time_to_first_token is not None:
+      horizon = f"{self.time_to_horizon:.2f} segundos" if self.time_to_horizon is not None else 'não atingido'
+      st.caption(f"Streaming · Primeiro token: {self.time_to_first_token:.2f} segundos · Horizonte: {horizon}")
+
+    if self.samples is not None:
+      st.caption(f"Ensemble · {self.samples} amostras combinadas por {self.aggregation.name} · Tokens somam todas as amostras; o tempo é o da chamada inteira (amostras em paralelo) · Faixa P10–P90 no gráfico")
+
+    if self.cache_stats is not None:
+      stats = self.cache_stats
+      requests = stats['hits'] + stats['misses']
+      rate = f"{100 * stats['hits'] / requests:.1f}%" if requests else '-'
+      origin = 'Resposta recuperada do cache' if self.cache_hit else 'Resposta gerada pelo provedor'
+      st.caption(f"{origin} · Cache de respostas: {stats['hits']} acertos, {stats['misses']} falhas ({rate}), {stats['entries']} respostas, {stats['bytes'] / 2**20:.1f} de {stats['max_bytes'] / 2**20:.0f} MB")
 
     col4, col5, col6 = st.columns(3)
     with col4:
@@ -57,6 +93,7 @@ class Results:
     Graph.forecast(
       title=f'Série Temporal - Previsão / SMAPE = {smape}',
       y_true=self.y_true,
-      y_pred=self.y_pred
+      y_pred=self.y_pred,
+      band=self.y_band
     )
     return smape, mae, rmse
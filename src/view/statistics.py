@@ -1,46 +1,64 @@
 import streamlit as st
 from pathlib import Path
-import pandas as pd
 import plotly.graph_objects as go
 
+from src.model.data import Data
+
 class Statistics:
   def __init__(self, dataset:str):
     self.dataset = dataset
     diretorio_do_script = Path(__file__).resolve().parent
     self.caminho =  diretorio_do_script.parent.parent / 'data' / self.dataset
-    self.df = pd.read_csv(self.caminho)
+    self.metadata = Data.metadata(self.caminho)
+    self.df = None
+
+  def load(self):
+    """Carrega o dataset apenas quando os dados completos são necessários."""
+    if self.df is None:
+      self.df = Data.read_csv(self.caminho)
+    return self.df
 
   def describe(self):
-    describe = self.df['value'].describe()
+    # Estatísticas vêm do índice de metadados, sem ler o dataset
+    if self.metadata is not None:
+      describe, total = self.metadata['stats'], self.metadata['rows']
+    else:
+      describe, total = self.load()['value'].describe(), len(self.load())
+
+    # Séries vazias ou só com NaN têm apenas a contagem
+    def metric(key: str) -> str:
+      value = describe.get(key)
+      return f"{value:.2f}" if value is not None and value == value else "N/A"
 
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
       st.metric(label="Base de Dados", value=self.dataset)
     with col2:
-      st.metric("Total de Dados", len(self.df))
+      st.metric("Total de Dados", total)
     with col3:
-      st.metric("Mínimo", f"{describe['min']:.2f}")
+      st.metric("Mínimo", metric('min'))
     with col4:
-      st.metric("Máximo", f"{describe['max']:.2f}")
+      st.metric("Máximo", metric('max'))
     with col5:
-      st.metric("Média", f"{describe['mean']:.2f}")
+      st.metric("Média", metric('mean'))
 
     col6, col7, col8, col9 = st.columns(4)
     with col6:
-      st.metric("1º Quartil (Q1)", f"{describe['25%']:.2f}")
+      st.metric("1º Quartil (Q1)", metric('25%'))
     with col7:
-      st.metric("Mediana", f"{describe['50%']:.2f}")
+      st.metric("Mediana", metric('50%'))
     with col8:
-      st.metric("3º Quartil (Q3)", f"{describe['75%']:.2f}")
+      st.metric("3º Quartil (Q3)", metric('75%'))
     with col9:
-      st.metric("Desvio Padrão", f"{describe['std']:.2f}")
+      st.metric("Desvio Padrão", metric('std'))
 
   def dataframe(self):
-    st.dataframe(self.df, use_container_width=True)
+    st.dataframe(self.load(), use_container_width=True)
 
   def show(self):
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=self.df["date"], y=self.df["value"], mode="lines", name="Série Temporal"))
+    df = self.load()
+    fig.add_trace(go.Scatter(x=df["date"], y=df["value"], mode="lines", name="Série Temporal"))
     fig.update_layout(
       title="Valores ao Longo do Tempo",
       xaxis_title="Tempo",
@@ -0,0 +1,85 @@
+"""
+Servidor HTTP local que faz o papel de um provedor compatível com a API da OpenAI nos testes e benchmarks.
+"""
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+def chat_completion(model: str, contents: list, prompt_tokens: int = 100, completion_tokens: int = 10) -> dict:
+  """Corpo de um chat.completion com uma escolha por conteúdo."""
+  return {
+    "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": model,
+    "choices": [
+      {"index": i, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+      for i, content in enumerate(contents)
+    ],
+    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens * len(contents), "total_tokens": prompt_tokens + completion_tokens * len(contents)},
+  }
+
+class StubHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+
+  def setup(self):
+    super().setup()
+    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+  def log_message(self, *args):
+    pass
+
+  def handle_request(self, method: str):
+    body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+    with self.server.stub.lock:
+      self.server.stub.requests.append((method, self.path))
+    status, headers, payload = self.server.stub.respond(method, self.path, self.headers, body)
+    if not isinstance(payload, bytes):
+      payload = json.dumps(payload).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", headers.pop("Content-Type", "application/json"))
+    self.send_header("Content-Length", str(len(payload)))
+    for name, value in headers.items():
+      self.send_header(name, value)
+    self.end_headers()
+    self.wfile.write(payload)
+
+  def do_GET(self):
+    self.handle_request("GET")
+
+  def do_POST(self):
+    self.handle_request("POST")
+
+class StubServer:
+  def __init__(self, respond):
+    """
+    Servidor em uma thread, em uma porta livre de 127.0.0.1, com conexões keep-alive.
+
+    Args:
+      respond (Callable): respond(method, path, headers, body) -> (status, headers, corpo em bytes ou JSON).
+    """
+    self.respond = respond
+    self.requests = []
+    self.lock = threading.Lock()
+    self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    self.server.daemon_threads = True
+    self.server.stub = self
+    self.thread = None
+
+  @property
+  def url(self) -> str:
+    return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+  def configure(self, environ, model: str) -> None:
+    """Aponta o modelo do provedor openai para o servidor (environ: os.environ ou o monkeypatch do pytest)."""
+    name = f"openai_{model}".replace("-", "_").replace(".", "_")
+    setter = environ.setenv if hasattr(environ, "setenv") else environ.__setitem__
+    setter(f"{name}_key", "stub")
+    setter(f"{name}_base_url", self.url)
+
+  def __enter__(self) -> 'StubServer':
+    self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    self.thread.start()
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.server.shutdown()
+    self.server.server_close()
@@ -0,0 +1,62 @@
+import time
+import json
+import asyncio
+import threading
+
+import api.api as api_module
+from api.api import AsyncAPI, Provider
+from tests.stub_server import StubServer, chat_completion
+
+DELAY = 0.05
+
+class Concurrent:
+  def __init__(self):
+    """Responde o prompt em maiúsculas; prompts de índice menor demoram mais e as chamadas simultâneas são contadas."""
+    self.active = 0
+    self.peak = 0
+    self.lock = threading.Lock()
+
+  def __call__(self, method, path, headers, body):
+    prompt = json.loads(body)["messages"][0]["content"]
+    with self.lock:
+      self.active += 1
+      self.peak = max(self.peak, self.active)
+    # Os primeiros prompts terminam por último: a ordem de saída não segue a de conclusão
+    time.sleep(DELAY * (1 + 3 / (1 + int(prompt[1:]))))
+    with self.lock:
+      self.active -= 1
+    return 200, {}, chat_completion("stub", [prompt.upper()])
+
+def batch(monkeypatch, model: str, prompts: list[str], concurrency: int = None) -> tuple[list[dict], Concurrent]:
+  respond = Concurrent()
+
+  async def run() -> list[dict]:
+    async with AsyncAPI(model, Provider.OPENAI, 0.0, use_cache=False) as api:
+      return await api.batch(prompts, concurrency=concurrency)
+
+  with StubServer(respond) as stub:
+    stub.configure(monkeypatch, model)
+    results = asyncio.run(run())
+  return results, respond
+
+def test_results_follow_the_input_order(monkeypatch):
+  prompts = [f"p{i}" for i in range(12)]
+  results, respond = batch(monkeypatch, "async-order", prompts, concurrency=12)
+  assert [result["response"] for result in results] == [prompt.upper() for prompt in prompts]
+  assert all(result["cache_hit"] is False and result["total_tokens_prompt"] == 100 for result in results)
+  assert respond.peak > 1
+
+def test_semaphore_caps_concurrency(monkeypatch):
+  prompts = [f"p{i}" for i in range(10)]
+  results, respond = batch(monkeypatch, "async-cap", prompts, concurrency=3)
+  assert respond.peak == 3
+  assert [result["response"] for result in results] == [prompt.upper() for prompt in prompts]
+  # Quem passou da terceira vaga esperou na fila
+  assert sum(result["queue_time"] >= DELAY for result in results) >= len(prompts) - 3
+  assert all(result["total_time"] >= result["queue_time"] for result in results)
+
+def test_default_concurrency_comes_from_the_provider(monkeypatch):
+  monkeypatch.setitem(api_module.CONCURRENCY, Provider.OPENAI, 2)
+  results, respond = batch(monkeypatch, "async-default", [f"p{i}" for i in range(6)])
+  assert respond.peak == 2
+  assert len(results) == 6
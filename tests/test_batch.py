@@ -0,0 +1,122 @@
+import re
+import json
+import sqlite3
+import numpy as np
+import pytest
+
+from api.api import Provider
+from api.batch import BatchJob
+from api.cache import RESPONSES
+from database.crud_history import CrudHistory
+from database.schema_tables import HISTORY_SCHEMA
+from src.model.format import TSFormat
+from src.model.prompt import PromptModel, PromptType
+from src.model.window import TimeSeriesWindow
+from tests.stub_server import StubServer, chat_completion
+
+PERIODS = 24
+
+class BatchProvider:
+  def __init__(self, errors: int = 0, refusals: int = 0):
+    """
+    Batch API local: recebe o arquivo, conclui o lote na segunda consulta e devolve os arquivos de
+    saída e de erros. No primeiro lote, as 'errors' primeiras linhas falham e as 'refusals'
+    seguintes voltam sem texto (recusa do modelo).
+    """
+    self.errors = errors
+    self.refusals = refusals
+    self.files = {}
+    self.batches = {}
+    self.polls = {}
+
+  def upload(self, content: str) -> str:
+    file_id = f"file-{len(self.files) + 1}"
+    self.files[file_id] = content
+    return file_id
+
+  def complete(self, batch: dict) -> None:
+    lines = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines()]
+    first = batch["id"] == "batch_1"
+    output, errors = [], []
+    for i, line in enumerate(lines):
+      if first and i < self.errors:
+        errors.append({"id": f"r{i}", "custom_id": line["custom_id"], "response": None, "error": {"code": "server_error", "message": "falha"}})
+        continue
+      values = "[" + ", ".join(str(float(k)) for k in range(PERIODS)) + "]"
+      body = chat_completion(line["body"]["model"], [None if first and i < self.errors + self.refusals else values])
+      output.append({"id": f"r{i}", "custom_id": line["custom_id"], "response": {"status_code": 200, "request_id": "q", "body": body}, "error": None})
+    batch.update(status="completed", completed_at=batch["created_at"] + 60, output_file_id=self.upload("\n".join(map(json.dumps, output)) + "\n"))
+    if errors:
+      batch["error_file_id"] = self.upload("\n".join(map(json.dumps, errors)) + "\n")
+    batch["request_counts"] = {"total": len(lines), "completed": len(output), "failed": len(errors)}
+
+  def __call__(self, method, path, headers, body):
+    if method == "POST" and path == "/v1/files":
+      boundary = headers["Content-Type"].split("boundary=")[1].encode()
+      part = [p for p in body.split(b"--" + boundary) if b'name="file"' in p][0]
+      content = part.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n", 1)[0].decode()
+      return 200, {}, {"id": self.upload(content), "object": "file", "bytes": len(content), "created_at": 0, "filename": "lote.jsonl", "purpose": "batch", "status": "processed"}
+    if method == "POST" and path == "/v1/batches":
+      request = json.loads(body)
+      batch_id = f"batch_{len(self.batches) + 1}"
+      self.batches[batch_id] = {
+        "id": batch_id, "object": "batch", "endpoint": request["endpoint"], "input_file_id": request["input_file_id"],
+        "completion_window": "24h", "status": "validating", "created_at": 1_700_000_000,
+      }
+      return 200, {}, self.batches[batch_id]
+    match = re.fullmatch(r"/v1/batches/(\w+)", path)
+    if match:
+      batch = self.batches[match[1]]
+      self.polls[batch["id"]] = self.polls.get(batch["id"], 0) + 1
+      if batch["status"] != "completed":
+        batch["status"] = "in_progress"
+        if self.polls[batch["id"]] >= 2:
+          self.complete(batch)
+      return 200, {}, batch
+    match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+    return 200, {"Content-Type": "application/octet-stream"}, self.files[match[1]].encode()
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+  """Banco e cache de respostas vazios em uma pasta temporária (os caminhos são relativos à raiz)."""
+  (tmp_path / "database").mkdir()
+  monkeypatch.chdir(tmp_path)
+  with sqlite3.connect("database/database.db") as connection:
+    connection.execute(HISTORY_SCHEMA.format(table_name="history"))
+  monkeypatch.setattr(RESPONSES, "db_path", str(tmp_path / "database" / "responses.db"))
+  monkeypatch.setattr(RESPONSES, "ready", False)
+  return tmp_path
+
+def job(model: str) -> BatchJob:
+  dates = np.arange(np.datetime64("2024-01-01T00"), np.datetime64("2024-01-11T00")).astype("datetime64[ns]")
+  values = np.round(np.sin(np.arange(len(dates)) / 5) * 10 + 20, 3)
+  batch = BatchJob(model, Provider.OPENAI, 0.0)
+  for origin in range(48, 48 + 8 * PERIODS, PERIODS):
+    window = TimeSeriesWindow(dates[origin - 48:origin], values[origin - 48:origin], ("sintético",), origin - 48)
+    batch.add(PromptModel(window, PERIODS, PromptType.ZERO_SHOT, TSFormat.ARRAY), values[origin:origin + PERIODS], dataset="sintetico.csv")
+  return batch
+
+def history() -> list:
+  with sqlite3.connect("database/database.db") as connection:
+    return connection.execute("SELECT request_key, y_pred, response_time FROM history").fetchall()
+
+def test_batch_imports_and_resubmits_failed_rows(database, monkeypatch):
+  provider = BatchProvider(errors=1, refusals=1)
+  with StubServer(provider) as stub:
+    stub.configure(monkeypatch, "batch-stub")
+    assert job("batch-stub").run(interval=0.01) == 6
+    assert len(history()) == 6
+
+    # As linhas com erro e a resposta sem texto voltam no próximo lote; as importadas não
+    assert job("batch-stub").run(interval=0.01) == 2
+    rows = history()
+    assert len(rows) == 8 and len({row[0] for row in rows}) == 8
+    assert all(json.loads(row[1]) == list(map(float, range(PERIODS))) and row[2] == 60 for row in rows)
+
+    assert job("batch-stub").submit() is None
+    assert BatchJob.resume("batch_1").collect() == 0
+  assert set(CrudHistory().keys([row[0] for row in rows])) == {row[0] for row in rows}
+  with sqlite3.connect("database/database.db") as connection:
+    assert connection.execute("SELECT id, status, requests, imported FROM batches ORDER BY id").fetchall() == [
+      ("batch_1", "completed", 8, 6), ("batch_2", "completed", 2, 2)
+    ]
@@ -0,0 +1,27 @@
+from api.api import Provider
+from api.cache import ResponseCache
+
+RESULT = ("[1.0, 2.0]", 10, 5, 0.5, None, None, None)
+
+def cache(tmp_path) -> ResponseCache:
+  return ResponseCache(str(tmp_path / "responses.db"), max_bytes=1024 * 1024)
+
+def test_key_ignores_provider_type():
+  assert ResponseCache.key("gpt", "openai", 0.0, "p") == ResponseCache.key("gpt", Provider.OPENAI, 0, "p")
+  assert ResponseCache.key("gpt", "openai", 0.0, "p") != ResponseCache.key("gpt", Provider.AZURE, 0.0, "p")
+
+def test_put_stores_provider_value(tmp_path):
+  responses = cache(tmp_path)
+  key = ResponseCache.key("gpt", Provider.OPENAI, 0.0, "p")
+  responses.put(key, "gpt", Provider.OPENAI, 0.0, "p", RESULT)
+  assert responses.get(ResponseCache.key("gpt", "openai", 0.0, "p")) == RESULT
+  with responses.connect() as connection:
+    assert connection.execute("SELECT provider FROM responses").fetchone() == ("openai",)
+
+def test_truncated_stream_is_not_cached(tmp_path):
+  responses = cache(tmp_path)
+  key = ResponseCache.key("gpt", Provider.OPENAI, 0.0, "p")
+  responses.put(key, "gpt", Provider.OPENAI, 0.0, "p", RESULT[:5] + (0.1, 0.3))
+  assert responses.get(key) is None
+  responses.put(key, "gpt", Provider.OPENAI, 0.0, "p", RESULT[:5] + (0.1, None))
+  assert responses.get(key) == RESULT[:5] + (0.1, None)
@@ -0,0 +1,15 @@
+from api.clients import ClientPool
+from tests.stub_server import StubServer, chat_completion
+
+def test_client_is_reused_and_recreated_on_config_change(monkeypatch):
+  respond = lambda method, path, headers, body: (200, {}, chat_completion("m", ["ok"]))
+  pool = ClientPool()
+  with StubServer(respond) as stub:
+    stub.configure(monkeypatch, "m")
+    client = pool.get("openai", "m")
+    for _ in range(3):
+      assert pool.get("openai", "m").chat.completions.create(model="m", messages=[]).choices[0].message.content == "ok"
+    assert pool.get("openai", "m") is client
+    monkeypatch.setenv("openai_m_key", "other")
+    assert pool.get("openai", "m") is not client
+  assert pool.stats() == {"created": 2, "reused": 4, "clients": 1}
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.context import Reduction, reduce_paa, reduce_lttb, reduce_window, fit_context
+from src.model.format import TSFormat, TSType
+from src.model.prompt import PromptModel, PromptType
+from src.model.tokens import ESTIMATOR
+from src.model.window import TimeSeriesWindow
+
+PERIODS = 12
+
+def window(points: int = 400) -> TimeSeriesWindow:
+  rng = np.random.default_rng(0)
+  values = np.round(50 + np.sin(np.arange(points) / 8) * 20 + rng.normal(0, 2, points), 3)
+  return TimeSeriesWindow(pd.date_range('2024-01-01', periods=points, freq='h').values, values, ('data.csv', None), 100)
+
+WINDOW = window()
+
+def tokens(data: TimeSeriesWindow, prompt_type: PromptType = PromptType.ZERO_SHOT) -> int:
+  model = PromptModel(data, PERIODS, prompt_type, TSFormat.ARRAY, TSType.NUMERIC)
+  return model.estimate(ESTIMATOR, formats=[TSFormat.ARRAY], types=[TSType.NUMERIC])[0]["total_tokens"]
+
+@pytest.mark.parametrize("reduction", [Reduction.TRIM, Reduction.PAA, Reduction.LTTB])
+@pytest.mark.parametrize("prompt_type", [PromptType.ZERO_SHOT, PromptType.FEW_SHOT])
+def test_fit_context_returns_the_largest_window_that_fits(reduction, prompt_type):
+  original = tokens(WINDOW, prompt_type)
+  budget = original * 2 // 3
+  model = PromptModel(WINDOW, PERIODS, prompt_type, TSFormat.ARRAY, TSType.NUMERIC)
+  fitted, record = fit_context(model, budget, reduction)
+
+  size = len(fitted.window)
+  recent = 4 * PERIODS
+  assert tokens(fitted.window, prompt_type) == record["tokens"] <= budget
+  assert tokens(reduce_window(WINDOW, size + 1, reduction, recent), prompt_type) > budget
+  assert record == {
+    "reduction": reduction, "points": size, "original_points": len(WINDOW),
+    "tokens": record["tokens"], "original_tokens": original, "tokens_saved": original - record["tokens"],
+  }
+  # Os pontos mais recentes continuam na resolução original
+  assert fitted.window.values[-recent:].tolist() == WINDOW.values[-recent:].tolist()
+
+def test_fit_context_keeps_a_window_that_already_fits():
+  model = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT, TSFormat.ARRAY, TSType.NUMERIC)
+  fitted, record = fit_context(model, tokens(WINDOW), Reduction.LTTB)
+  assert fitted is model and record["reduction"] == Reduction.NONE and record["tokens_saved"] == 0
+  assert fit_context(model, 10, Reduction.NONE)[0] is model
+
+def test_fit_context_raises_when_nothing_fits():
+  model = PromptModel(WINDOW, PERIODS, PromptType.FEW_SHOT, TSFormat.ARRAY, TSType.NUMERIC)
+  with pytest.raises(ValueError):
+    fit_context(model, 100, Reduction.TRIM)
+
+@pytest.mark.parametrize("size", [2, 3, 10, 57, 399])
+def test_lttb_keeps_the_endpoints_and_returns_size_points(size):
+  dates, values = WINDOW.dates.view('int64'), WINDOW.values
+  reduced_dates, reduced_values = reduce_lttb(dates, values, size)
+  assert len(reduced_dates) == len(reduced_values) == size
+  assert (reduced_dates[0], reduced_dates[-1]) == (dates[0], dates[-1])
+  assert (reduced_values[0], reduced_values[-1]) == (values[0], values[-1])
+  # Só pontos reais da série, em ordem
+  index = np.searchsorted(dates, reduced_dates)
+  assert np.all(np.diff(index) > 0)
+  assert np.array_equal(values[index], reduced_values)
+
+@pytest.mark.parametrize("points, size", [(400, 100), (400, 7), (401, 13), (10, 10)])
+def test_paa_preserves_the_mean(points, size):
+  data = window(points)
+  dates, means = reduce_paa(data.dates.view('int64'), data.values, size)
+  edges = np.linspace(0, points, size + 1).astype(np.int64)
+  assert len(means) == size
+  assert dates.tolist() == data.dates.view('int64')[edges[:-1]].tolist()
+  # Média ponderada pelo tamanho dos blocos igual à média da série (exata quando os blocos são iguais)
+  assert np.isclose(np.average(means, weights=np.diff(edges)), data.values.mean())
+  if points % size == 0:
+    assert np.isclose(means.mean(), data.values.mean())
+
+def test_trim_keeps_the_most_recent_points():
+  trimmed = reduce_window(WINDOW, 150, Reduction.TRIM, 48)
+  assert trimmed.values.tolist() == WINDOW.values[-150:].tolist()
+  assert np.shares_memory(trimmed.values, WINDOW.values)
+  assert (trimmed.offset, trimmed.source) == (WINDOW.offset + 250, WINDOW.source)
+
+@pytest.mark.parametrize("reduction", [Reduction.PAA, Reduction.LTTB])
+def test_reduction_summarizes_only_the_older_points(reduction):
+  reduced = reduce_window(WINDOW, 100, reduction, 48)
+  assert len(reduced) == 100
+  assert reduced.values[-48:].tolist() == WINDOW.values[-48:].tolist()
+  assert reduced.dates[-48:].tolist() == WINDOW.dates[-48:].tolist()
+  assert np.all(np.diff(reduced.dates.view('int64')) > 0)
+  assert reduce_window(WINDOW, 500, reduction, 48) is WINDOW
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.data import Data
+
+PERIODS = 5
+
+# (início, fim) como vêm do st.date_input, incluindo limites fora do dataset
+RANGES = [
+  ('2024-01-01', '2024-01-01'),
+  ('2024-01-01', '2024-01-03'),
+  ('2024-01-02', '2024-01-04'),
+  ('2023-12-25', '2024-01-02'),
+  ('2024-01-05', '2024-02-01'),
+  ('2024-03-01', '2024-03-02'),
+]
+
+@pytest.fixture(params=['h', 'D'])
+def dataset(request, tmp_path):
+  """Dataset horário ou diário gravado como no upload: datas diárias sem horário."""
+  freq = request.param
+  dates = pd.date_range('2024-01-01', periods=120 if freq == 'h' else 40, freq=freq)
+  text = dates.strftime('%Y-%m-%d' if freq == 'D' else '%Y-%m-%d %H:%M:%S')
+  path = tmp_path / f'{freq}.csv'
+  pd.DataFrame({'date': text, 'value': np.arange(len(dates)) * 1.5}).to_csv(path, index=False)
+  return path
+
+def baseline(path, start_date: str, end_date: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+  """Recorte anterior ao índice temporal: comparação das datas em texto do CSV."""
+  dataset = pd.read_csv(path, dtype={'date': str})
+  df = dataset.query("date >= @start_date and date <= @end_date")
+  df_true = dataset.query("date > @end_date")
+  return df, df_true[:PERIODS]
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_offsets_match_string_comparison(dataset, start_date, end_date):
+  df, df_true = Data(dataset=dataset, start_date=start_date, end_date=end_date, periods=PERIODS).period_selection()
+  expected, expected_true = baseline(dataset, start_date, end_date)
+
+  assert df.index.tolist() == expected.index.tolist()
+  assert df_true.index.tolist() == expected_true.index.tolist()
+  assert df['value'].tolist() == expected['value'].tolist()
+  assert df_true['value'].tolist() == expected_true['value'].tolist()
+
+def test_end_date_is_inclusive_only_for_daily_data(dataset):
+  data = Data(dataset=dataset, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS)
+  dates, _ = data.load()
+  start, end, stop = data.offsets(dates)
+  last = pd.Timestamp(int(dates[end - 1]))
+  if data.daily:
+    assert (end - start, last) == (2, pd.Timestamp('2024-01-02'))
+  else:
+    assert (end - start, last) == (24, pd.Timestamp('2024-01-01 23:00'))
+  assert stop - end == PERIODS
+
+@pytest.fixture
+def long_dataset(tmp_path):
+  """Dataset no formato longo com séries intercaladas e fora de ordem."""
+  frames = []
+  for i, series_id in enumerate(['b', '10', '2']):
+    dates = pd.date_range('2024-01-01', periods=30 + 10 * i, freq='h')
+    frames.append(pd.DataFrame({'series_id': series_id, 'date': dates.strftime('%Y-%m-%d %H:%M:%S'), 'value': 100 * i + np.arange(len(dates))}))
+  df = pd.concat(frames).sample(frac=1, random_state=0)
+  path = tmp_path / 'long.csv'
+  df.to_csv(path, index=False)
+  return path, df
+
+def test_long_format_series_are_sliced_by_offset(long_dataset):
+  path, df = long_dataset
+  assert Data.list_series(path) == ['10', '2', 'b']
+  for series_id, group in df.groupby('series_id'):
+    group = group.sort_values('date')
+    dates, values = Data(dataset=path, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS, series_id=series_id).load()
+    assert values.tolist() == group['value'].astype(float).tolist()
+    assert pd.to_datetime(dates).strftime('%Y-%m-%d %H:%M:%S').tolist() == group['date'].tolist()
+
+    metadata = Data.metadata(path, series_id)
+    assert (metadata['rows'], metadata['start'], metadata['end']) == (len(group), group['date'].iloc[0], group['date'].iloc[-1])
+
+def test_long_format_period_selection_matches_the_series_query(long_dataset):
+  path, df = long_dataset
+  series = df[df['series_id'] == '2'].sort_values('date')
+  expected = series.query("date >= '2024-01-01' and date <= '2024-01-02'")
+  expected_true = series.query("date > '2024-01-02'")[:PERIODS]
+
+  window, y_true = Data(dataset=path, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS, series_id='2').prompt()
+  assert window.values.tolist() == expected['value'].astype(float).tolist()
+  assert y_true == expected_true['value'].astype(float).tolist()
+  assert window.source == (str(path), '2')
+
+def test_long_format_requires_a_series(long_dataset):
+  path, _ = long_dataset
+  assert Data(dataset=path, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS).prompt() == (None, None)
+  assert Data(dataset=path, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS, series_id='x').prompt() == (None, None)
+
+@pytest.fixture
+def hourly(tmp_path):
+  """120 valores horários a partir de 2024-01-01 iguais às suas posições."""
+  dates = pd.date_range('2024-01-01', periods=120, freq='h').strftime('%Y-%m-%d %H:%M:%S')
+  path = tmp_path / 'hourly.csv'
+  pd.DataFrame({'date': dates, 'value': np.arange(120.0)}).to_csv(path, index=False)
+  return path
+
+def origins(path, start_date: str, end_date: str, **kwargs) -> list[tuple[list, list]]:
+  data = Data(dataset=path, start_date=start_date, end_date=end_date, periods=PERIODS)
+  return [(window.values.tolist(), y_true.tolist()) for window, y_true in data.rolling_origin(**kwargs)]
+
+def test_rolling_origin_boundaries(hourly):
+  # O recorte cobre as posições 24..71: a primeira origem tem 'window' valores antes dela e a última prevê logo após o recorte
+  pairs = origins(hourly, '2024-01-02', '2024-01-04', window=10, horizon=3, stride=19)
+  first = [34, 53, 72]
+  assert [int(y_true[0]) for _, y_true in pairs] == first
+  for (window, y_true), origin in zip(pairs, first):
+    assert window == list(np.arange(origin - 10, origin, dtype=float))
+    assert y_true == list(np.arange(origin, origin + 3, dtype=float))
+
+def test_rolling_origin_stops_before_the_horizon_leaves_the_data(hourly):
+  pairs = origins(hourly, '2024-01-04', '2024-02-01', window=12, horizon=PERIODS)
+  assert int(pairs[0][1][0]) == 72 + 12
+  assert int(pairs[-1][1][0]) == 120 - PERIODS
+  assert all(len(y_true) == PERIODS for _, y_true in pairs)
+
+def test_expanding_origin_starts_at_start_date(hourly):
+  pairs = origins(hourly, '2024-01-02', '2024-01-03', window=6, horizon=2, stride=5, expanding=True)
+  assert [(window[0], len(window)) for window, _ in pairs] == [(24.0, 6), (24.0, 11), (24.0, 16), (24.0, 21)]
+  assert pairs[-1][1] == [45.0, 46.0]
+
+def test_rolling_origin_windows_are_views(hourly):
+  data = Data(dataset=hourly, start_date='2024-01-01', end_date='2024-01-02', periods=PERIODS)
+  window, y_true = next(data.rolling_origin(window=8))
+  dates, values = data.load()
+  assert np.shares_memory(window.values, values) and np.shares_memory(y_true, values)
+  assert window.offset == 0
+
+@pytest.mark.parametrize("kwargs", [dict(window=0), dict(window=4, horizon=0), dict(window=4, stride=-1)])
+def test_rolling_origin_rejects_non_positive_sizes(hourly, kwargs):
+  with pytest.raises(ValueError):
+    origins(hourly, '2024-01-01', '2024-01-02', **kwargs)
@@ -0,0 +1,80 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.model.cache as cache_module
+from src.model.cache import DatasetCache
+
+def write_csv(path, values):
+  dates = pd.date_range('2024-01-01', periods=len(values), freq='h').strftime('%Y-%m-%d %H:%M:%S')
+  pd.DataFrame({'date': dates, 'value': values}).to_csv(path, index=False)
+
+@pytest.fixture
+def builds(monkeypatch):
+  """Conta as reconstruções do cache colunar."""
+  calls = []
+  build = DatasetCache.build
+
+  def counted(self):
+    calls.append(self.path)
+    return build(self)
+
+  monkeypatch.setattr(DatasetCache, "build", counted)
+  return calls
+
+@pytest.fixture
+def path(tmp_path):
+  path = tmp_path / 'data.csv'
+  write_csv(path, [1.5, 2.5, 3.5, 4.5])
+  return path
+
+def load(path) -> list[float]:
+  return DatasetCache(path).load()[1].tolist()
+
+def test_valid_cache_is_reused(path, builds):
+  assert load(path) == [1.5, 2.5, 3.5, 4.5]
+  assert load(path) == [1.5, 2.5, 3.5, 4.5]
+  assert len(builds) == 1
+
+def test_touched_file_with_same_content_is_not_rebuilt(path, builds):
+  load(path)
+  stat = os.stat(path)
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+  assert load(path) == [1.5, 2.5, 3.5, 4.5]
+  assert len(builds) == 1
+  # O novo mtime é gravado: a próxima leitura não recalcula o hash
+  assert DatasetCache(path).read_meta()["mtime"] == stat.st_mtime_ns + 10**9
+
+def test_changed_content_with_same_size_is_rebuilt(path, builds):
+  load(path)
+  stat = os.stat(path)
+  write_csv(path, [9.5, 8.5, 7.5, 6.5])
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+  assert os.stat(path).st_size == stat.st_size
+  assert load(path) == [9.5, 8.5, 7.5, 6.5]
+  assert len(builds) == 2
+
+def test_changed_size_is_rebuilt(path, builds):
+  load(path)
+  stat = os.stat(path)
+  write_csv(path, [1.5, 2.5, 3.5, 4.5, 5.5])
+  # Mesmo mtime: o tamanho sozinho invalida o cache
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+  assert load(path) == [1.5, 2.5, 3.5, 4.5, 5.5]
+  assert len(builds) == 2
+
+def test_new_cache_version_is_rebuilt(path, builds, monkeypatch):
+  load(path)
+  monkeypatch.setattr(cache_module, "CACHE_VERSION", cache_module.CACHE_VERSION + 1)
+  assert load(path) == [1.5, 2.5, 3.5, 4.5]
+  assert len(builds) == 2
+  assert DatasetCache(path).read_meta()["version"] == cache_module.CACHE_VERSION
+
+def test_unsorted_csv_is_cached_in_date_order(tmp_path):
+  path = tmp_path / 'data.csv'
+  pd.DataFrame({'date': ['2024-01-03', '2024-01-01', '2024-01-02'], 'value': [3.0, 1.0, 2.0]}).to_csv(path, index=False)
+  dates, values = DatasetCache(path).load()
+  assert values.tolist() == [1.0, 2.0, 3.0]
+  assert np.all(np.diff(dates) > 0)
+  assert DatasetCache(path).metadata()["daily"]
@@ -0,0 +1,39 @@
+import json
+import asyncio
+import numpy as np
+
+from api.api import API, Provider
+from src.model.ensemble import Aggregation, aggregate, quantiles
+from tests.stub_server import StubServer, chat_completion
+
+def respond(method, path, headers, body):
+  """Servidor compatível com a OpenAI; o modelo 'ignora-n' responde uma escolha só, como o Ollama."""
+  request = json.loads(body)
+  n = 1 if request["model"] == "ignora-n" else request.get("n", 1)
+  return 200, {}, chat_completion(request["model"], [f"[{10.0 + i}, {20.0 + i}]" for i in range(n)])
+
+def test_aggregate_ignores_missing_values():
+  samples = [[1.0, np.nan], [2.0, 4.0], [9.0], [3.0, 5.0, 7.0]]
+  np.testing.assert_array_equal(aggregate(samples, 2, Aggregation.MEDIAN), [2.5, 4.5])
+  np.testing.assert_array_equal(aggregate(samples, 2, Aggregation.MEAN), [3.75, 4.5])
+  np.testing.assert_array_equal(aggregate([[1.0], [2.0], [3.0], [4.0], [100.0]], 1, Aggregation.TRIMMED_MEAN), [3.0])
+  assert np.isnan(aggregate([[np.nan]], 1)[0])
+  assert quantiles(samples, 2).shape == (2, 2)
+
+def test_sample_uses_n_or_parallel_calls(monkeypatch):
+  with StubServer(respond) as stub:
+    for model in ("usa-n", "ignora-n"):
+      stub.configure(monkeypatch, model)
+      before = len(stub.requests)
+      responses, tokens_prompt, *_ = API(model, Provider.OPENAI, "p", 0.7, use_cache=False).sample(4)
+      assert len(responses) == 4
+      assert len(stub.requests) - before == (1 if model == "usa-n" else 4)
+
+def test_sample_inside_a_running_event_loop(monkeypatch):
+  async def main() -> list[str]:
+    return API("ignora-n", Provider.OPENAI, "p", 0.7, use_cache=False).sample(3)[0]
+
+  with StubServer(respond) as stub:
+    stub.configure(monkeypatch, "ignora-n")
+    responses = asyncio.run(main())
+  assert responses == ["[10.0, 20.0]"] * 3
@@ -0,0 +1,210 @@
+import json
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from io import StringIO
+
+from src.model.format import (
+  HorizonParser, ParseStrategy, Scale, TSFormat, TSType, extract_array, extract_declared, extract_fenced,
+  extract_timeseries, format_timeseries, parse_timeseries
+)
+from src.model.window import TimeSeriesWindow
+
+# ---------------------- FORMATADORES DE REFERÊNCIA ----------------------
+# Versões originais, com f-string por linha, usadas como referência byte a byte
+def reference_array(data) -> str:
+  if data and isinstance(data[0], (tuple, list)):
+    data = [v for _, v in data]
+  return "[" + ", ".join(map(str, data)) + "]"
+
+def reference_custom(data): return "Date|Value\n" + "\n".join(f"{d}|{v}" for d, v in data)
+def reference_tsv(data): return "Date\tValue\n" + "\n".join(f"{d}\t{v}" for d, v in data)
+def reference_plain(data): return "\n".join(f"Date: {d}, Value: {v}" for d, v in data)
+def reference_json(data): return json.dumps([{"Date": d, "Value": v} for d, v in data])
+def reference_markdown(data): return "|Date|Value|\n|---|---|\n" + "\n".join(f"|{d}|{v}|" for d, v in data)
+def reference_context(data): return "Date,Value\n" + "\n".join(f"{d},[{v}]" for d, v in data)
+def reference_csv(data): return "Date,Value\n" + "\n".join(f"{d},{v}" for d, v in data)
+
+def reference_symbol(data):
+  def direction(i):
+    if i == 0: return "→"
+    return "↑" if data[i][1] > data[i-1][1] else "↓" if data[i][1] < data[i-1][1] else "→"
+  return "Date,Value,DirectionIndicator\n" + "\n".join(f"{d},{v},{direction(i)}" for i, (d, v) in enumerate(data))
+
+REFERENCES = {
+  TSFormat.ARRAY: reference_array,
+  TSFormat.CUSTOM: reference_custom,
+  TSFormat.TSV: reference_tsv,
+  TSFormat.PLAIN: reference_plain,
+  TSFormat.JSON: reference_json,
+  TSFormat.MARKDOWN: reference_markdown,
+  TSFormat.CONTEXT: reference_context,
+  TSFormat.SYMBOL: reference_symbol,
+  TSFormat.CSV: reference_csv
+}
+
+# Analisadores originais, sobre pd.read_csv, usados como referência dos valores lidos
+def read_values(data: str, **kwargs) -> list:
+  return pd.read_csv(StringIO(data), **kwargs)["Value"].tolist()
+
+def reference_parse_markdown(data: str) -> list:
+  data = data.strip().splitlines()
+  data = [line.strip().strip("|") for line in [data[0]] + data[2:]]
+  df = pd.read_csv(StringIO("\n".join(data)), sep="|", engine="python", skipinitialspace=True)
+  df.columns = [c.strip() for c in df.columns]
+  return df["Value"].tolist()
+
+PARSE_REFERENCES = {
+  TSFormat.ARRAY: lambda data: data.strip("[]").split(", "),
+  TSFormat.CUSTOM: lambda data: read_values(data, sep="|"),
+  TSFormat.TSV: lambda data: read_values(data, sep="\t"),
+  TSFormat.PLAIN: lambda data: [m[2] for m in (re.match(r'Date:\s*([^,]+),\s*Value:\s*(.*)', l.strip()) for l in data.strip().splitlines()) if m],
+  TSFormat.JSON: lambda data: [v["Value"] for v in json.loads(data)],
+  TSFormat.MARKDOWN: reference_parse_markdown,
+  TSFormat.CONTEXT: lambda data: pd.read_csv(StringIO(data))["Value"].astype(str).str.strip("[]").tolist(),
+  TSFormat.SYMBOL: read_values,
+  TSFormat.CSV: read_values
+}
+
+def reference_textual(data: list) -> list:
+  return [(d, ' '.join(str(v))) for d, v in data]
+
+# ---------------------- DADOS ----------------------
+def window(freq: str = 'D', periods: int = 48) -> TimeSeriesWindow:
+  dates = pd.date_range('2024-01-01', periods=periods, freq=freq).values
+  values = np.round(10 + np.sin(np.arange(periods) / 3) * 5, 3)
+  if periods > 20:
+    values[[5, 6, 7]] = values[4] # Valores repetidos para o indicador "→"
+    values[20] = np.nan
+  return TimeSeriesWindow(dates, values)
+
+WINDOWS = {
+  'diária': window('D'),
+  'horária': window('h'),
+  'vazia': window('D', 0),
+}
+
+@pytest.mark.parametrize('ts_format', list(TSFormat))
+@pytest.mark.parametrize('name', list(WINDOWS))
+def test_numeric_matches_reference(ts_format, name):
+  data = WINDOWS[name]
+  tuples = list(data)
+  expected = REFERENCES[ts_format](tuples)
+  assert format_timeseries(data, ts_format) == expected
+  assert format_timeseries(tuples, ts_format) == expected
+
+@pytest.mark.parametrize('ts_format', list(TSFormat))
+def test_textual_matches_reference(ts_format):
+  tuples = list(WINDOWS['diária'])
+  expected = REFERENCES[ts_format](reference_textual(tuples))
+  assert format_timeseries(WINDOWS['diária'], ts_format, TSType.TEXTUAL) == expected
+  assert format_timeseries(tuples, ts_format, TSType.TEXTUAL) == expected
+
+@pytest.mark.parametrize('ts_format', list(TSFormat))
+def test_integers_and_strings_match_reference(ts_format):
+  data = [('2024-01-01', 1), ('2024-01-02', 3), ('2024-01-03', 3), ('2024-01-04', -2), ('2024-01-05', 'x"y')]
+  if ts_format == TSFormat.SYMBOL:
+    data = data[:-1] # A referência não compara texto com números
+  assert format_timeseries(data, ts_format) == REFERENCES[ts_format](data)
+
+def test_array_of_values():
+  assert format_timeseries([1.5, 2.0, float('nan')], TSFormat.ARRAY) == "[1.5, 2.0, nan]"
+
+# ---------------------- ANALISADORES ----------------------
+@pytest.mark.parametrize('ts_format', list(TSFormat))
+def test_parse_matches_reference(ts_format):
+  text = format_timeseries(WINDOWS['diária'], ts_format)
+  expected = np.array(PARSE_REFERENCES[ts_format](text), dtype=np.float64)
+  np.testing.assert_array_equal(parse_timeseries(text, ts_format), expected)
+
+BLANK_CELLS = {
+  TSFormat.CSV: "Date,Value\n2020-01-01,\n2020-01-02,3.0",
+  TSFormat.TSV: "Date\tValue\n2020-01-01\t  \n2020-01-02\t3.0",
+  TSFormat.MARKDOWN: "|Date|Value|\n|---|---|\n|2020-01-01| |\n|2020-01-02|3.0|",
+}
+
+@pytest.mark.parametrize('ts_format', list(BLANK_CELLS))
+def test_blank_cell_is_nan(ts_format):
+  values, strategy = extract_timeseries(BLANK_CELLS[ts_format], ts_format, periods=2)
+  assert strategy == ParseStrategy.DECLARED
+  np.testing.assert_array_equal(values, [np.nan, 3.0])
+
+# ---------------------- EXTRAÇÃO ----------------------
+PROSE = {
+  'linhas': "Based on the trend over the last 7 days, the forecast is:\n10.1\n10.2",
+  'lista após o texto': "Looking at 24 hours of data, I expect 10.1, 10.2 next.",
+  'PLAIN com introdução': "Over 3 days:\nDate: 2020-01-01, Value: 10.1\nDate: 2020-01-02, Value: 10.2",
+  'sequência curta depois': "Forecast:\n10.1\n10.2\nThese are 2 values.",
+}
+
+@pytest.mark.parametrize('name', list(PROSE))
+def test_numeric_ignores_prose(name):
+  values, strategy = extract_timeseries(PROSE[name], TSFormat.CSV, periods=2)
+  assert strategy == ParseStrategy.NUMERIC
+  np.testing.assert_array_equal(values, [10.1, 10.2])
+
+def test_numeric_without_periods_keeps_all_numbers():
+  values, strategy = extract_timeseries("7 days: 10.1 10.2", TSFormat.CSV)
+  np.testing.assert_array_equal(values, [7, 10.1, 10.2])
+
+# ---------------------- HORIZONTE ----------------------
+class ReferenceHorizon:
+  """Leitura original do horizonte: relê o texto inteiro a cada caractere de fechamento."""
+  START = re.compile(r'^(?=\|?Date\b|\[\s*\{)', re.MULTILINE)
+
+  def __init__(self, ts_format, ts_type, periods, scale):
+    self.args = (ts_format, ts_type, scale)
+    self.periods = periods
+
+  def reached(self, text: str) -> bool:
+    ts_format = self.args[0]
+    candidates = extract_fenced(text, *self.args) + extract_array(text, *self.args)
+    if ts_format == TSFormat.PLAIN:
+      candidates += extract_declared(text, *self.args)
+    elif ts_format != TSFormat.ARRAY:
+      starts = [match.start() for match in ReferenceHorizon.START.finditer(text)]
+      candidates += extract_declared(text[starts[-1]:] if starts else text, *self.args)
+    return any(len(values) >= self.periods for values in candidates)
+
+  def cut(self, text: str) -> str:
+    for i, char in enumerate(text):
+      if char in HorizonParser.BOUNDARIES and self.reached(text[:i + 1]):
+        return text[:i + 1]
+    return None
+
+def responses(ts_format: TSFormat, ts_type: TSType) -> list[str]:
+  data = WINDOWS['horária'][:6]
+  scale = Scale.fit(data)
+  body = format_timeseries(data, ts_format, ts_type, scale)
+  return [
+    body + "\nThat is all.",
+    "Sure, here is the forecast for the next 6 hours:\n" + body + "\n\nLet me know if you need more.",
+    "```\n" + body + "\n```\nThe model expects a rise.",
+    "Reasoning about 3 [periods] first.\n" + body[:len(body) // 2] + "\n" + body,
+    "[1.0, 2.0]\n" + format_timeseries(data, TSFormat.ARRAY, ts_type, scale) + " trailing",
+    body[:len(body) // 2],
+  ]
+
+@pytest.mark.parametrize('ts_type', [TSType.NUMERIC, TSType.TEXTUAL, TSType.SYMBOLIC])
+@pytest.mark.parametrize('ts_format', list(TSFormat))
+def test_horizon_matches_reference(ts_format, ts_type):
+  scale = Scale.fit(WINDOWS['horária'][:6])
+  rng = np.random.default_rng(0)
+  for text in responses(ts_format, ts_type):
+    expected = ReferenceHorizon(ts_format, ts_type, 6, scale).cut(text)
+    for _ in range(5):
+      parser = HorizonParser(ts_format, ts_type, 6, scale)
+      cuts = np.sort(rng.choice(np.arange(1, len(text)), size=min(len(text) - 1, 8), replace=False))
+      for chunk in np.split(np.array(list(text)), cuts):
+        if parser.feed("".join(chunk)):
+          break
+      assert parser.complete == (expected is not None)
+      assert parser.text == (expected if expected is not None else text)
+
+def test_horizon_reset():
+  parser = HorizonParser(TSFormat.CSV, TSType.NUMERIC, 2)
+  assert parser.feed("Date,Value\n2020-01-01,1.0\n2020-01-02,2.0\n")
+  parser.reset()
+  assert not parser.feed("Date,Value\n2020-01-01,1.0\n")
+  assert parser.feed("2020-01-02,2.0\n") and parser.text == "Date,Value\n2020-01-01,1.0\n2020-01-02,2.0\n"
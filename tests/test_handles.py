@@ -0,0 +1,91 @@
+import time
+import threading
+import lmstudio as lms
+import pytest
+
+from api.clients import CLIENTS
+from api.handles import ModelHandles
+
+LOAD_TIME = 0.3
+
+class Server:
+  def __init__(self):
+    """Servidor do LM Studio simulado: carregar um modelo leva LOAD_TIME segundos e cada consulta à lista é contada."""
+    self.loaded = set()
+    self.listings = 0
+    self.ping_time = 0.0
+
+  def llm(self, model: str, ttl: int = None):
+    if model not in self.loaded:
+      time.sleep(LOAD_TIME)
+      self.loaded.add(model)
+    return Handle(self, model)
+
+  def list_loaded_models(self, kind: str = None) -> list:
+    self.listings += 1
+    return [Handle(self, model) for model in self.loaded]
+
+class Handle:
+  def __init__(self, server: Server, identifier: str):
+    self.server = server
+    self.identifier = identifier
+
+  def respond(self, prompt: str, config: dict = None):
+    time.sleep(self.server.ping_time)
+    if self.identifier not in self.server.loaded:
+      raise RuntimeError("Model not loaded")
+
+@pytest.fixture
+def server(monkeypatch):
+  server = Server()
+  monkeypatch.setattr(lms, "llm", server.llm)
+  monkeypatch.setattr(lms, "list_loaded_models", server.list_loaded_models)
+  yield server
+  for model in ("a", "b"):
+    CLIENTS.discard("lmstudio", model)
+
+def test_loaded_models_are_listed_only_on_a_miss(server):
+  handles = ModelHandles(keep_warm=0, ttl=3600)
+  assert handles.get("a")[1] >= LOAD_TIME
+  listings = server.listings
+  for _ in range(5):
+    assert handles.get("a")[1] == 0.0
+  assert server.listings == listings
+  assert handles.stats()["a"]["loads"] == 1
+
+def test_error_invalidates_the_cache(server):
+  handles = ModelHandles(keep_warm=0, ttl=3600)
+  handle, _ = handles.get("a")
+  server.loaded.discard("a") # Descarregado pelo usuário: o cache ainda o considera carregado
+  with pytest.raises(RuntimeError):
+    handles.ping("a")
+  assert handles.get("a")[1] >= LOAD_TIME
+  assert handles.stats()["a"]["loads"] == 2
+
+def test_idle_beyond_ttl_checks_the_server(server):
+  handles = ModelHandles(keep_warm=0, ttl=0.1)
+  handles.get("a")
+  server.loaded.discard("a")
+  time.sleep(0.15)
+  assert handles.get("a")[1] >= LOAD_TIME
+
+def test_load_and_ping_do_not_block_other_models(server):
+  handles = ModelHandles(keep_warm=0, ttl=3600)
+  handles.get("b")
+  loading = threading.Thread(target=handles.get, args=("a",))
+  loading.start()
+  time.sleep(0.05)
+  start = time.perf_counter()
+  handles.get("b")
+  assert time.perf_counter() - start < LOAD_TIME / 2
+  loading.join()
+
+  server.ping_time = LOAD_TIME
+  pinging = threading.Thread(target=handles.ping, args=("a",))
+  pinging.start()
+  time.sleep(0.05)
+  start = time.perf_counter()
+  handles.get("b")
+  assert time.perf_counter() - start < LOAD_TIME / 2
+  pinging.join()
+  assert handles.stats()["a"]["pings"] == 1
@@ -0,0 +1,100 @@
+import time
+import json
+import asyncio
+import threading
+from collections import Counter
+
+from api.api import API, AsyncAPI, Provider
+from api.limits import LIMITS, RateLimiter
+from tests.stub_server import StubServer, chat_completion
+
+RETRY_AFTER = 0.2
+
+class RateLimited:
+  def __init__(self, failures: int):
+    """Responde 429 com Retry-After às 'failures' primeiras chamadas de cada prompt e depois o prompt em maiúsculas."""
+    self.failures = failures
+    self.calls = Counter()
+    self.lock = threading.Lock()
+
+  def __call__(self, method, path, headers, body):
+    prompt = json.loads(body)["messages"][0]["content"]
+    with self.lock:
+      self.calls[prompt] += 1
+      calls = self.calls[prompt]
+    if calls <= self.failures:
+      error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+      return 429, {"Retry-After": str(RETRY_AFTER)}, error
+    return 200, {}, chat_completion("stub", [prompt.upper()])
+
+def limiter(monkeypatch, stub: StubServer, model: str, retries: int = 3) -> RateLimiter:
+  stub.configure(monkeypatch, model)
+  monkeypatch.setenv("RATE_LIMIT_RETRIES", str(retries))
+  limiter = LIMITS.get(Provider.OPENAI, model)
+  limiter.base_delay = 0.01
+  return limiter
+
+def test_retries_until_success_honoring_retry_after(monkeypatch):
+  respond = RateLimited(failures=2)
+  with StubServer(respond) as stub:
+    limits = limiter(monkeypatch, stub, "limits-sync")
+    start = time.perf_counter()
+    result = API("limits-sync", Provider.OPENAI, "hello", 0.0, use_cache=False).response()
+    elapsed = time.perf_counter() - start
+  assert result[0] == "HELLO"
+  assert respond.calls["hello"] == 3
+  assert elapsed >= 2 * RETRY_AFTER
+  assert limits.stats()["retries"] == 2
+
+def test_gives_up_after_max_retries(monkeypatch):
+  respond = RateLimited(failures=99)
+  with StubServer(respond) as stub:
+    limiter(monkeypatch, stub, "limits-fail", retries=2)
+    result = API("limits-fail", Provider.OPENAI, "always", 0.0, use_cache=False).response()
+  assert result == (None,) * 7
+  assert respond.calls["always"] == 3
+
+def test_async_batch_retries(monkeypatch):
+  respond = RateLimited(failures=1)
+  prompts = [f"p{i}" for i in range(8)]
+
+  async def run() -> list[dict]:
+    async with AsyncAPI("limits-async", Provider.OPENAI, 0.0, use_cache=False) as api:
+      return await api.batch(prompts, concurrency=4)
+
+  with StubServer(respond) as stub:
+    limiter(monkeypatch, stub, "limits-async")
+    results = asyncio.run(run())
+  assert [result["response"] for result in results] == [prompt.upper() for prompt in prompts]
+  assert all(respond.calls[prompt] == 2 for prompt in prompts)
+
+def test_cancelled_wait_releases_queue():
+  limits = RateLimiter(rpm=1)
+  limits.acquire(0) # Esgota o balde: a próxima chamada esperaria um minuto
+
+  async def cancel() -> None:
+    task = asyncio.create_task(limits.acquire_async(0))
+    await asyncio.sleep(0.05)
+    assert limits.stats()["queue_depth"] == 1
+    task.cancel()
+    try:
+      await task
+    except asyncio.CancelledError:
+      pass
+
+  asyncio.run(cancel())
+  assert limits.stats()["queue_depth"] == 0
+
+def test_interrupted_wait_releases_queue(monkeypatch):
+  limits = RateLimiter(rpm=1)
+  limits.acquire(0)
+
+  def interrupt(seconds):
+    raise KeyboardInterrupt
+
+  monkeypatch.setattr(time, "sleep", interrupt)
+  try:
+    limits.acquire(0)
+  except KeyboardInterrupt:
+    pass
+  assert limits.stats()["queue_depth"] == 0
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.preprocessing import (
+  PreprocessConfig, Duplicates, Imputation,
+  deduplicate, regularize, ffill, bfill, rolling_mean, interpolate, impute, preprocess_file, preprocess_many
+)
+from tests.test_ingest import configure_dataset, source
+
+# Ausentes no início, no fim, isolados e em sequência
+VALUES = np.array([np.nan, np.nan, 1.5, np.nan, 4.0, 2.0, np.nan, np.nan, np.nan, 7.25, 3.0, np.nan])
+
+def assert_same(actual: np.ndarray, expected) -> None:
+  np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-12, equal_nan=True)
+
+def test_ffill_and_bfill_match_pandas():
+  series = pd.Series(VALUES)
+  assert_same(ffill(VALUES), series.ffill())
+  assert_same(bfill(VALUES), series.bfill())
+  # Valor carregado do bloco vizinho preenche a borda
+  assert_same(ffill(VALUES, 9.0), series.fillna({0: 9.0, 1: 9.0}).ffill())
+  assert_same(bfill(VALUES, 9.0), pd.Series(np.r_[VALUES, 9.0]).bfill()[:-1])
+  assert_same(ffill(np.full(3, np.nan)), [np.nan] * 3)
+
+def test_interpolate_matches_pandas():
+  assert_same(interpolate(VALUES), pd.Series(VALUES).interpolate(method='linear').ffill().bfill())
+  assert_same(interpolate(np.full(3, np.nan)), [np.nan] * 3)
+
+@pytest.mark.parametrize("window", [1, 2, 3, 5])
+def test_rolling_mean_matches_pandas(window):
+  expected = pd.Series(VALUES).rolling(window=window, min_periods=1).mean()
+  assert_same(rolling_mean(VALUES, window), expected)
+  # Em blocos, a cauda do bloco anterior completa a janela
+  tail = VALUES[:6][-(window - 1):] if window > 1 else np.empty(0)
+  assert_same(rolling_mean(VALUES[6:], window, tail), expected[6:])
+
+@pytest.mark.parametrize("policy", list(Duplicates), ids=lambda d: d.name)
+def test_deduplicate_matches_pandas(policy):
+  dates = np.array([1, 1, 2, 3, 3, 3, 4, 5, 5], dtype=np.int64)
+  values = np.array([np.nan, 2.0, 3.0, np.nan, np.nan, np.nan, 1.0, 4.0, np.nan])
+  df = pd.DataFrame({"date": dates, "value": values})
+  expected = {
+    Duplicates.FIRST: lambda: df.drop_duplicates(subset="date", keep="first"),
+    Duplicates.LAST: lambda: df.drop_duplicates(subset="date", keep="last"),
+    Duplicates.SUM: lambda: df.groupby("date", as_index=False)['value'].sum(min_count=1),
+  }[policy]()
+  result_dates, result_values = deduplicate(dates, values, policy)
+  assert result_dates.tolist() == expected['date'].tolist()
+  assert_same(result_values, expected['value'])
+
+def test_regularize_matches_merge():
+  dates = pd.to_datetime(['2024-01-01 00:00', '2024-01-01 01:00', '2024-01-01 04:00', '2024-01-01 05:00']).as_unit('ns')
+  values = np.array([1.0, np.nan, 3.0, 4.0])
+  points, aligned = regularize(dates.asi8, values, 'h')
+  grid = pd.DataFrame({"date": pd.date_range(dates.min(), dates.max(), freq='h')})
+  expected = pd.merge(grid, pd.DataFrame({"date": dates, "value": values}), on="date", how="left")
+  assert points.tolist() == expected['date'].to_numpy(dtype='datetime64[ns]').view('int64').tolist()
+  assert_same(aligned, expected['value'])
+
+@pytest.mark.parametrize("method", list(Imputation), ids=lambda m: m.name)
+def test_impute_matches_configure_dataset(method):
+  config = PreprocessConfig(imputation=method)
+  df = pd.DataFrame({"date": pd.date_range('2024-01-01', periods=len(VALUES), freq='h'), "value": VALUES})
+  assert_same(impute(VALUES.copy(), config), configure_dataset(df, config)['value'])
+
+def test_preprocess_many_matches_preprocess_file(tmp_path):
+  path = tmp_path / 'source.csv'
+  source().to_csv(path, index=False)
+  configs = [
+    PreprocessConfig(duplicates=Duplicates.FIRST, frequency='h', imputation=Imputation.LINEAR),
+    PreprocessConfig(duplicates=Duplicates.SUM, imputation=Imputation.SMA),
+    PreprocessConfig(duplicates=Duplicates.LAST, frequency='2h', imputation=Imputation.MEAN),
+  ]
+  jobs = [(str(path), str(tmp_path / f'many{i}.csv'), config) for i, config in enumerate(configs)]
+  rows = preprocess_many(jobs, max_workers=2)
+
+  for i, config in enumerate(configs):
+    expected = configure_dataset(source(), config)
+    result = pd.read_csv(tmp_path / f'many{i}.csv', parse_dates=['date'])
+    assert result['date'].tolist() == expected['date'].tolist()
+    assert_same(result['value'], expected['value'])
+    assert rows[i] == preprocess_file(str(path), str(tmp_path / f'one{i}.csv'), config)
+    assert (tmp_path / f'many{i}.csv').read_text() == (tmp_path / f'one{i}.csv').read_text()
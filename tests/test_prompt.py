@@ -0,0 +1,103 @@
+import hashlib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.format import Scale, TSFormat, TSType, format_timeseries, parse_timeseries
+from src.model.prompt import PromptLayout, PromptModel, PromptType
+from src.model.window import TimeSeriesWindow
+
+ENCODED = [TSType.SCALED, TSType.DELTA, TSType.SYMBOLIC]
+
+def window(values: np.ndarray, start: str = '2024-01-01') -> TimeSeriesWindow:
+  return TimeSeriesWindow(pd.date_range(start, periods=len(values), freq='h').values.astype('datetime64[ns]'), np.asarray(values, dtype=np.float64))
+
+# Janela de 100 pontos (24.0 a 123.0) e a sua continuação (124.0 a 129.0)
+WINDOW = window(np.arange(24.0, 124.0))
+CONTINUATION = window(np.arange(124.0, 130.0), '2024-01-05 04:00')
+
+def tolerance(ts_type: TSType, scale: Scale) -> float:
+  """Erro máximo da codificação: meio passo em SCALED, meia faixa em SYMBOLIC e arredondamento em DELTA."""
+  return {TSType.SCALED: scale.span / scale.steps / 2, TSType.DELTA: 1e-9, TSType.SYMBOLIC: scale.span / scale.levels / 2}[ts_type]
+
+# ---------------------- CODIFICAÇÕES ----------------------
+@pytest.mark.parametrize('ts_format', [TSFormat.ARRAY, TSFormat.CSV, TSFormat.JSON])
+@pytest.mark.parametrize('ts_type', ENCODED)
+def test_window_round_trip(ts_type, ts_format):
+  model = PromptModel(WINDOW, 6, PromptType.ZERO_SHOT, ts_format, ts_type)
+  for data in (WINDOW, WINDOW[:4], WINDOW[24:48]):
+    decoded = parse_timeseries(model.serialize(data), ts_format, ts_type, len(data), model.scale)
+    np.testing.assert_allclose(decoded, data.values, atol=tolerance(ts_type, model.scale))
+
+@pytest.mark.parametrize('ts_type', [TSType.SCALED, TSType.DELTA])
+def test_continuation_round_trip(ts_type):
+  # A previsão codificada como os blocos do prompt volta às unidades originais, sem deslocamento
+  scale = PromptModel(WINDOW, 6, PromptType.ZERO_SHOT, TSFormat.ARRAY, ts_type).scale
+  response = format_timeseries(CONTINUATION, TSFormat.ARRAY, ts_type, scale)
+  decoded = parse_timeseries(response, TSFormat.ARRAY, ts_type, 6, scale)
+  np.testing.assert_allclose(decoded, CONTINUATION.values, atol=tolerance(ts_type, scale))
+
+def test_delta_continuation_starts_absolute():
+  scale = Scale.fit(WINDOW)
+  assert format_timeseries(CONTINUATION, TSFormat.ARRAY, TSType.DELTA, scale) == "[124.0, 1.0, 1.0, 1.0, 1.0, 1.0]"
+  np.testing.assert_array_equal(parse_timeseries("[124.0, 1.0, 1.0, 1.0, 1.0, 1.0]", TSFormat.ARRAY, TSType.DELTA, 6, scale), CONTINUATION.values)
+
+def test_symbolic_continuation_saturates_at_the_top_band():
+  scale = Scale.fit(WINDOW)
+  response = format_timeseries(CONTINUATION, TSFormat.ARRAY, TSType.SYMBOLIC, scale)
+  assert response == "[t, t, t, t, t, t]"
+  np.testing.assert_allclose(parse_timeseries(response, TSFormat.ARRAY, TSType.SYMBOLIC, 6, scale), scale.high - scale.span / scale.levels / 2)
+
+@pytest.mark.parametrize('layout', list(PromptLayout))
+@pytest.mark.parametrize('ts_type', list(TSType))
+def test_encoding_is_explained(ts_type, layout):
+  prompt = PromptModel(WINDOW, 6, PromptType.FEW_SHOT, TSFormat.CSV, ts_type, layout=layout).generate(verbose=False)
+  assert ("Codificação dos Valores:" in prompt) == (ts_type in ENCODED)
+  assert "{encoding}" not in prompt
+
+# ---------------------- LAYOUTS ----------------------
+# SHA-256 dos prompts gerados pelo PromptModel original (lista de tuplas, antes dos layouts) para BASELINE
+BASELINE_DIGESTS = {
+  ('ZERO_SHOT', 'ARRAY', 'NUMERIC'): '261786fe697e907de279c8b54915359ec1565e753a523d1c258ebe4a3793b6ee',
+  ('ZERO_SHOT', 'ARRAY', 'TEXTUAL'): '79b094b5b6affd65a66d1f0695c93c13095fb14a9fa9a976439db03f65992b6a',
+  ('ZERO_SHOT', 'CSV', 'NUMERIC'): '102c54d588e588fd1e878e0c64d48a663bc115d425d8d17997a48b04de6f8cce',
+  ('ZERO_SHOT', 'CSV', 'TEXTUAL'): '0e137d25e69c6cfe49a6f1e162612d13bdb942370c6a87d493976c160608f5a1',
+  ('ZERO_SHOT', 'JSON', 'NUMERIC'): 'e2393bde293f16c67d2becb68243e6f6da6f32cb74c77b0d7cf9f55628328d68',
+  ('ZERO_SHOT', 'JSON', 'TEXTUAL'): '650421f7cccf7366a2c45ab14f0431233d5cbb6e5080863be038e00b7cc3cd47',
+  ('FEW_SHOT', 'ARRAY', 'NUMERIC'): '08575d622bc296f2d353e3e58bdf104bf36a9a1f0e3f97102324ccfadd78d520',
+  ('FEW_SHOT', 'ARRAY', 'TEXTUAL'): '503136eec9bf5a9f02fcb5ec638c824ebaef4d9bd29cc9882cb7de85262f49aa',
+  ('FEW_SHOT', 'CSV', 'NUMERIC'): '36728e61f9fd5eedc58f1b760919b21a7e9fe12c2f70fbc6872a11497b3f5014',
+  ('FEW_SHOT', 'CSV', 'TEXTUAL'): '6af51662b2de9a544fc22816114cbab669a613dabf821b4b998d56143e38e369',
+  ('FEW_SHOT', 'JSON', 'NUMERIC'): '8f9e6d71766da8ad6beda99357ac1bc85a3fa355ba46e1f8ca947aaa0297f03b',
+  ('FEW_SHOT', 'JSON', 'TEXTUAL'): '8d4ee11d7b7d5b4c24c74f73450dc56e3b3b64715f2c98730f38394c83abdbd8',
+  ('COT', 'ARRAY', 'NUMERIC'): '008eb7f1b2fc5e2bfd8aca30906cd0cdb21c7cfa1c01a079b7f84a22289e9a0c',
+  ('COT', 'ARRAY', 'TEXTUAL'): 'c110314a574ab32ecaae84567eba37db7038f7ae356ed6562adfb640140bf2cb',
+  ('COT', 'CSV', 'NUMERIC'): '00f3c88528429be65ef44863e558bd49bfb910a503cfde0d42ee22453b107ee4',
+  ('COT', 'CSV', 'TEXTUAL'): '0bcf5fa71fa31e5462fabf1d1539cf6b173dcc61644a63b31d6d4f24a250415a',
+  ('COT', 'JSON', 'NUMERIC'): 'bf1b7692091d5a15d759ddd48be89a2cd286833141c0f97385f850cf52314f1c',
+  ('COT', 'JSON', 'TEXTUAL'): '5c678b55bc2b0717d17a7ceab4a53ada52719670cab7c966e6c871ca76f6b308',
+  ('COT_FEW', 'ARRAY', 'NUMERIC'): 'ed89df8fc32755c39de78ecae79a20a6488dbe74df3ef2c33784c50fbd28ebbb',
+  ('COT_FEW', 'ARRAY', 'TEXTUAL'): 'a19282ebbd3f638e900fb9fc33f13a0fb50598e8143f939e28a0d1e08863756f',
+  ('COT_FEW', 'CSV', 'NUMERIC'): '93c696f23ea50ff89794138965790b62e62ba3e869b0a069046c51a8adafb082',
+  ('COT_FEW', 'CSV', 'TEXTUAL'): '97851c5578814792159fb824420b48209dc2457be1bf0be024a5cc2b04d02a40',
+  ('COT_FEW', 'JSON', 'NUMERIC'): '85495a60161a9ac4f648a4277077a6932b25cbef1fcb28626264943eaae37bf9',
+  ('COT_FEW', 'JSON', 'TEXTUAL'): '949097612904f239ffbcc963e7a3c7f130a66dd5c14af811751ff2b5629315fc',
+}
+BASELINE = window(np.round(10 + np.sin(np.arange(120) / 4) * 5, 3))
+
+@pytest.mark.parametrize('key', list(BASELINE_DIGESTS))
+def test_inline_matches_baseline(key):
+  prompt_type, ts_format, ts_type = PromptType[key[0]], TSFormat[key[1]], TSType[key[2]]
+  for data in (BASELINE, list(BASELINE)):
+    prompt = PromptModel(data, 24, prompt_type, ts_format, ts_type).generate(verbose=False)
+    assert hashlib.sha256(prompt.encode("utf-8")).hexdigest() == BASELINE_DIGESTS[key]
+
+@pytest.mark.parametrize('ts_type', list(TSType))
+@pytest.mark.parametrize('prompt_type', list(PromptType))
+def test_prefix_is_shared_between_windows(prompt_type, ts_type):
+  first = PromptModel(BASELINE[:100], 24, prompt_type, TSFormat.CSV, ts_type, layout=PromptLayout.PREFIX)
+  second = PromptModel(WINDOW, 12, prompt_type, TSFormat.CSV, ts_type, layout=PromptLayout.PREFIX)
+  prefix = first.prefix()
+  assert prefix == second.prefix() and len(prefix) > 1000
+  assert first.generate(verbose=False).startswith(prefix)
+  assert second.generate(verbose=False).startswith(prefix)
@@ -0,0 +1,74 @@
+import time
+import threading
+import pandas as pd
+import pytest
+
+from src.model.registry import DatasetRegistry
+
+def write_csv(path, rows: int = 48):
+  dates = pd.date_range('2024-01-01', periods=rows, freq='h').strftime('%Y-%m-%d %H:%M:%S')
+  pd.DataFrame({'date': dates, 'value': range(rows)}).to_csv(path, index=False)
+  return path
+
+def test_concurrent_misses_load_once(tmp_path, monkeypatch):
+  path = write_csv(tmp_path / 'a.csv')
+  loads = []
+  load = DatasetRegistry.load
+
+  def slow_load(path, series_id=None):
+    loads.append(path)
+    time.sleep(0.2)
+    return load(path, series_id)
+
+  monkeypatch.setattr(DatasetRegistry, "load", staticmethod(slow_load))
+  registry = DatasetRegistry(max_bytes=2**20)
+  results = []
+  threads = [threading.Thread(target=lambda: results.append(registry.get(path))) for _ in range(4)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+
+  assert len(loads) == 1
+  assert all(result[0] is results[0][0] for result in results)
+  stats = registry.stats()
+  assert (stats["misses"], stats["hits"], stats["entries"]) == (1, 3, 1)
+  assert registry.loading == {}
+
+def test_least_recently_used_is_evicted_over_the_budget(tmp_path):
+  paths = [write_csv(tmp_path / f'{name}.csv') for name in 'abc']
+  size = 48 * 16 # date int64 + value float64
+  registry = DatasetRegistry(max_bytes=2 * size)
+  registry.get(paths[0])
+  registry.get(paths[1])
+  registry.get(paths[0]) # 'a' passa a ser o mais recente
+  registry.get(paths[2])
+
+  keys = [key[0] for key in registry.entries]
+  assert keys == [str(paths[0]), str(paths[2])]
+  assert registry.stats() == {"hits": 1, "misses": 3, "evictions": 1, "entries": 2, "bytes": 2 * size, "max_bytes": 2 * size}
+
+  registry.get(paths[1])
+  assert registry.stats()["misses"] == 4
+  assert [key[0] for key in registry.entries] == [str(paths[2]), str(paths[1])]
+
+def test_dataset_over_the_budget_is_not_kept(tmp_path):
+  path = write_csv(tmp_path / 'a.csv')
+  registry = DatasetRegistry(max_bytes=100)
+  dates, values, _ = registry.get(path)
+  assert len(values) == 48
+  assert registry.stats()["entries"] == 0 and registry.stats()["bytes"] == 0
+
+def test_new_file_version_replaces_the_old_entry(tmp_path):
+  path = write_csv(tmp_path / 'a.csv')
+  registry = DatasetRegistry(max_bytes=2**20)
+  registry.get(path)
+  write_csv(path, rows=24)
+  dates, values, _ = registry.get(path)
+  assert len(values) == 24
+  assert registry.stats()["entries"] == 1 and registry.stats()["bytes"] == 24 * 16
+
+def test_entries_are_read_only(tmp_path):
+  dates, values, _ = DatasetRegistry(max_bytes=2**20).get(write_csv(tmp_path / 'a.csv'))
+  with pytest.raises(ValueError):
+    values[0] = 1.0
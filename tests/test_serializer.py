@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.format import TSFormat, TSType, ELEMENTWISE, Scale, format_timeseries
+from src.model.serializer import SegmentCache
+from src.model.window import TimeSeriesWindow
+from tests.test_format import REFERENCES
+
+def dataset(freq: str = 'h', points: int = 200) -> TimeSeriesWindow:
+  """Colunas de um dataset: as janelas são fatias com a origem e a posição no arquivo."""
+  rng = np.random.default_rng(0)
+  values = np.round(10 + np.sin(np.arange(points) / 5) * 5 + rng.normal(0, 1, points), 3)
+  values[[7, 8]] = values[6] # Valores repetidos para o indicador "→"
+  values[40] = np.nan
+  return TimeSeriesWindow(pd.date_range('2024-01-01', periods=points, freq=freq).values, values, ('data.csv', None))
+
+DATA = dataset()
+
+def formats(cache: SegmentCache, window: TimeSeriesWindow, ts_type: TSType) -> None:
+  """Compara, em todos os formatos, a saída do cache com a do serializador sem cache."""
+  for ts_format in TSFormat:
+    assert cache.format(window, ts_format, ts_type) == format_timeseries(window, ts_format, ts_type)
+
+@pytest.mark.parametrize("ts_type", sorted(ELEMENTWISE), ids=lambda t: t.name)
+@pytest.mark.parametrize("freq", ['h', 'D'])
+def test_output_is_identical_to_the_uncached_serializer(freq, ts_type):
+  data = dataset(freq)
+  cache = SegmentCache(max_rows=10_000)
+  for window in (data[50:120], data[60:100], data[30:90], data[100:180], data[:0], data):
+    formats(cache, window, ts_type)
+  assert cache.stats()["hits"] > 0
+
+def test_numeric_output_matches_the_original_formatters():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA)
+  window = DATA[20:70]
+  for ts_format, reference in REFERENCES.items():
+    assert cache.format(window, ts_format) == reference(list(window))
+
+def test_window_inside_the_segment_is_a_hit():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[0:100])
+  cache.columns(DATA[10:50])
+  cache.columns(DATA[99:100])
+  assert cache.stats() == {"hits": 2, "misses": 1, "rendered": 100, "evictions": 0, "entries": 1, "rows": 100, "max_rows": 10_000}
+
+def test_overlapping_window_extends_the_segment():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[40:80])
+  cache.columns(DATA[60:110]) # Avança: converte só 80..109
+  cache.columns(DATA[20:50]) # Recua: converte só 20..39
+  stats = cache.stats()
+  assert (stats["misses"], stats["rendered"], stats["rows"]) == (3, 40 + 30 + 20, 90)
+  segment = next(iter(cache.entries.values()))
+  assert (segment.start, segment.end) == (20, 110)
+  formats(cache, DATA[20:110], TSType.NUMERIC)
+
+def test_adjacent_window_extends_and_disjoint_window_replaces():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[0:30])
+  cache.columns(DATA[30:60])
+  assert cache.stats()["rows"] == 60
+  cache.columns(DATA[100:120])
+  segment = next(iter(cache.entries.values()))
+  assert (segment.start, segment.end, cache.stats()["rows"]) == (100, 120, 20)
+
+def test_mismatched_values_are_rendered_again():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[0:100])
+  # Mesma origem e posição, valores diferentes (arredondados ou outra versão do arquivo)
+  rounded = DATA[0:100].round(0)[10:50]
+  assert cache.format(rounded, TSFormat.CSV) == format_timeseries(rounded, TSFormat.CSV)
+  changed = TimeSeriesWindow(DATA.dates[60:120], DATA.values[60:120] + 1, DATA.source, 60)
+  assert cache.format(changed, TSFormat.ARRAY) == format_timeseries(changed, TSFormat.ARRAY)
+  assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 3
+
+def test_mismatched_dates_are_rendered_again():
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[0:100])
+  shifted = TimeSeriesWindow(DATA.dates[0:50] + np.timedelta64(1, 'h'), DATA.values[0:50], DATA.source, 0)
+  assert cache.format(shifted, TSFormat.CSV) == format_timeseries(shifted, TSFormat.CSV)
+  assert cache.stats()["hits"] == 0
+
+@pytest.mark.parametrize("ts_type", [t for t in TSType if t not in ELEMENTWISE], ids=lambda t: t.name)
+def test_non_elementwise_types_bypass_the_cache(ts_type):
+  cache = SegmentCache(max_rows=10_000)
+  cache.columns(DATA[0:100])
+  window = DATA[10:60]
+  scale = Scale.fit(DATA[0:100])
+  for ts_format in TSFormat:
+    assert cache.format(window, ts_format, ts_type) == format_timeseries(window, ts_format, ts_type)
+    assert cache.format(window, ts_format, ts_type, scale) == format_timeseries(window, ts_format, ts_type, scale)
+  assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 1 and cache.stats()["rows"] == 100
+
+def test_windows_without_source_or_with_nanosecond_dates_bypass_the_cache():
+  cache = SegmentCache(max_rows=10_000)
+  sourceless = TimeSeriesWindow(DATA.dates, DATA.values)
+  nanoseconds = TimeSeriesWindow(DATA.dates.view('int64') + 1, DATA.values, DATA.source)
+  for window in (sourceless, nanoseconds, list(DATA[:20])):
+    assert cache.format(window, TSFormat.CSV) == format_timeseries(window, TSFormat.CSV)
+  assert cache.stats()["misses"] == 0 and cache.stats()["entries"] == 0
+
+def test_least_recently_used_segment_is_evicted():
+  cache = SegmentCache(max_rows=150)
+  other = TimeSeriesWindow(DATA.dates, DATA.values, ('other.csv', None))
+  cache.columns(DATA[0:100])
+  cache.columns(other[0:100])
+  assert list(cache.entries) == [(('other.csv', None), TSType.NUMERIC, 's')]
+  assert cache.stats()["evictions"] == 1 and cache.stats()["rows"] == 100
+  cache.columns(DATA[0:200]) # Acima do orçamento: convertido, mas não guardado
+  assert cache.stats()["rows"] == 100
@@ -0,0 +1,88 @@
+import sys
+import numpy as np
+import pytest
+
+from src.model.format import TSFormat, TSType
+from src.model.prompt import PromptModel, PromptType
+from src.model.tokens import TokenEstimator, heuristic_tokens, tiktoken_tokens, ESTIMATOR
+from tests.test_prompt import window
+
+WINDOW = window(np.round(10 + np.sin(np.arange(120) / 4) * 5, 3))
+PERIODS = 12
+
+@pytest.mark.parametrize("text, tokens", [
+  ("", 0),
+  ("123", 1),
+  ("1234", 2),
+  ("1234567", 3),
+  ("data", 1),
+  ("média", 2), # Letras acentuadas contam como palavra
+  ("a b", 2), # O espaço simples se junta à palavra seguinte
+  ("a  b", 3),
+  ("\n\n\n", 1),
+  ("[1.5, 2.25]", 9),
+  ("2024-01-01 00:00:00,12.5", 15),
+])
+def test_heuristic_tokens(text, tokens):
+  assert heuristic_tokens(text) == tokens
+
+def test_heuristic_tokens_grow_with_the_window():
+  model = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT, TSFormat.CSV)
+  assert heuristic_tokens(model.serialize(WINDOW[:40])) < heuristic_tokens(model.serialize(WINDOW[:80]))
+
+def test_estimator_uses_the_tokenizer():
+  calls = []
+  estimator = TokenEstimator(lambda text: calls.append(text) or len(text))
+  assert estimator.count("abc") == 3
+  assert estimator.count("") == 0 and estimator.count(None) == 0
+  assert calls == ["abc"]
+  assert ESTIMATOR.tokenizer is heuristic_tokens
+
+def test_tiktoken_is_optional(monkeypatch):
+  monkeypatch.setitem(sys.modules, "tiktoken", None)
+  with pytest.raises(ImportError, match="tiktoken"):
+    tiktoken_tokens()
+
+def test_estimate_covers_every_combination_sorted_by_total():
+  estimates = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT).estimate()
+  assert len(estimates) == len(TSFormat) * len(TSType)
+  assert {(e["ts_format"], e["ts_type"]) for e in estimates} == {(f, t) for f in TSFormat for t in TSType}
+  totals = [e["total_tokens"] for e in estimates]
+  assert totals == sorted(totals)
+  assert all(e["total_tokens"] == e["prompt_tokens"] + e["response_tokens"] for e in estimates)
+
+def test_estimate_counts_the_generated_prompt():
+  estimator = TokenEstimator(len)
+  model = PromptModel(WINDOW, PERIODS, PromptType.COT, TSFormat.JSON, TSType.TEXTUAL)
+  estimate = model.estimate(estimator, formats=[TSFormat.JSON], types=[TSType.TEXTUAL])
+  assert estimate == [{
+    "ts_format": TSFormat.JSON, "ts_type": TSType.TEXTUAL,
+    "prompt_tokens": len(model.generate(verbose=False)),
+    "response_tokens": len(model.serialize(WINDOW[-PERIODS:])),
+    "total_tokens": len(model.generate(verbose=False)) + len(model.serialize(WINDOW[-PERIODS:])),
+  }]
+
+@pytest.mark.parametrize("prompt_type", [PromptType.FEW_SHOT, PromptType.COT_FEW])
+def test_window_too_short_for_examples_raises_value_error(prompt_type):
+  model = PromptModel(WINDOW[:60], PERIODS, prompt_type)
+  with pytest.raises(ValueError, match="96"):
+    model.estimate()
+  with pytest.raises(ValueError, match="96"):
+    PromptModel.auto(WINDOW[:60], PERIODS, prompt_type)
+  assert len(PromptModel(WINDOW, PERIODS, prompt_type).estimate()) == len(TSFormat) * len(TSType)
+
+def test_auto_picks_the_cheapest_format():
+  estimates = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT).estimate()
+  model = PromptModel.auto(WINDOW, PERIODS, PromptType.ZERO_SHOT)
+  assert (model.ts_format, model.ts_type) == (estimates[0]["ts_format"], estimates[0]["ts_type"])
+  assert PromptModel.auto(WINDOW, PERIODS, PromptType.ZERO_SHOT, budget=estimates[0]["total_tokens"]).ts_format == model.ts_format
+
+def test_auto_respects_a_fixed_type():
+  estimates = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT).estimate(types=[TSType.TEXTUAL])
+  model = PromptModel.auto(WINDOW, PERIODS, PromptType.ZERO_SHOT, ts_type=TSType.TEXTUAL)
+  assert (model.ts_format, model.ts_type) == (estimates[0]["ts_format"], TSType.TEXTUAL)
+
+def test_auto_raises_when_nothing_fits_the_budget():
+  cheapest = PromptModel(WINDOW, PERIODS, PromptType.ZERO_SHOT).estimate()[0]["total_tokens"]
+  with pytest.raises(ValueError, match=str(cheapest)):
+    PromptModel.auto(WINDOW, PERIODS, PromptType.ZERO_SHOT, budget=cheapest - 1)
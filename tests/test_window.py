@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.window import TimeSeriesWindow
+
+def window(freq: str, periods: int = 30, start: str = '2024-01-01') -> TimeSeriesWindow:
+  dates = pd.date_range(start, periods=periods, freq=freq).values.astype('datetime64[ns]')
+  return TimeSeriesWindow(dates, np.arange(periods, dtype=np.float64), ('data.csv', None))
+
+@pytest.mark.parametrize("freq, unit, label", [
+  ('D', 'D', '2024-01-02'),
+  ('h', 's', '2024-01-01 01:00:00'),
+  ('250ms', 'ns', '2024-01-01 00:00:00.250'),
+])
+def test_labels_follow_series_astype_str(freq, unit, label):
+  data = window(freq)
+  assert data.unit == unit
+  assert data.labels() == pd.Series(data.dates).astype(str).tolist()
+  assert data[1] == (label, 1.0)
+  assert list(data)[1] == (label, 1.0)
+
+def test_labels_of_a_subset_use_the_window_unit():
+  data = window('h')
+  # A meia-noite isolada continua com horário, como na série inteira
+  assert data.labels(data.dates[24:25]) == ['2024-01-02 00:00:00']
+  assert data.labels(data.dates[24:25], unit='D') == ['2024-01-02']
+
+def test_slices_share_the_arrays():
+  data = window('h')
+  part = data[5:20][3:]
+  assert np.shares_memory(part.values, data.values) and np.shares_memory(part.dates, data.dates)
+  assert (part.offset, len(part), part.source) == (8, 12, data.source)
+  assert data[-4:].offset == 26
+  assert len(data[40:]) == 0
+
+def test_round_keeps_the_dates():
+  data = window('h')
+  rounded = data[2:].round(0)
+  assert np.shares_memory(rounded.dates, data.dates)
+  assert rounded.offset == 2
+
+def test_epoch_and_microsecond_dates_are_read_as_nanoseconds():
+  data = window('h')
+  epoch = TimeSeriesWindow(data.dates.view('int64'), data.values)
+  micro = TimeSeriesWindow(pd.date_range('2024-01-01', periods=30, freq='h').values.astype('datetime64[us]'), data.values)
+  assert epoch.labels() == micro.labels() == data.labels()
+  assert np.shares_memory(epoch.dates, data.dates)
+
+def test_to_frame_keeps_the_dataset_positions():
+  frame = window('D')[10:15].to_frame()
+  assert frame.index.tolist() == list(range(10, 15))
+  assert frame['value'].tolist() == [10.0, 11.0, 12.0, 13.0, 14.0]